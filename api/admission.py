@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class AdmissionRejected(Exception):
+    """Requête refusée par le contrôle d'admission (file pleine ou attente trop longue)"""
+
+    def __init__(self, reason):
+        super().__init__(f"Serveur saturé ({reason})")
+        self.reason = reason
+
+
+class AdaptiveConcurrencyLimiter:
+    """Limiteur de concurrence AIMD devant l'inférence.
+
+    Au plus `limit` inférences s'exécutent en même temps ; les suivantes
+    attendent dans une file bornée à `max_queue` places, puis sont refusées
+    immédiatement. La limite s'adapte à la latence observée : +1 par fenêtre
+    de `limit` inférences sous `target_latency_ms` (croissance additive),
+    multipliée par `backoff` dès qu'une inférence la dépasse (décroissance
+    multiplicative, au plus une fois par fenêtre).
+    """
+
+    def __init__(self, initial_limit=32, min_limit=1, max_limit=256, max_queue=64,
+                 queue_timeout_ms=100.0, target_latency_ms=50.0, backoff=0.75,
+                 shed=None, limit_gauge=None, queue_depth=None, clock=time.perf_counter):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout_ms / 1000.0
+        self.target_latency = target_latency_ms / 1000.0
+        self.backoff = backoff
+        self.shed = shed
+        self.limit_gauge = limit_gauge
+        self.queue_depth = queue_depth
+        self.clock = clock
+        self.in_flight = 0
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._waiters = deque()
+        self._last_decrease = 0
+        self._completed = 0
+        self._update_gauges()
+
+    @property
+    def limit(self):
+        return int(self._limit)
+
+    @property
+    def queued(self):
+        """Requêtes en attente d'une place d'inférence"""
+        return len(self._waiters)
+
+    def _update_gauges(self):
+        if self.limit_gauge is not None:
+            self.limit_gauge.set(self.limit)
+        if self.queue_depth is not None:
+            self.queue_depth.set(len(self._waiters))
+
+    def _reject(self, reason):
+        if self.shed is not None:
+            self.shed.labels(reason=reason).inc()
+        raise AdmissionRejected(reason)
+
+    async def acquire(self):
+        """Réserve une place d'inférence ou lève AdmissionRejected"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._update_gauges()
+        try:
+            # La place est transférée par release() : in_flight est déjà compté
+            await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                return
+            self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            # Annulée après que release() lui a transféré la place : la rendre
+            if future.done() and not future.cancelled():
+                self._free_slot()
+            raise
+        finally:
+            if future in self._waiters:
+                self._waiters.remove(future)
+            self._update_gauges()
+
+    def release(self, latency):
+        """Libère une place et ajuste la limite à la latence de l'inférence terminée"""
+        self._completed += 1
+        if latency > self.target_latency:
+            # Une seule décroissance par fenêtre : les requêtes déjà lancées sous
+            # l'ancienne limite ne la font pas s'effondrer
+            if self._completed - self._last_decrease >= self.limit:
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+                self._last_decrease = self._completed
+        else:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+        self._free_slot()
+
+    def _free_slot(self):
+        """Rend une place et la transfère aux requêtes en attente tant que la limite le permet"""
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < self.limit:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+        self._update_gauges()
+
+    @asynccontextmanager
+    async def admit(self):
+        """`async with limiter.admit():` autour de l'inférence"""
+        await self.acquire()
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.release(self.clock() - start)
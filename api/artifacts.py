@@ -0,0 +1,45 @@
+import os
+
+BUNDLE_FORMAT_VERSION = 1
+
+
+def bundle_filename(model_name, version):
+    return f"{model_name}-v{version}.joblib"
+
+
+def export_bundle(estimator, columns, output_dir, model_name, version, preprocessor=None):
+    """Matérialise l'estimateur sklearn natif dans un bundle joblib épinglé sur une version.
+
+    Le bundle est écrit sans compression pour pouvoir être rechargé vite (et
+    memory-mappé) sans importer mlflow. Le prétraitement servi (api/preprocessing.py)
+    peut y être embarqué pour voyager avec le modèle.
+    """
+    import joblib
+    import sklearn
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, bundle_filename(model_name, version))
+    bundle = {
+        "format_version": BUNDLE_FORMAT_VERSION,
+        "model_name": model_name,
+        "model_version": version,
+        "columns": list(columns),
+        "sklearn_version": sklearn.__version__,
+        "estimator": estimator,
+        "preprocessor": preprocessor,
+    }
+    # Écriture atomique : un worker ne lit jamais un bundle partiel
+    tmp_path = path + ".tmp"
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_bundle(path, mmap_mode=None):
+    """Charge un bundle exporté par `export_bundle` (aucun import de mlflow)"""
+    import joblib
+
+    bundle = joblib.load(path, mmap_mode=mmap_mode)
+    if bundle.get("format_version") != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Format de bundle non supporté : {bundle.get('format_version')}")
+    return bundle
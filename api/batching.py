@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Regroupe les appels /predict concurrents en un seul lot pour le modèle.
+
+    Les lignes soumises sont placées dans une file asyncio ; un worker unique
+    les vide dès que `max_batch_size` lignes sont disponibles ou que
+    `max_wait_ms` s'est écoulé depuis la première ligne du lot, puis score la
+    matrice complète dans le threadpool. Pendant qu'un lot est scoré, le lot
+    suivant s'accumule : la taille des lots s'adapte donc à la charge.
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_ms=2.0,
+                 queue_depth=None, batch_size=None, queue_delay=None):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue_depth = queue_depth
+        self.batch_size = batch_size
+        self.queue_delay = queue_delay
+        self._queue = None
+        self._worker = None
+        # Lot retiré de la file mais pas encore résolu (collecte ou scoring en cours)
+        self._current = []
+
+    def start(self):
+        """Démarre le worker de batching sur la boucle asyncio courante"""
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Arrête le worker ; les appels en attente et ceux du lot en cours reçoivent une erreur"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        pending = self._current
+        self._current = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Micro-batcher arrêté"))
+
+    @property
+    def running(self):
+        return self._worker is not None and not self._worker.done()
+
+    async def submit(self, row):
+        """Soumet une ligne de features et attend (prédiction, probabilités)"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future, time.perf_counter()))
+        if self.queue_depth is not None:
+            self.queue_depth.set(self._queue.qsize())
+        return await future
+
+    async def _collect(self):
+        """Attend la première ligne puis remplit le lot jusqu'à taille ou délai max"""
+        loop = asyncio.get_running_loop()
+        batch = self._current = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            if self.queue_depth is not None:
+                self.queue_depth.set(self._queue.qsize())
+
+            # Les appelants déconnectés ont annulé leur future : inutile de les scorer
+            batch = self._current = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            flush_time = time.perf_counter()
+            if self.queue_delay is not None:
+                for _, _, enqueued in batch:
+                    self.queue_delay.observe(flush_time - enqueued)
+            if self.batch_size is not None:
+                self.batch_size.observe(len(batch))
+
+            X = np.vstack([row for row, _, _ in batch])
+            try:
+                predictions, probabilities = await loop.run_in_executor(None, self.score_fn, X)
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._current = []
+                continue
+
+            for i, (_, future, _) in enumerate(batch):
+                if not future.done():
+                    row_proba = None if probabilities is None else probabilities[i]
+                    future.set_result((predictions[i], row_proba))
+            self._current = []
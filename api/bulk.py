@@ -0,0 +1,93 @@
+import csv
+import json
+
+from pydantic import ValidationError
+from starlette.responses import StreamingResponse
+
+
+def detect_format(content_type):
+    """Renvoie "csv" ou "ndjson" selon le Content-Type (NDJSON par défaut)"""
+    return "csv" if content_type and "csv" in content_type.lower() else "ndjson"
+
+
+def parse_header(line):
+    return next(csv.reader([line]))
+
+
+def _error_message(error):
+    if isinstance(error, ValidationError):
+        first = error.errors()[0]
+        location = ".".join(str(part) for part in first.get("loc", ())) or "record"
+        return f"{location}: {first['msg']}"
+    return str(error)
+
+
+def parse_lines(lines, fmt, header, input_model):
+    """Valide chaque ligne avec le même modèle Pydantic que /predict.
+
+    Renvoie les enregistrements valides, leur position dans `lines` et la
+    liste des erreurs (position, message) pour les lignes rejetées.
+    """
+    records, positions, errors = [], [], []
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            if fmt == "ndjson":
+                record = input_model.model_validate_json(line)
+            else:
+                record = input_model.model_validate(dict(zip(header, parse_header(line))))
+        except (ValidationError, ValueError) as e:
+            errors.append((i, _error_message(e)))
+            continue
+        records.append(record)
+        positions.append(i)
+    return records, positions, errors
+
+
+def score_lines(lines, fmt, header, start_row, input_model, layout, score_fn):
+    """Valide et score un bloc de lignes ; renvoie les résultats NDJSON dans l'ordre d'entrée"""
+    records, positions, errors = parse_lines(lines, fmt, header, input_model)
+    results = {}
+    for position, message in errors:
+        results[position] = {"row": start_row + position, "error": message}
+
+    if records:
+        predictions, probabilities = score_fn(layout.matrix(records))
+        predictions = predictions.tolist()
+        probabilities = None if probabilities is None else probabilities.tolist()
+        for i, position in enumerate(positions):
+            result = {"row": start_row + position, "prediction": predictions[i], "cluster": predictions[i]}
+            if probabilities is not None:
+                result["probabilities"] = probabilities[i]
+            results[position] = result
+
+    return "".join(json.dumps(results[position]) + "\n" for position in sorted(results))
+
+
+async def iter_body_lines(body_stream):
+    """Découpe un corps de requête reçu par morceaux en lignes décodées"""
+    pending = b""
+    async for chunk in body_stream:
+        pending += chunk
+        *complete, pending = pending.split(b"\n")
+        for line in complete:
+            yield line.decode("utf-8").rstrip("\r")
+    if pending.strip():
+        yield pending.decode("utf-8").rstrip("\r")
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse qui peut lire le corps de la requête pendant l'envoi.
+
+    La réponse standard consomme `receive()` en parallèle pour détecter la
+    déconnexion du client, ce qui vole les morceaux du corps encore à lire.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        async for chunk in self.body_iterator:
+            if not isinstance(chunk, (bytes, memoryview)):
+                chunk = chunk.encode(self.charset)
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
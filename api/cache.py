@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class PredictionCache:
+    """Cache en mémoire des prédictions, borné en taille, avec éviction LRU et TTL.
+
+    La clé combine la version du modèle chargé et le vecteur de features
+    canonicalisé : un changement de modèle rend donc les anciennes entrées
+    inaccessibles, qui sortent ensuite par LRU ou expiration.
+    """
+
+    def __init__(self, max_entries, ttl_seconds, hits=None, misses=None,
+                 evictions=None, size=None, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = hits
+        self.misses = misses
+        self.evictions = evictions
+        self.size = size
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(row, model_version):
+        """Clé canonique : float64 contigu dans l'ordre des features, -0.0 normalisé en 0.0"""
+        canonical = np.ascontiguousarray(row, dtype=np.float64).ravel() + 0.0
+        return model_version, canonical.tobytes()
+
+    def get(self, key):
+        """Renvoie la valeur en cache ou None (entrée absente ou expirée)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self.clock():
+                    self._entries.move_to_end(key)
+                    self._record(self.hits)
+                    return value
+                del self._entries[key]
+                self._record_eviction("ttl")
+                self._update_size()
+            self._record(self.misses)
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._record_eviction("lru")
+            self._update_size()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._update_size()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _record(self, counter):
+        if counter is not None:
+            counter.inc()
+
+    def _record_eviction(self, reason):
+        if self.evictions is not None:
+            self.evictions.labels(reason=reason).inc()
+
+    def _update_size(self):
+        if self.size is not None:
+            self.size.set(len(self._entries))
@@ -0,0 +1,217 @@
+import numpy as np
+
+from api.validation import iter_file_chunks
+
+
+class CentroidAssigner:
+    """Affectation au centroïde le plus proche, utilisable directement comme modèle servi.
+
+    Distances calculées par `‖x‖² - 2·x·c + ‖c‖²` : un produit matriciel
+    (n, d) x (d, k) par bloc au lieu d'un tenseur (n, k, d). Expose `predict`
+    (et pas `predict_proba`) : `score_matrix` renvoie donc le cluster seul.
+    """
+
+    def __init__(self, centers, columns, chunk_rows=1_000_000):
+        self.cluster_centers_ = np.ascontiguousarray(centers, dtype=np.float64)
+        self.columns = list(columns)
+        self.feature_names_in_ = np.asarray(self.columns, dtype=object)
+        self.classes_ = np.arange(len(self.cluster_centers_))
+        self.chunk_rows = chunk_rows
+        self._center_norms = np.einsum("ij,ij->i", self.cluster_centers_, self.cluster_centers_)
+
+    @property
+    def n_clusters(self):
+        return len(self.cluster_centers_)
+
+    def _distances(self, X):
+        """Distances euclidiennes au carré (n, k)"""
+        distances = X @ (-2 * self.cluster_centers_.T)
+        distances += self._center_norms
+        distances += np.einsum("ij,ij->i", X, X)[:, None]
+        return np.maximum(distances, 0, out=distances)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) <= self.chunk_rows:
+            return self._distances(X).argmin(axis=1)
+        labels = np.empty(len(X), dtype=np.int64)
+        for start in range(0, len(X), self.chunk_rows):
+            labels[start:start + self.chunk_rows] = self._distances(X[start:start + self.chunk_rows]).argmin(axis=1)
+        return labels
+
+    def inertia(self, X):
+        """Somme des distances au carré au centroïde affecté"""
+        X = np.asarray(X, dtype=np.float64)
+        return float(self._distances(X).min(axis=1).sum())
+
+    def relabel(self, order):
+        """Réordonne les clusters : le nouveau cluster i est l'ancien `order[i]`"""
+        return CentroidAssigner(self.cluster_centers_[order], self.columns, self.chunk_rows)
+
+
+def read_matrix(path, columns, chunk_rows=100_000):
+    """Charge les colonnes dans une seule matrice float64, bloc par bloc (sans copie DataFrame complète)"""
+    blocks = [chunk[columns].to_numpy(dtype=np.float64) for chunk, _ in iter_file_chunks(path, chunk_rows)]
+    return np.concatenate(blocks) if blocks else np.empty((0, len(columns)))
+
+
+def sample_rows(path, columns, size, seed=42, chunk_rows=100_000):
+    """Échantillon uniforme de `size` lignes en une passe (clés aléatoires, on garde les plus petites)"""
+    rng = np.random.default_rng(seed)
+    rows = np.empty((0, len(columns)))
+    keys = np.empty(0)
+    total = 0
+    for chunk, _ in iter_file_chunks(path, chunk_rows):
+        values = chunk[columns].to_numpy(dtype=np.float64)
+        total += len(values)
+        rows = np.concatenate([rows, values])
+        keys = np.concatenate([keys, rng.random(len(values))])
+        if len(keys) > size:
+            keep = np.argpartition(keys, size - 1)[:size]
+            rows, keys = rows[keep], keys[keep]
+    return rows, total
+
+
+def stratified_sample(labels, size, seed=42, min_per_cluster=2):
+    """Indices d'un échantillon stratifié par cluster (proportionnel, avec un minimum par cluster)"""
+    rng = np.random.default_rng(seed)
+    clusters, counts = np.unique(labels, return_counts=True)
+    if len(labels) <= size:
+        return np.arange(len(labels))
+    quotas = np.maximum(np.round(counts / len(labels) * size).astype(int), min_per_cluster)
+    indexes = [
+        rng.choice(np.flatnonzero(labels == cluster), min(quota, count), replace=False)
+        for cluster, quota, count in zip(clusters, quotas, counts)
+    ]
+    return np.sort(np.concatenate(indexes))
+
+
+def sampled_silhouette(X, labels, size=10_000, seed=42):
+    """Silhouette sur un échantillon stratifié : O(size²) au lieu de O(n²)"""
+    from sklearn.metrics import silhouette_score
+
+    if len(np.unique(labels)) < 2:
+        return None
+    index = stratified_sample(labels, size, seed)
+    return float(silhouette_score(X[index], labels[index]))
+
+
+def fit_kmeans(k, path=None, X=None, columns=None, mode="full", chunk_rows=100_000, batch_size=4096,
+               epochs=3, seed=42):
+    """Ajuste K-Means (matrice en mémoire) ou MiniBatch K-Means (fichier lu en flux, `epochs` passes)"""
+    if mode == "full":
+        from sklearn.cluster import KMeans
+
+        X = read_matrix(path, columns, chunk_rows) if X is None else X
+        kmeans = KMeans(n_clusters=k, random_state=seed, n_init=10).fit(X)
+        return CentroidAssigner(kmeans.cluster_centers_, columns)
+
+    from sklearn.cluster import MiniBatchKMeans
+
+    kmeans = MiniBatchKMeans(n_clusters=k, random_state=seed, batch_size=batch_size, n_init=3)
+    for _ in range(epochs):
+        if X is not None:
+            chunks = (X[start:start + chunk_rows] for start in range(0, len(X), chunk_rows))
+        else:
+            chunks = (chunk[columns].to_numpy(dtype=np.float64) for chunk, _ in iter_file_chunks(path, chunk_rows))
+        for block in chunks:
+            for start in range(0, len(block), batch_size):
+                batch = block[start:start + batch_size]
+                # partial_fit initialise les centres sur le premier lot : il doit contenir au moins k lignes
+                if len(batch) >= k or hasattr(kmeans, "cluster_centers_"):
+                    kmeans.partial_fit(batch)
+    return CentroidAssigner(kmeans.cluster_centers_, columns)
+
+
+def streamed_inertia(assigner, path=None, X=None, chunk_rows=100_000):
+    if X is not None:
+        return sum(assigner.inertia(X[start:start + chunk_rows]) for start in range(0, len(X), chunk_rows))
+    return sum(
+        assigner.inertia(chunk[assigner.columns].to_numpy(dtype=np.float64))
+        for chunk, _ in iter_file_chunks(path, chunk_rows)
+    )
+
+
+def evaluate_k(k, sample, path=None, X=None, columns=None, mode="full", chunk_rows=100_000, batch_size=4096,
+               epochs=3, seed=42, silhouette_size=10_000):
+    """Ajuste un k et renvoie (assigneur, inertie sur toutes les lignes, silhouette échantillonnée)"""
+    assigner = fit_kmeans(k, path, X, columns, mode, chunk_rows, batch_size, epochs, seed)
+    inertia = streamed_inertia(assigner, path, X, chunk_rows)
+    silhouette = sampled_silhouette(sample, assigner.predict(sample), silhouette_size, seed)
+    return assigner, inertia, silhouette
+
+
+def sweep_k(ks, path=None, X=None, columns=None, mode="full", n_jobs=-1, chunk_rows=100_000, batch_size=4096,
+            epochs=3, seed=42, silhouette_size=10_000):
+    """Balaye plusieurs k en parallèle (un processus par k).
+
+    L'échantillon servant à la silhouette est tiré une seule fois et partagé ;
+    en mode "minibatch" chaque worker relit le fichier en flux, la mémoire
+    reste bornée par `chunk_rows` quelle que soit la taille des données.
+    """
+    from joblib import Parallel, delayed
+
+    if X is not None:
+        rng = np.random.default_rng(seed)
+        sample = X[rng.choice(len(X), min(len(X), 4 * silhouette_size), replace=False)]
+    else:
+        sample, _ = sample_rows(path, columns, 4 * silhouette_size, seed, chunk_rows)
+
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(evaluate_k)(k, sample, path, X, columns, mode, chunk_rows, batch_size, epochs, seed, silhouette_size)
+        for k in ks
+    )
+    return {
+        k: {"assigner": assigner, "inertia": inertia, "silhouette": silhouette}
+        for k, (assigner, inertia, silhouette) in zip(ks, results)
+    }
+
+
+def align_labels(assigner, reference_centers):
+    """Renumérote les clusters pour suivre ceux d'un clustering précédent (affectation hongroise).
+
+    Les labels servis par l'API gardent ainsi leur sens (ex. « risque élevé »)
+    d'une exécution à l'autre.
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    reference_centers = np.asarray(reference_centers, dtype=np.float64)
+    if reference_centers.shape != assigner.cluster_centers_.shape:
+        return assigner
+    costs = ((reference_centers[:, None, :] - assigner.cluster_centers_[None, :, :]) ** 2).sum(axis=2)
+    _, order = linear_sum_assignment(costs)
+    return assigner.relabel(order)
+
+
+def write_clustered(path, output, assigner, label_column="Cluster", chunk_rows=100_000):
+    """Écrit l'entrée complétée de la colonne de cluster, bloc par bloc (équivalent de Clustered_Data.csv).
+
+    Sortie CSV, ou Parquet (un row group par bloc) si `output` finit par .parquet.
+    """
+    import os
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    parquet = output.lower().endswith((".parquet", ".pq"))
+    rows = 0
+    counts = np.zeros(assigner.n_clusters, dtype=np.int64)
+    tmp_path = output + ".tmp"
+    writer = None
+    with open(tmp_path, "wb" if parquet else "w", **({} if parquet else {"encoding": "utf-8", "newline": ""})) as handle:
+        for chunk, start_row in iter_file_chunks(path, chunk_rows):
+            labels = assigner.predict(chunk[assigner.columns].to_numpy(dtype=np.float64))
+            chunk[label_column] = labels
+            if parquet:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                writer = writer or pq.ParquetWriter(handle, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(handle, index=False, header=start_row == 0)
+            counts += np.bincount(labels, minlength=assigner.n_clusters)
+            rows += len(chunk)
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, output)
+    return rows, counts
@@ -0,0 +1,192 @@
+import json
+
+import numpy as np
+
+# Formats négociés par Content-Type (requête) et Accept (réponse)
+JSON_MEDIA_TYPE = "application/json"
+NUMPY_MEDIA_TYPE = "application/x-numpy"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+NUMPY_DTYPES = {"float32": np.dtype("<f4"), "float64": np.dtype("<f8")}
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - repli sur json si orjson n'est pas installé
+    orjson = None
+
+
+class DecodeError(ValueError):
+    """Corps binaire illisible ou incohérent avec les features du modèle"""
+
+
+def dumps(content):
+    """Encodage JSON rapide (orjson, tableaux NumPy natifs) avec repli sur json"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content).encode()
+
+
+def media_type(header):
+    """Type MIME sans paramètres, en minuscules"""
+    return (header or JSON_MEDIA_TYPE).split(";")[0].strip().lower()
+
+
+def media_params(header):
+    params = {}
+    for part in (header or "").split(";")[1:]:
+        key, _, value = part.partition("=")
+        params[key.strip().lower()] = value.strip().strip('"')
+    return params
+
+
+def request_format(content_type):
+    """"numpy", "arrow" ou "json" selon le Content-Type"""
+    kind = media_type(content_type)
+    if kind == NUMPY_MEDIA_TYPE:
+        return "numpy"
+    if kind == ARROW_MEDIA_TYPE:
+        return "arrow"
+    return "json"
+
+
+def response_format(accept):
+    """Premier format binaire demandé par l'en-tête Accept, sinon JSON"""
+    for item in (accept or "").split(","):
+        kind = media_type(item)
+        if kind == NUMPY_MEDIA_TYPE:
+            return "numpy"
+        if kind == ARROW_MEDIA_TYPE:
+            return "arrow"
+    return "json"
+
+
+def _reorder(X, columns, layout):
+    if columns is None or tuple(columns) == tuple(layout.columns):
+        return X
+    missing = [col for col in layout.columns if col not in columns]
+    if missing:
+        raise DecodeError(f"Colonnes manquantes : {missing}")
+    return X[:, [columns.index(col) for col in layout.columns]]
+
+
+def decode_numpy(body, content_type, layout):
+    """Buffer row-major float32/float64 (little-endian) ; `columns=` optionnel dans le Content-Type.
+
+    Ex. `application/x-numpy; dtype=float32; columns=Pregnancies,Glucose,...`.
+    """
+    params = media_params(content_type)
+    dtype = NUMPY_DTYPES.get(params.get("dtype", "float64"))
+    if dtype is None:
+        raise DecodeError(f"dtype non supporté : {params.get('dtype')} (float32 ou float64)")
+    columns = params["columns"].split(",") if params.get("columns") else None
+    n_features = len(columns) if columns else layout.n_features
+    row_bytes = n_features * dtype.itemsize
+    if not body or len(body) % row_bytes:
+        raise DecodeError(f"Taille du corps ({len(body)} octets) non multiple d'une ligne ({row_bytes} octets)")
+    X = np.frombuffer(body, dtype=dtype).reshape(-1, n_features)
+    return np.ascontiguousarray(_reorder(X, columns, layout), dtype=layout.dtype)
+
+
+def decode_arrow(body, layout):
+    """Flux Arrow IPC : une colonne numérique par feature, lue sans passer par pandas"""
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid as e:
+        raise DecodeError(f"Flux Arrow invalide : {e}")
+    missing = [col for col in layout.columns if col not in table.column_names]
+    if missing:
+        raise DecodeError(f"Colonnes manquantes : {missing}")
+    X = np.empty((table.num_rows, layout.n_features), dtype=layout.dtype)
+    for j, col in enumerate(layout.columns):
+        column = table.column(col)
+        if not pa.types.is_integer(column.type) and not pa.types.is_floating(column.type):
+            raise DecodeError(f"Colonne {col} non numérique ({column.type})")
+        if column.null_count:
+            # Valeurs nulles -> NaN, rejetées ensuite par la validation
+            column = column.cast(pa.float64()).fill_null(np.nan)
+        X[:, j] = column.to_numpy()
+    return X
+
+
+def decode_matrix(body, content_type, layout):
+    fmt = request_format(content_type)
+    if fmt == "numpy":
+        return decode_numpy(body, content_type, layout)
+    if fmt == "arrow":
+        return decode_arrow(body, layout)
+    raise DecodeError(f"Format binaire attendu, reçu {media_type(content_type)}")
+
+
+def non_negative_errors(X, columns, loc_prefix=("body", "records"), max_errors=100):
+    """Contrainte ge=0 de `DiabetesInput` vérifiée en une passe sur la matrice décodée.
+
+    Comme Pydantic, NaN est rejeté et l'infini accepté. Les erreurs suivent le
+    format de FastAPI (`loc`, `msg`, `type`) ; au plus `max_errors` sont renvoyées.
+    `loc_prefix=None` omet l'indice de ligne (corps d'un seul enregistrement).
+    """
+    rows, cols = np.nonzero(~(X >= 0))
+    errors = []
+    for row, col in zip(rows[:max_errors].tolist(), cols[:max_errors].tolist()):
+        errors.append({
+            "type": "greater_than_equal",
+            "loc": ["body", columns[col]] if loc_prefix is None else [*loc_prefix, row, columns[col]],
+            "msg": "Input should be greater than or equal to 0",
+            "input": float(X[row, col]),
+            "ctx": {"ge": 0},
+        })
+    return errors
+
+
+def encode_results(fmt, predictions, probabilities):
+    """Résultats binaires : (corps, type MIME, en-têtes) pour "numpy" ou "arrow".
+
+    NumPy : matrice float64 row-major [prediction, proba_0, ...], colonnes
+    dans l'en-tête X-Columns. Arrow : une colonne par champ.
+    """
+    predictions = np.asarray(predictions).reshape(-1)
+    columns = ["prediction"]
+    if probabilities is not None:
+        probabilities = np.asarray(probabilities).reshape(len(predictions), -1)
+        columns += [f"proba_{k}" for k in range(probabilities.shape[1])]
+
+    if fmt == "numpy":
+        out = np.empty((len(predictions), len(columns)), dtype="<f8")
+        out[:, 0] = predictions
+        if probabilities is not None:
+            out[:, 1:] = probabilities
+        media = f"{NUMPY_MEDIA_TYPE}; dtype=float64; columns={','.join(columns)}"
+        return out.tobytes(), media, {"X-Columns": ",".join(columns)}
+
+    import pyarrow as pa
+
+    arrays = [pa.array(predictions.astype(np.int64))]
+    if probabilities is not None:
+        arrays += [pa.array(probabilities[:, k]) for k in range(probabilities.shape[1])]
+    sink = pa.BufferOutputStream()
+    batch = pa.record_batch(arrays, names=columns)
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes(), ARROW_MEDIA_TYPE, {}
+
+
+def request_body_schema(model):
+    """Schéma OpenAPI du corps pour les routes qui lisent la requête brute (JSON + formats binaires)"""
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+    content = {JSON_MEDIA_TYPE: {"schema": _inline(schema, definitions)}}
+    content[NUMPY_MEDIA_TYPE] = {"schema": {"type": "string", "format": "binary"}}
+    content[ARROW_MEDIA_TYPE] = {"schema": {"type": "string", "format": "binary"}}
+    return {"requestBody": {"required": True, "content": content}}
+
+
+def _inline(node, definitions):
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if ref and ref.startswith("#/$defs/"):
+            return _inline(definitions[ref.split("/")[-1]], definitions)
+        return {key: _inline(value, definitions) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_inline(item, definitions) for item in node]
+    return node
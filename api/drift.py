@@ -0,0 +1,178 @@
+import json
+import threading
+from collections import deque
+
+import numpy as np
+
+# Plancher des proportions de bin : évite log(0) dans le PSI
+PSI_EPSILON = 1e-4
+
+
+def build_reference(frame, columns, bins=10):
+    """Profil de référence : bornes de bins équi-populées et proportions par feature.
+
+    `frame` est un DataFrame (ex. data/raw) dans l'échelle des entrées de /predict.
+    """
+    reference = {"bins": bins, "columns": {}}
+    for col in columns:
+        values = frame[col].dropna().to_numpy(dtype=np.float64)
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        reference["columns"][col] = {
+            "edges": edges.tolist(),
+            "proportions": (counts / counts.sum()).tolist(),
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+        }
+    return reference
+
+
+def load_reference(path, columns, bins=10):
+    """Charge un profil JSON (scripts/build_drift_reference.py) ou le calcule depuis un CSV"""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as handle:
+            return json.load(handle)
+    import pandas as pd
+    return build_reference(pd.read_csv(path), columns, bins)
+
+
+def population_stability_index(expected, actual):
+    expected = np.clip(expected, PSI_EPSILON, None)
+    actual = np.clip(actual, PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks_statistic(expected, actual):
+    """Distance KS entre les deux distributions, évaluée aux bornes des bins"""
+    return float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+
+
+class DriftMonitor:
+    """Suivi en ligne de la distribution des features reçues par l'API.
+
+    Le chemin de requête ne fait qu'ajouter la matrice déjà construite au
+    tampon (un compteur de lignes sous verrou, sans calcul). Un thread de fond vide le
+    tampon toutes les `interval_seconds` secondes et met à jour, en mémoire
+    constante : moyenne/variance par Welford (fusion de lots de Chan) et
+    histogrammes sur les bins de la référence. Les deux sont amortis par
+    `decay` à chaque évaluation (poids des lignes passées multiplié par
+    `decay`) : moyenne, écart-type, PSI et KS décrivent le même trafic récent
+    (`decay=1` : depuis le démarrage). PSI et KS sont ensuite exportés par
+    feature. Le tampon est borné en lignes (`buffer_rows`) : au-delà, les
+    nouvelles lignes sont ignorées et comptées (`dropped`) plutôt que de
+    ralentir l'inférence ou de faire croître la mémoire.
+    """
+
+    def __init__(self, columns, reference, interval_seconds=30.0, decay=0.5, min_samples=100,
+                 buffer_rows=100_000, psi=None, ks=None, mean=None, stddev=None, samples=None, dropped=None):
+        self.columns = list(columns)
+        self.interval = interval_seconds
+        self.decay = decay
+        self.min_samples = min_samples
+        specs = [reference["columns"][col] for col in self.columns]
+        self.edges = [np.asarray(spec["edges"], dtype=np.float64) for spec in specs]
+        self.expected = [np.asarray(spec["proportions"], dtype=np.float64) for spec in specs]
+        self.psi, self.ks, self.mean_gauge, self.stddev_gauge, self.samples = psi, ks, mean, stddev, samples
+        self.dropped = dropped
+        self.buffer_rows = buffer_rows
+
+        n_features = len(self.columns)
+        # Poids (amorti) des lignes dans moyenne/variance ; `observed` compte les lignes depuis le démarrage
+        self.count = 0.0
+        self.observed = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.histograms = [np.zeros(len(expected)) for expected in self.expected]
+        self.scores = {}
+        self._buffer = deque()
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def observe(self, rows):
+        """Chemin chaud : enregistre une matrice (n, n_features) de features, ou la compte comme ignorée"""
+        n = len(rows)
+        with self._lock:
+            accepted = self._buffered + n <= self.buffer_rows
+            if accepted:
+                self._buffer.append(rows)
+                self._buffered += n
+        if not accepted and self.dropped is not None:
+            self.dropped.inc(n)
+        return accepted
+
+    def _drain(self):
+        with self._lock:
+            pending = list(self._buffer)
+            self._buffer.clear()
+            self._buffered = 0
+        return np.vstack(pending) if pending else None
+
+    def update(self, X):
+        """Intègre un lot de lignes (Welford/Chan et histogrammes)"""
+        n = X.shape[0]
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.observed += n
+        for j, edges in enumerate(self.edges):
+            self.histograms[j] += np.bincount(
+                np.searchsorted(edges, X[:, j], side="right"), minlength=len(edges) + 1
+            )
+
+    def evaluate(self):
+        """Vide le tampon, met à jour les statistiques et recalcule les scores de dérive"""
+        X = self._drain()
+        if X is not None:
+            self.update(X.astype(np.float64, copy=False))
+
+        std = np.sqrt(self.m2 / self.count) if self.count else np.zeros(len(self.columns))
+        for j, col in enumerate(self.columns):
+            histogram = self.histograms[j]
+            weight = histogram.sum()
+            if weight >= self.min_samples:
+                actual = histogram / weight
+                self.scores[col] = {
+                    "psi": population_stability_index(self.expected[j], actual),
+                    "ks": ks_statistic(self.expected[j], actual),
+                }
+                if self.psi is not None:
+                    self.psi.labels(feature=col).set(self.scores[col]["psi"])
+                if self.ks is not None:
+                    self.ks.labels(feature=col).set(self.scores[col]["ks"])
+            if self.count:
+                if self.mean_gauge is not None:
+                    self.mean_gauge.labels(feature=col).set(self.mean[j])
+                if self.stddev_gauge is not None:
+                    self.stddev_gauge.labels(feature=col).set(std[j])
+            # Amortissement : le poids du trafic ancien diminue à chaque évaluation
+            histogram *= self.decay
+        # Même amortissement pour moyenne/variance (la moyenne est inchangée, seul son poids diminue)
+        self.count *= self.decay
+        self.m2 *= self.decay
+        if self.samples is not None:
+            self.samples.set(self.observed)
+        return self.scores
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.evaluate()
+            except Exception as e:
+                print(f"⚠️  Drift evaluation failed: {e}")
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,61 @@
+import operator
+from itertools import chain
+
+import numpy as np
+
+
+class FeatureLayout:
+    """Disposition précompilée des features d'entrée du modèle.
+
+    Construite une fois au chargement du modèle, elle écrit les champs validés
+    d'un ou plusieurs `DiabetesInput` directement dans un buffer NumPy contigu
+    (C-order) dans l'ordre attendu par l'estimateur, sans passer par pandas.
+    """
+
+    def __init__(self, columns, dtype=np.float64):
+        self.columns = tuple(columns)
+        self.dtype = np.dtype(dtype)
+        self.n_features = len(self.columns)
+        getter = operator.attrgetter(*self.columns)
+        # attrgetter avec une seule colonne ne renvoie pas de tuple
+        self._getter = getter if self.n_features > 1 else (lambda record: (getter(record),))
+
+    @classmethod
+    def from_model(cls, default_columns, estimator=None, pyfunc_model=None, dtype=np.float64):
+        """Déduit l'ordre des colonnes de l'estimateur ou de la signature MLflow"""
+        columns = None
+        feature_names = getattr(estimator, "feature_names_in_", None)
+        if isinstance(feature_names, np.ndarray):
+            columns = [str(name) for name in feature_names]
+        elif pyfunc_model is not None:
+            try:
+                columns = pyfunc_model.metadata.get_input_schema().input_names()
+            except Exception:
+                columns = None
+
+        if not columns or set(columns) != set(default_columns):
+            columns = default_columns
+        return cls(columns, dtype=dtype)
+
+    def row(self, record):
+        """Écrit un enregistrement dans une nouvelle matrice (1, n_features).
+
+        Pas de buffer réutilisé : la matrice survit à la requête (file du
+        micro-batcher, journal des prédictions, moniteur de dérive, shadow).
+        """
+        out = np.empty((1, self.n_features), dtype=self.dtype)
+        out[0] = self._getter(record)
+        return out
+
+    def matrix(self, records):
+        """Écrit une liste d'enregistrements dans une matrice (n, n_features)"""
+        n = len(records)
+        values = chain.from_iterable(map(self._getter, records))
+        return np.fromiter(values, dtype=self.dtype, count=n * self.n_features).reshape(n, self.n_features)
+
+    def reorder(self, X, columns):
+        """Réordonne une matrice construite dans l'ordre `columns` vers l'ordre de cette disposition"""
+        if tuple(columns) == self.columns:
+            return X
+        columns = list(columns)
+        return X[:, [columns.index(col) for col in self.columns]]
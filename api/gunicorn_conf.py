@@ -0,0 +1,82 @@
+"""Configuration gunicorn du mode multi-workers.
+
+    gunicorn -c api/gunicorn_conf.py api.main:app
+
+Le processus maître importe l'application et charge le modèle une seule fois
+(`preload_app`), puis forke les workers uvicorn : les tableaux du modèle sont
+partagés copy-on-write au lieu d'être dupliqués dans chaque worker. Les
+métriques Prometheus sont écrites dans PROMETHEUS_MULTIPROC_DIR et agrégées
+par `/metrics` sur l'ensemble des workers (le répertoire est positionné ici
+et non dans l'image : uvicorn ou pytest lancés seuls gardent le registre
+Prometheus d'un processus unique).
+
+Avec MODEL_POLL_INTERVAL_SECONDS > 0, seul le maître interroge le registre :
+une nouvelle version y est chargée et préchauffée, puis les workers sont
+remplacés un par un (arrêt gracieux) par des workers forkés avec le nouveau
+modèle, toujours partagé copy-on-write.
+"""
+import os
+import shutil
+import signal
+import time
+
+# Doit être positionné avant le premier import de prometheus_client (preload)
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+_multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+
+# Les fichiers d'une exécution précédente fausseraient les compteurs agrégés
+shutil.rmtree(_multiproc_dir, ignore_errors=True)
+os.makedirs(_multiproc_dir, exist_ok=True)
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("PRELOAD_APP", "true").lower() in ("1", "true", "yes")
+timeout = int(os.getenv("WORKER_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+
+def when_ready(server):
+    """Maître : charge le modèle avant de forker les workers"""
+    if not server.cfg.preload_app:
+        return
+    import api.main
+
+    api.main.preload_model()
+    server.log.info("Model preloaded in master process, forking %s workers", server.cfg.workers)
+
+    if api.main.model_preloaded and api.main.registry_poller_enabled():
+        api.main.build_registry_poller().start_thread(on_swap=lambda version: roll_workers(server))
+        server.log.info("Registry polling in master process (every %ss)", api.main.MODEL_POLL_INTERVAL_SECONDS)
+
+
+def roll_workers(server):
+    """Maître : remplace les workers un par un après un changement de modèle.
+
+    `gc.freeze()` garde les pages du nouveau modèle partagées ; chaque worker
+    reçoit SIGTERM (fin des requêtes en cours) et l'arbitre en forke un
+    nouveau avant que le suivant ne soit arrêté.
+    """
+    import gc
+
+    gc.freeze()
+    for pid in list(server.WORKERS):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            continue
+        deadline = time.monotonic() + graceful_timeout + timeout
+        while time.monotonic() < deadline:
+            workers = list(server.WORKERS)
+            if pid not in workers and len(workers) >= server.num_workers:
+                break
+            time.sleep(0.5)
+    server.log.info("Workers restarted on the new model")
+
+
+def child_exit(server, worker):
+    """Retire les jauges `live*` d'un worker arrêté de l'agrégat"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
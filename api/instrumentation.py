@@ -0,0 +1,154 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class MetricsMiddleware:
+    """Middleware ASGI pur pour les métriques de requêtes.
+
+    Remplace `@app.middleware("http")` (BaseHTTPMiddleware) : pas de tâche ni
+    de flux intermédiaire par requête. Les labels utilisent le template de
+    route (`/predict`, pas l'URL brute) pour borner la cardinalité, et la
+    jauge des requêtes actives est décrémentée même si le handler lève.
+    """
+
+    def __init__(self, app, request_count, request_latency, active_requests):
+        self.app = app
+        self.request_count = request_count
+        self.request_latency = request_latency
+        self.active_requests = active_requests
+        self._endpoint_paths = None
+
+    def _route_template(self, scope):
+        path = getattr(scope.get("route"), "path", None)
+        if path is not None:
+            return path
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._endpoint_paths is None:
+            self._endpoint_paths = {
+                getattr(route, "endpoint", None): route.path
+                for route in getattr(scope.get("app"), "routes", [])
+            }
+        return self._endpoint_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.active_requests.inc()
+        start_time = time.perf_counter()
+        scope.setdefault("state", {})["request_start"] = start_time
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            endpoint = self._route_template(scope)
+            method = scope["method"]
+            self.request_count.labels(method=method, endpoint=endpoint, status=status_code).inc()
+            self.request_latency.labels(method=method, endpoint=endpoint).observe(duration)
+            self.active_requests.dec()
+
+
+# Feuilles correspondant à un thread bloqué en attente (pool inactif, boucle asyncio)
+IDLE_LEAVES = {"threading.py:wait", "selectors.py:select", "threading.py:_wait_for_tstate_lock"}
+
+
+def _collapse(frame):
+    """Pile d'appels au format « folded » (racine;...;feuille) utilisé par les flamegraphs"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Profileur par échantillonnage activable à chaud.
+
+    Un thread démon relève toutes les `interval` secondes la pile de chaque
+    thread (`sys._current_frames`) et agrège les piles identiques, en ignorant
+    les threads inactifs. Le coût est nul tant qu'il est arrêté et
+    proportionnel à la fréquence sinon.
+    """
+
+    def __init__(self, output_dir="/tmp"):
+        self.output_dir = output_dir
+        self.samples = Counter()
+        self.n_samples = 0
+        self.interval = None
+        self.started_at = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval=0.005):
+        with self._lock:
+            if self.running:
+                return False
+            self.samples = Counter()
+            self.n_samples = 0
+            self.interval = interval
+            self.started_at = time.time()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = _collapse(frame)
+                if stack.rsplit(";", 1)[-1] not in IDLE_LEAVES:
+                    self.samples[stack] += 1
+            self.n_samples += 1
+
+    def stop(self, top=20):
+        """Arrête l'échantillonnage, écrit les piles agrégées et renvoie un résumé"""
+        with self._lock:
+            if self._thread is None:
+                return None
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"profile-{int(self.started_at)}.folded")
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in self.samples.most_common():
+                handle.write(f"{stack} {count}\n")
+
+        # Temps propre par fonction feuille : où le CPU est réellement passé
+        leaves = Counter()
+        for stack, count in self.samples.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return {
+            "duration_seconds": round(time.time() - self.started_at, 3),
+            "sampling_rounds": self.n_samples,
+            "file": path,
+            "top_functions": [
+                {"function": name, "samples": count, "share": round(count / total, 4)}
+                for name, count in leaves.most_common(top)
+            ],
+        }
@@ -1,11 +1,45 @@
-import mlflow.pyfunc
-from fastapi import FastAPI, HTTPException, Request
-from pydantic import BaseModel, Field
-import pandas as pd
 import time
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+
+# Début de la phase d'import (mlflow et pandas sont importés à la demande)
+_IMPORT_START = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional
+import numpy as np
+import gc
+from contextlib import nullcontext
+import json
+import os
+import sys
+import warnings
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, Gauge, generate_latest, multiprocess, CONTENT_TYPE_LATEST
+)
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import Response
 
+from api.batching import MicroBatcher
+from api.bulk import DuplexStreamingResponse, detect_format, iter_body_lines, parse_header, score_lines
+from api.cache import PredictionCache
+from api.codecs import (
+    DecodeError, decode_matrix, dumps, encode_results, non_negative_errors, request_body_schema,
+    request_format, response_format
+)
+from api.features import FeatureLayout
+from api.registry import ModelRegistryPoller, build_warmup_rows, resolve_model_version
+from api.artifacts import load_bundle
+from api.preprocessing import load_preprocessor
+from api.admission import AdaptiveConcurrencyLimiter, AdmissionRejected
+from api.validation import FEATURE_RANGES, ChunkValidator
+from api.drift import DriftMonitor, load_reference
+from api.prediction_log import PredictionLogger
+from api.shadow import Candidate, ShadowScorer
+from api.instrumentation import MetricsMiddleware, SamplingProfiler
+
+IMPORT_DURATION = time.perf_counter() - _IMPORT_START
+
 
 app = FastAPI(
     title="Diabetes Prediction API",
@@ -13,6 +47,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Mode multi-workers (api/gunicorn_conf.py) : métriques agrégées sur tous les processus.
+# Les jauges précisent leur agrégation (`multiprocess_mode`), ignorée en mono-processus.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+
 REQUEST_COUNT = Counter(
     'api_requests_total',
     'Total number of API requests',
@@ -43,45 +81,311 @@ INFERENCE_TIME = Histogram(
     buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
 )
 
+# Taille maximale d'un lot accepté par /predict/batch
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+
+# Renvoi de l'entrée dans la réponse de /predict (surchargeable par ?include_input=)
+RESPONSE_ECHO_INPUT = os.getenv("RESPONSE_ECHO_INPUT", "true").lower() in ("1", "true", "yes")
+
+BATCH_SIZE_BUCKETS = [1, 10, 50, 100, 250, 500, 1000, 5000, 10000]
+
+BATCH_SIZE = Histogram(
+    'prediction_batch_size',
+    'Number of records scored per batch request',
+    buckets=BATCH_SIZE_BUCKETS
+)
+
+BATCH_INFERENCE_TIME = Histogram(
+    'model_batch_inference_duration_seconds',
+    'Model inference time per batch in seconds, by batch size bucket',
+    ['batch_size'],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+)
+
+# Type du buffer de features (float32 évite la conversion interne des modèles à arbres)
+FEATURE_DTYPE = np.dtype(os.getenv("FEATURE_DTYPE", "float64"))
+
+# Moteur d'inférence : "sklearn" (par défaut) ou "compiled" (arbres compilés en tableaux NumPy)
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "sklearn").lower()
+
+# Contrôle vectorisé des bornes de plausibilité sur /predict/batch (opt-in)
+ENABLE_RANGE_VALIDATION = os.getenv("ENABLE_RANGE_VALIDATION", "false").lower() in ("1", "true", "yes")
+
+# Nombre de lignes scorées par bloc sur /predict/stream
+BULK_CHUNK_ROWS = int(os.getenv("BULK_CHUNK_ROWS", "1000"))
+
+# Micro-batching serveur (opt-in) des appels /predict concurrents
+ENABLE_MICRO_BATCHING = os.getenv("ENABLE_MICRO_BATCHING", "false").lower() in ("1", "true", "yes")
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "2"))
+
+MICRO_BATCH_QUEUE_DEPTH = Gauge(
+    'microbatch_queue_depth',
+    'Number of /predict requests waiting in the micro-batching queue',
+    multiprocess_mode='livesum'
+)
+
+MICRO_BATCH_SIZE = Histogram(
+    'microbatch_size',
+    'Number of /predict requests coalesced per micro-batch',
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256]
+)
+
+MICRO_BATCH_QUEUE_DELAY = Histogram(
+    'microbatch_queue_delay_seconds',
+    'Time a /predict request waits in the micro-batching queue before scoring',
+    buckets=[0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1]
+)
+
+# Cache des prédictions (désactivé si PREDICTION_CACHE_SIZE=0)
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "0"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "300"))
+
+CACHE_HITS = Counter(
+    'prediction_cache_hits_total',
+    'Number of /predict requests served from the prediction cache'
+)
+
+CACHE_MISSES = Counter(
+    'prediction_cache_misses_total',
+    'Number of /predict requests not found in the prediction cache'
+)
+
+CACHE_EVICTIONS = Counter(
+    'prediction_cache_evictions_total',
+    'Number of prediction cache entries evicted',
+    ['reason']
+)
+
+CACHE_SIZE = Gauge(
+    'prediction_cache_size',
+    'Number of entries currently in the prediction cache',
+    multiprocess_mode='livesum'
+)
+
+# Contrôle d'admission adaptatif de /predict (opt-in)
+ENABLE_ADMISSION_CONTROL = os.getenv("ENABLE_ADMISSION_CONTROL", "false").lower() in ("1", "true", "yes")
+ADMISSION_INITIAL_LIMIT = int(os.getenv("ADMISSION_INITIAL_LIMIT", "32"))
+ADMISSION_MIN_LIMIT = int(os.getenv("ADMISSION_MIN_LIMIT", "2"))
+ADMISSION_MAX_LIMIT = int(os.getenv("ADMISSION_MAX_LIMIT", "256"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "250"))
+ADMISSION_TARGET_LATENCY_MS = float(os.getenv("ADMISSION_TARGET_LATENCY_MS", "100"))
+ADMISSION_RETRY_AFTER_SECONDS = os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1")
+
+ADMISSION_SHED = Counter(
+    'admission_shed_total',
+    'Number of /predict requests rejected by admission control',
+    ['reason']
+)
+
+ADMISSION_LIMIT = Gauge(
+    'admission_concurrency_limit',
+    'Current adaptive concurrency limit for /predict inference',
+    multiprocess_mode='livesum'
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    'admission_queue_depth',
+    'Number of /predict requests waiting for an inference slot',
+    multiprocess_mode='livesum'
+)
+
+# Suivi de dérive des features reçues (opt-in), calculé hors du chemin de requête
+ENABLE_DRIFT_MONITOR = os.getenv("ENABLE_DRIFT_MONITOR", "false").lower() in ("1", "true", "yes")
+DRIFT_REFERENCE_PATH = os.getenv("DRIFT_REFERENCE_PATH", "data/raw/dataset-diabete-68e2810ab0d7e949117525.csv")
+DRIFT_INTERVAL_SECONDS = float(os.getenv("DRIFT_INTERVAL_SECONDS", "30"))
+DRIFT_DECAY = float(os.getenv("DRIFT_DECAY", "0.5"))
+DRIFT_MIN_SAMPLES = int(os.getenv("DRIFT_MIN_SAMPLES", "100"))
+DRIFT_BUFFER_ROWS = int(os.getenv("DRIFT_BUFFER_ROWS", "100000"))
+
+FEATURE_DRIFT_PSI = Gauge(
+    'feature_drift_psi',
+    'Population stability index of recent /predict inputs against the reference profile (per worker)',
+    ['feature'],
+    multiprocess_mode='liveall'
+)
+
+FEATURE_DRIFT_KS = Gauge(
+    'feature_drift_ks',
+    'Kolmogorov-Smirnov distance of recent /predict inputs against the reference profile (per worker)',
+    ['feature'],
+    multiprocess_mode='liveall'
+)
+
+FEATURE_MEAN = Gauge(
+    'feature_input_mean',
+    'Mean of each input feature over recent traffic, decayed like the drift histograms (per worker)',
+    ['feature'],
+    multiprocess_mode='liveall'
+)
+
+FEATURE_STDDEV = Gauge(
+    'feature_input_stddev',
+    'Standard deviation of each input feature over recent traffic, decayed like the drift histograms (per worker)',
+    ['feature'],
+    multiprocess_mode='liveall'
+)
+
+DRIFT_SAMPLES = Gauge(
+    'feature_drift_observations',
+    'Number of input rows folded into the drift statistics since startup',
+    multiprocess_mode='livesum'
+)
+
+DRIFT_DROPPED = Counter(
+    'feature_drift_dropped_rows_total',
+    'Input rows not folded into the drift statistics because the buffer was full'
+)
+
+# Journal des prédictions (opt-in) : entrées, sorties, version et latence, écrit en arrière-plan
+ENABLE_PREDICTION_LOG = os.getenv("ENABLE_PREDICTION_LOG", "false").lower() in ("1", "true", "yes")
+PREDICTION_LOG_DIR = os.getenv("PREDICTION_LOG_DIR", "logs/predictions")
+PREDICTION_LOG_FORMAT = os.getenv("PREDICTION_LOG_FORMAT", "ndjson")
+PREDICTION_LOG_MAX_QUEUE = int(os.getenv("PREDICTION_LOG_MAX_QUEUE", "100000"))
+PREDICTION_LOG_DROP_POLICY = os.getenv("PREDICTION_LOG_DROP_POLICY", "drop_newest")
+PREDICTION_LOG_MAX_FILE_MB = float(os.getenv("PREDICTION_LOG_MAX_FILE_MB", "64"))
+PREDICTION_LOG_ROTATE_SECONDS = float(os.getenv("PREDICTION_LOG_ROTATE_SECONDS", "3600"))
+
+PREDICTION_LOG_WRITTEN = Counter(
+    'prediction_log_records_total',
+    'Number of prediction records written to the prediction log'
+)
+
+PREDICTION_LOG_DROPPED = Counter(
+    'prediction_log_dropped_total',
+    'Number of prediction log rows dropped because the queue was full'
+)
+
+PREDICTION_LOG_QUEUE_DEPTH = Gauge(
+    'prediction_log_queue_depth',
+    'Number of prediction log rows waiting to be written',
+    multiprocess_mode='livesum'
+)
+
+# Versions candidates servies à côté du principal (registre ou bundles .joblib, séparées par des virgules) :
+# les shadows sont scorées en arrière-plan, la canary reçoit en plus CANARY_FRACTION du trafic
+SHADOW_MODEL_VERSIONS = [v.strip() for v in os.getenv("SHADOW_MODEL_VERSIONS", "").split(",") if v.strip()]
+CANARY_MODEL_VERSION = os.getenv("CANARY_MODEL_VERSION", "")
+CANARY_FRACTION = float(os.getenv("CANARY_FRACTION", "0.05"))
+SHADOW_WORKERS = int(os.getenv("SHADOW_WORKERS", "1"))
+SHADOW_MAX_PENDING = int(os.getenv("SHADOW_MAX_PENDING", "32"))
+
+SHADOW_AGREEMENT = Counter(
+    'shadow_predictions_total',
+    'Rows scored by a candidate version, by agreement with the primary prediction',
+    ['version', 'mode', 'result']
+)
+
+SHADOW_LATENCY_DELTA = Histogram(
+    'shadow_latency_delta_seconds',
+    'Candidate scoring latency minus primary scoring latency for the same features',
+    ['version', 'mode'],
+    buckets=[-0.05, -0.01, -0.005, -0.001, -0.0005, 0, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1]
+)
+
+SHADOW_DIVERGENCE = Histogram(
+    'shadow_probability_divergence',
+    'Total variation distance between candidate and primary class probabilities, per row',
+    ['version', 'mode'],
+    buckets=[0.001, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+)
+
+SHADOW_DROPPED = Counter(
+    'shadow_dropped_total',
+    'Shadow comparisons skipped to protect primary traffic',
+    ['version', 'reason']
+)
+
+CANARY_REQUESTS = Counter(
+    'canary_requests_total',
+    'Requests answered by a canary version instead of the primary',
+    ['version']
+)
+
+# Modèle servi et rechargement à chaud depuis le registre (désactivé si intervalle = 0)
+MODEL_NAME = "DiabetesClusterClassifier"
+MODEL_STAGE = "Production"
+MODEL_POLL_INTERVAL_SECONDS = float(os.getenv("MODEL_POLL_INTERVAL_SECONDS", "0"))
+WARMUP_DATA_PATH = os.getenv("WARMUP_DATA_PATH", "data/validation/Cleaned_Data.csv")
+
+# Bundle local pré-matérialisé (scripts/export_model_bundle.py) : démarrage sans mlflow
+MODEL_BUNDLE_PATH = os.getenv("MODEL_BUNDLE_PATH", "")
+
+# Prétraitement servi (scripts/export_preprocessor.py) : imputation KNN des zéros + mise à l'échelle.
+# Celui embarqué dans le bundle est prioritaire.
+PREPROCESSOR_PATH = os.getenv("PREPROCESSOR_PATH", "")
+
+MODEL_RELOAD_FAILURES = Counter(
+    'model_reload_failures_total',
+    'Registry versions that failed to load or warm up during hot reload'
+)
+
 # Gauges pour l'état
 MODEL_LOADED = Gauge(
     'model_loaded',
-    'Whether the ML model is loaded (1) or not (0)'
+    'Whether the ML model is loaded (1) or not (0)',
+    multiprocess_mode='livemin'
+)
+
+MODEL_VERSION = Gauge(
+    'model_version',
+    'Registry version of the model currently served',
+    multiprocess_mode='livemax'
+)
+
+MODEL_LOAD_DURATION = Gauge(
+    'model_load_duration_seconds',
+    'Time spent loading the currently served model',
+    multiprocess_mode='livemax'
+)
+
+MODEL_WARMUP_DURATION = Gauge(
+    'model_warmup_duration_seconds',
+    'Time spent warming up the currently served model',
+    multiprocess_mode='livemax'
+)
+
+STARTUP_PHASE_DURATION = Gauge(
+    'api_startup_phase_duration_seconds',
+    'Duration of each API startup phase',
+    ['phase'],
+    multiprocess_mode='livemax'
 )
 
 ACTIVE_REQUESTS = Gauge(
     'api_active_requests',
-    'Number of requests currently being processed'
+    'Number of requests currently being processed',
+    multiprocess_mode='livesum'
 )
 
 
-@app.middleware("http")
-async def monitor_requests(request: Request, call_next):
-    """Middleware pour monitorer toutes les requêtes"""
-    ACTIVE_REQUESTS.inc()
-    start_time = time.time()
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Calculate metrics
-    duration = time.time() - start_time
-    
-    # Record metrics
-    REQUEST_COUNT.labels(
-        method=request.method,
-        endpoint=request.url.path,
-        status=response.status_code
-    ).inc()
-    
-    REQUEST_LATENCY.labels(
-        method=request.method,
-        endpoint=request.url.path
-    ).observe(duration)
-    
-    ACTIVE_REQUESTS.dec()
-    
-    return response
+# Durée de chaque étape du chemin /predict (validation → sérialisation)
+STAGE_DURATION = Histogram(
+    'inference_stage_duration_seconds',
+    'Time spent in each stage of the prediction path',
+    ['stage'],
+    buckets=[0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1]
+)
+
+# Enfants pré-résolus : pas de recherche de labels sur le chemin chaud
+STAGE_VALIDATION = STAGE_DURATION.labels(stage="validation")
+STAGE_FEATURE_BUILD = STAGE_DURATION.labels(stage="feature_build")
+STAGE_PREPROCESS = STAGE_DURATION.labels(stage="preprocess")
+STAGE_PREDICT = STAGE_DURATION.labels(stage="predict")
+STAGE_PROBA = STAGE_DURATION.labels(stage="proba")
+STAGE_SERIALIZATION = STAGE_DURATION.labels(stage="serialization")
+
+# Profileur par échantillonnage pilotable à chaud (désactivé par défaut)
+ENABLE_PROFILER_ENDPOINTS = os.getenv("ENABLE_PROFILER_ENDPOINTS", "false").lower() in ("1", "true", "yes")
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", "/tmp/profiles")
+
+app.add_middleware(
+    MetricsMiddleware,
+    request_count=REQUEST_COUNT,
+    request_latency=REQUEST_LATENCY,
+    active_requests=ACTIVE_REQUESTS
+)
 
 
 class DiabetesInput(BaseModel):
@@ -110,43 +414,581 @@ class DiabetesInput(BaseModel):
         }
 
 
+class DiabetesBatchInput(BaseModel):
+    """Lot d'enregistrements patients à scorer en un seul appel"""
+    records: List[DiabetesInput] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+FEATURE_COLUMNS = [
+    'Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
+    'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'
+]
+
+
+def batch_size_label(size):
+    """Retourne le bucket de taille de lot utilisé comme label Prometheus"""
+    for bound in BATCH_SIZE_BUCKETS:
+        if size <= bound:
+            return str(bound)
+    return "+Inf"
+
+
+# Le FeatureLayout garantit l'ordre des colonnes : l'avertissement sklearn sur
+# l'absence de noms de features est donc sans objet sur le chemin ndarray
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
 model = None
+model_version = None
+model_preloaded = False
+# Prétraitement appliqué par score_matrix avant le modèle (None : features brutes)
+scaler = None
+feature_layout = FeatureLayout(FEATURE_COLUMNS, dtype=FEATURE_DTYPE)
+batcher = None
+registry_poller = None
+shadow_scorer = None
+drift_monitor = None
+prediction_logger = None
+profiler = SamplingProfiler(PROFILE_OUTPUT_DIR)
+range_validator = None
+admission = None
+if ENABLE_ADMISSION_CONTROL:
+    admission = AdaptiveConcurrencyLimiter(
+        initial_limit=ADMISSION_INITIAL_LIMIT,
+        min_limit=ADMISSION_MIN_LIMIT,
+        max_limit=ADMISSION_MAX_LIMIT,
+        max_queue=ADMISSION_MAX_QUEUE,
+        queue_timeout_ms=ADMISSION_QUEUE_TIMEOUT_MS,
+        target_latency_ms=ADMISSION_TARGET_LATENCY_MS,
+        shed=ADMISSION_SHED,
+        limit_gauge=ADMISSION_LIMIT,
+        queue_depth=ADMISSION_QUEUE_DEPTH
+    )
+prediction_cache = None
+if PREDICTION_CACHE_SIZE > 0:
+    prediction_cache = PredictionCache(
+        PREDICTION_CACHE_SIZE,
+        PREDICTION_CACHE_TTL_SECONDS,
+        hits=CACHE_HITS,
+        misses=CACHE_MISSES,
+        evictions=CACHE_EVICTIONS,
+        size=CACHE_SIZE
+    )
+
+
+def record_batch_metrics(predictions, duration):
+    """Enregistre taille de lot, durée d'inférence et prédictions par outcome"""
+    batch_size = len(predictions)
+    BATCH_SIZE.observe(batch_size)
+    BATCH_INFERENCE_TIME.labels(batch_size=batch_size_label(batch_size)).observe(duration)
+    outcomes, counts = np.unique(predictions, return_counts=True)
+    for outcome, count in zip(outcomes, counts):
+        PREDICTION_COUNT.labels(outcome=int(outcome)).inc(int(count))
+
+
+def range_validator_for(layout):
+    """Validateur de bornes aligné sur l'ordre des colonnes du modèle servi"""
+    global range_validator
+    if range_validator is None or range_validator.columns != list(layout.columns):
+        range_validator = ChunkValidator({col: FEATURE_RANGES[col] for col in layout.columns})
+    return range_validator
+
+
+def unwrap_model(pyfunc_model):
+    """Retourne l'estimateur sklearn natif derrière le wrapper pyfunc quand c'est possible"""
+    try:
+        raw_model = pyfunc_model.get_raw_model()
+    except Exception:
+        raw_model = getattr(getattr(pyfunc_model, "_model_impl", None), "sklearn_model", None)
+    return raw_model if raw_model is not None else pyfunc_model
+
+
+def score_matrix(X, estimator=None, layout=None, preprocessor=None, observe=True):
+    """Score une matrice de features (n, 8) en un seul passage sur le modèle.
+
+    Les probabilités sont calculées une seule fois et la classe en est dérivée
+    par argmax ; `predict` n'est utilisé que pour les estimateurs sans
+    probabilités (ex. SVC entraîné sans `probability=True`). Par défaut le
+    modèle actif et son prétraitement sont utilisés. `X` n'est pas modifié :
+    le prétraitement travaille sur sa propre copie (journal, cache et suivi de
+    dérive gardent les valeurs brutes). `observe=False` n'alimente pas les
+    métriques d'étapes (scoring shadow en arrière-plan).
+    """
+    if estimator is None:
+        estimator, preprocessor = model, scaler
+    layout = feature_layout if layout is None else layout
+    if preprocessor is not None:
+        preprocess_start = time.perf_counter()
+        X = preprocessor.transform(X)
+        if observe:
+            STAGE_PREPROCESS.observe(time.perf_counter() - preprocess_start)
+    pyfunc = sys.modules.get("mlflow.pyfunc")
+    if pyfunc is not None and isinstance(estimator, pyfunc.PyFuncModel):
+        # Le wrapper pyfunc attend un DataFrame conforme à la signature
+        import pandas as pd
+        X = pd.DataFrame(X, columns=layout.columns)
+    if not hasattr(estimator, "predict_proba"):
+        predict_start = time.perf_counter()
+        predictions = np.asarray(estimator.predict(X)).astype(int)
+        if observe:
+            STAGE_PREDICT.observe(time.perf_counter() - predict_start)
+        return predictions, None
+
+    # Étape "proba" : appel à predict_proba ; étape "predict" : classes dérivées par argmax
+    proba_start = time.perf_counter()
+    probabilities = np.asarray(estimator.predict_proba(X))
+    predict_start = time.perf_counter()
+    best = probabilities.argmax(axis=1)
+    classes = getattr(estimator, "classes_", None)
+    predictions = (classes.take(best) if isinstance(classes, np.ndarray) else best).astype(int)
+    if observe:
+        STAGE_PROBA.observe(predict_start - proba_start)
+        STAGE_PREDICT.observe(time.perf_counter() - predict_start)
+    return predictions, probabilities
+
+
+def score_candidate(X, estimator, layout, preprocessor):
+    """Scoring d'une version candidate, shadow ou canary (sans métriques d'étapes du modèle principal)"""
+    return score_matrix(X, estimator, layout, preprocessor, observe=False)
+
+
+def serving_estimator(estimator):
+    """Applique le moteur d'inférence configuré à l'estimateur natif"""
+    if INFERENCE_ENGINE == "compiled":
+        from api.tree_engine import compile_estimator
+        estimator = compile_estimator(estimator)
+    return estimator
+
+
+def prepare_model(pyfunc_model):
+    """Construit l'estimateur servi et sa disposition des features à partir du pyfunc"""
+    estimator = unwrap_model(pyfunc_model)
+    layout = FeatureLayout.from_model(
+        FEATURE_COLUMNS, estimator=estimator, pyfunc_model=pyfunc_model, dtype=FEATURE_DTYPE
+    )
+    return serving_estimator(estimator), layout
+
+
+def warm_up(estimator, layout, preprocessor=None):
+    """Préchauffe le modèle hors chemin de requête avec des lignes synthétiques"""
+    rows = build_warmup_rows(layout.columns, WARMUP_DATA_PATH).astype(layout.dtype)
+    for size in (1, len(rows)):
+        score_matrix(rows[:size], estimator, layout, preprocessor)
+
+
+def serving_preprocessor(layout, bundled=None):
+    """Prétraitement du bundle, sinon celui de PREPROCESSOR_PATH, aligné sur les colonnes du modèle"""
+    preprocessor = bundled
+    if preprocessor is None and PREPROCESSOR_PATH:
+        preprocessor = load_preprocessor(PREPROCESSOR_PATH)
+    return None if preprocessor is None else preprocessor.for_columns(layout.columns)
+
+
+def activate_model(estimator, layout, version, load_duration, preprocessor=None):
+    """Préchauffe puis bascule atomiquement sur un estimateur prêt à servir.
+
+    Les requêtes en cours gardent leur référence vers l'ancien estimateur et
+    se terminent dessus ; les suivantes voient le nouveau.
+    """
+    global model, model_version, feature_layout, scaler
+
+    warmup_start = time.time()
+    warm_up(estimator, layout, preprocessor)
+    warmup_duration = time.time() - warmup_start
+
+    model, model_version, feature_layout, scaler = estimator, str(version), layout, preprocessor
+
+    MODEL_LOAD_DURATION.set(load_duration)
+    MODEL_WARMUP_DURATION.set(warmup_duration)
+    STARTUP_PHASE_DURATION.labels(phase="model_load").set(load_duration)
+    STARTUP_PHASE_DURATION.labels(phase="warmup").set(warmup_duration)
+    if isinstance(version, int):
+        MODEL_VERSION.set(version)
+    print(f"⏱️  Imports: {IMPORT_DURATION:.2f}s, load: {load_duration:.2f}s, warm-up: {warmup_duration:.3f}s")
+
+
+def load_model_uri(model_uri, version=None):
+    """Charge un modèle MLflow (pyfunc) puis l'active"""
+    import mlflow.pyfunc
+
+    load_start = time.time()
+    pyfunc_model = mlflow.pyfunc.load_model(model_uri)
+    estimator, layout = prepare_model(pyfunc_model)
+    preprocessor = serving_preprocessor(layout)
+    load_duration = time.time() - load_start
+
+    if version is None:
+        version = getattr(getattr(pyfunc_model, "metadata", None), "run_id", None)
+    activate_model(estimator, layout, version, load_duration, preprocessor)
+
+
+def load_model_bundle(path):
+    """Charge un bundle local épinglé sur une version, sans importer mlflow"""
+    load_start = time.time()
+    bundle = load_bundle(path)
+    layout = FeatureLayout(bundle["columns"], dtype=FEATURE_DTYPE)
+    estimator = serving_estimator(bundle["estimator"])
+    preprocessor = serving_preprocessor(layout, bundle.get("preprocessor"))
+    load_duration = time.time() - load_start
+
+    activate_model(estimator, layout, bundle["model_version"], load_duration, preprocessor)
+    return bundle
+
+
+def load_model_version(version):
+    """Charge une version donnée du registre (utilisé par le polling)"""
+    load_model_uri(f"models:/{MODEL_NAME}/{version}", version=version)
+
+
+def registry_poller_enabled():
+    return MODEL_POLL_INTERVAL_SECONDS > 0 and not MODEL_BUNDLE_PATH
+
+
+def build_registry_poller():
+    """Poller du registre à partir de la version servie actuellement"""
+    current = int(model_version) if model_version and str(model_version).isdigit() else None
+    return ModelRegistryPoller(
+        MODEL_NAME,
+        MODEL_STAGE,
+        load_model_version,
+        MODEL_POLL_INTERVAL_SECONDS,
+        current_version=current,
+        failures=MODEL_RELOAD_FAILURES
+    )
+
+
+def load_candidate(spec, canary_fraction=0.0):
+    """Charge et préchauffe une version candidate : numéro de version du registre ou bundle .joblib"""
+    if spec.endswith(".joblib"):
+        bundle = load_bundle(spec)
+        layout = FeatureLayout(bundle["columns"], dtype=FEATURE_DTYPE)
+        estimator = serving_estimator(bundle["estimator"])
+        preprocessor = serving_preprocessor(layout, bundle.get("preprocessor"))
+        version = bundle["model_version"]
+    else:
+        import mlflow.pyfunc
+
+        estimator, layout = prepare_model(mlflow.pyfunc.load_model(f"models:/{MODEL_NAME}/{spec}"))
+        preprocessor = serving_preprocessor(layout)
+        version = spec
+    warm_up(estimator, layout, preprocessor)
+    return Candidate(version, estimator, layout, preprocessor, canary_fraction)
+
+
+def preload_model():
+    """Charge le modèle dans le processus maître gunicorn, avant le fork des workers.
+
+    `gc.freeze()` sort les objets du modèle du suivi du ramasse-miettes : les
+    collectes dans les workers ne réécrivent pas leurs pages, qui restent
+    partagées copy-on-write.
+    """
+    global model_preloaded
+    loadmodel()
+    gc.freeze()
+    model_preloaded = model is not None
 
 
 @app.on_event("startup")
 def loadmodel():
     """Charge le modèle depuis MLflow au démarrage de l'API"""
-    global model
-    model_name = "DiabetesClusterClassifier"
-    stage = "Production"
+    if model_preloaded:
+        # Worker forké : le modèle hérité du maître est déjà chargé et préchauffé
+        MODEL_LOADED.set(1)
+        return
     
     MODEL_LOADED.set(0)
+    STARTUP_PHASE_DURATION.labels(phase="imports").set(IMPORT_DURATION)
+    
+    if MODEL_BUNDLE_PATH:
+        try:
+            bundle = load_model_bundle(MODEL_BUNDLE_PATH)
+            print(f"✅ Model {bundle['model_name']} (version: {bundle['model_version']}) loaded from bundle {MODEL_BUNDLE_PATH}")
+            MODEL_LOADED.set(1)
+        except Exception as e:
+            print(f"Error loading model bundle: {e}")
+        return
     
     try:
-        model = mlflow.pyfunc.load_model(f"models:/{model_name}/{stage}")
-        print(f"✅ Model {model_name} (Stage: {stage}) loaded successfully!")
+        version = resolve_model_version(MODEL_NAME, MODEL_STAGE)
+        load_model_uri(f"models:/{MODEL_NAME}/{version if version is not None else MODEL_STAGE}", version=version)
+        print(f"✅ Model {MODEL_NAME} (Stage: {MODEL_STAGE}, version: {version}) loaded successfully!")
         MODEL_LOADED.set(1)
     except Exception as e:
         print(f" Error loading model: {e}")
         print(f"  Attempting to load latest version...")
         try:
-            model = mlflow.pyfunc.load_model(f"models:/{model_name}/latest")
-            print(f"Model {model_name} (latest) loaded successfully!")
+            load_model_uri(f"models:/{MODEL_NAME}/latest")
+            print(f"Model {MODEL_NAME} (latest) loaded successfully!")
             MODEL_LOADED.set(1)
         except Exception as e2:
             print(f"Error loading latest model: {e2}")
             MODEL_LOADED.set(0)
 
 
+@app.on_event("startup")
+def start_shadow_scorer():
+    """Charge les versions shadow/canary (SHADOW_MODEL_VERSIONS, CANARY_MODEL_VERSION)"""
+    global shadow_scorer
+    if not SHADOW_MODEL_VERSIONS and not CANARY_MODEL_VERSION:
+        return
+    candidates = []
+    specs = [(spec, 0.0) for spec in SHADOW_MODEL_VERSIONS]
+    if CANARY_MODEL_VERSION:
+        specs.append((CANARY_MODEL_VERSION, CANARY_FRACTION))
+    for spec, fraction in specs:
+        try:
+            candidates.append(load_candidate(spec, fraction))
+            print(f"✅ Candidate {spec} loaded ({f'canary {fraction:.0%}' if fraction else 'shadow'})")
+        except Exception as e:
+            print(f"Error loading candidate {spec}: {e}")
+    if candidates:
+        shadow_scorer = ShadowScorer(
+            score_candidate,
+            candidates,
+            max_workers=SHADOW_WORKERS,
+            max_pending=SHADOW_MAX_PENDING,
+            # File d'admission non vide : le principal attend déjà, le shadow est abandonné
+            overloaded=(lambda: admission.queued > 0) if admission is not None else None,
+            agreement=SHADOW_AGREEMENT,
+            latency_delta=SHADOW_LATENCY_DELTA,
+            divergence=SHADOW_DIVERGENCE,
+            dropped=SHADOW_DROPPED
+        )
+
+
+@app.on_event("shutdown")
+def stop_shadow_scorer():
+    """Arrête le pool shadow sans attendre les comparaisons en cours"""
+    global shadow_scorer
+    if shadow_scorer is not None:
+        shadow_scorer.shutdown(wait=False)
+        shadow_scorer = None
+
+
+@app.on_event("startup")
+async def start_registry_poller():
+    """Démarre le polling du registre si MODEL_POLL_INTERVAL_SECONDS > 0.
+
+    Workers gunicorn avec modèle préchargé : le maître s'en charge
+    (api/gunicorn_conf.py), un poller par worker dupliquerait le modèle.
+    """
+    global registry_poller
+    if registry_poller_enabled() and not model_preloaded:
+        registry_poller = build_registry_poller()
+        registry_poller.start()
+        print(f"✅ Registry polling enabled (every {MODEL_POLL_INTERVAL_SECONDS}s)")
+
+
+@app.on_event("shutdown")
+async def stop_registry_poller():
+    """Arrête le polling du registre"""
+    global registry_poller
+    if registry_poller is not None:
+        await registry_poller.stop()
+        registry_poller = None
+
+
+@app.on_event("startup")
+def start_drift_monitor():
+    """Démarre le suivi de dérive si ENABLE_DRIFT_MONITOR est activé"""
+    global drift_monitor
+    if not ENABLE_DRIFT_MONITOR:
+        return
+    try:
+        columns = feature_layout.columns
+        reference = load_reference(DRIFT_REFERENCE_PATH, columns)
+        drift_monitor = DriftMonitor(
+            columns,
+            reference,
+            interval_seconds=DRIFT_INTERVAL_SECONDS,
+            decay=DRIFT_DECAY,
+            min_samples=DRIFT_MIN_SAMPLES,
+            psi=FEATURE_DRIFT_PSI,
+            ks=FEATURE_DRIFT_KS,
+            mean=FEATURE_MEAN,
+            stddev=FEATURE_STDDEV,
+            samples=DRIFT_SAMPLES,
+            buffer_rows=DRIFT_BUFFER_ROWS,
+            dropped=DRIFT_DROPPED
+        )
+        drift_monitor.start()
+        print(f"✅ Drift monitoring enabled (reference: {DRIFT_REFERENCE_PATH}, every {DRIFT_INTERVAL_SECONDS}s)")
+    except Exception as e:
+        print(f"Error starting drift monitor: {e}")
+
+
+@app.on_event("shutdown")
+def stop_drift_monitor():
+    """Arrête le thread de suivi de dérive"""
+    global drift_monitor
+    if drift_monitor is not None:
+        drift_monitor.stop()
+        drift_monitor = None
+
+
+@app.on_event("startup")
+def start_prediction_logger():
+    """Démarre l'écriture du journal des prédictions si ENABLE_PREDICTION_LOG est activé"""
+    global prediction_logger
+    if ENABLE_PREDICTION_LOG:
+        prediction_logger = PredictionLogger(
+            PREDICTION_LOG_DIR,
+            fmt=PREDICTION_LOG_FORMAT,
+            max_queue=PREDICTION_LOG_MAX_QUEUE,
+            max_file_bytes=int(PREDICTION_LOG_MAX_FILE_MB * 1024 * 1024),
+            max_file_age_seconds=PREDICTION_LOG_ROTATE_SECONDS,
+            drop_policy=PREDICTION_LOG_DROP_POLICY,
+            written=PREDICTION_LOG_WRITTEN,
+            dropped=PREDICTION_LOG_DROPPED,
+            queue_depth=PREDICTION_LOG_QUEUE_DEPTH
+        )
+        prediction_logger.start()
+        print(f"✅ Prediction log enabled ({PREDICTION_LOG_FORMAT} in {PREDICTION_LOG_DIR})")
+
+
+@app.on_event("shutdown")
+def stop_prediction_logger():
+    """Écrit les entrées en attente et ferme le journal"""
+    global prediction_logger
+    if prediction_logger is not None:
+        prediction_logger.stop()
+        prediction_logger = None
+
+
+@app.on_event("startup")
+async def start_batcher():
+    """Démarre le micro-batcher si ENABLE_MICRO_BATCHING est activé"""
+    global batcher
+    if ENABLE_MICRO_BATCHING:
+        batcher = MicroBatcher(
+            score_matrix,
+            max_batch_size=MICRO_BATCH_MAX_SIZE,
+            max_wait_ms=MICRO_BATCH_MAX_WAIT_MS,
+            queue_depth=MICRO_BATCH_QUEUE_DEPTH,
+            batch_size=MICRO_BATCH_SIZE,
+            queue_delay=MICRO_BATCH_QUEUE_DELAY
+        )
+        batcher.start()
+        print(f"✅ Micro-batching enabled (max size: {MICRO_BATCH_MAX_SIZE}, max wait: {MICRO_BATCH_MAX_WAIT_MS} ms)")
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    """Arrête proprement le micro-batcher"""
+    global batcher
+    if batcher is not None:
+        await batcher.stop()
+        batcher = None
+
+
+@app.get("/health")
+def health():
+    """Liveness : le processus répond"""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    """Readiness : un modèle est chargé, préchauffé et prêt à servir"""
+    if model is None:
+        raise HTTPException(status_code=503, detail="Modèle non chargé")
+    status = {"status": "ready", "model_name": MODEL_NAME, "model_version": model_version}
+    if shadow_scorer is not None:
+        status["candidates"] = [
+            {"model_version": c.version, "mode": c.mode, "canary_fraction": c.canary_fraction}
+            for c in shadow_scorer.candidates
+        ]
+    return status
+
+
 @app.get("/metrics")
 def metrics():
     """Endpoint pour exposer les métriques Prometheus"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(content=generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
     return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
-@app.post("/predict")
-def predict(data: DiabetesInput):
-    """Endpoint de prédiction avec monitoring"""
+def observe_validation(request):
+    """Temps entre l'entrée dans l'application et le handler (parsing + Pydantic)"""
+    request_start = getattr(request.state, "request_start", None)
+    if request_start is not None:
+        STAGE_VALIDATION.observe(time.perf_counter() - request_start)
+
+
+def json_response(content):
+    """Sérialise la réponse en mesurant l'étape de sérialisation"""
+    serialization_start = time.perf_counter()
+    body = dumps(content)
+    STAGE_SERIALIZATION.observe(time.perf_counter() - serialization_start)
+    return Response(content=body, media_type="application/json")
+
+
+def binary_response(fmt, predictions, probabilities, served_version, inference_duration):
+    """Résultats en buffer NumPy ou Arrow ; version et durée passent dans les en-têtes"""
+    serialization_start = time.perf_counter()
+    body, media_type, headers = encode_results(fmt, predictions, probabilities)
+    STAGE_SERIALIZATION.observe(time.perf_counter() - serialization_start)
+    headers["X-Model-Version"] = str(served_version)
+    headers["X-Inference-Time-Seconds"] = f"{inference_duration:.4f}"
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+async def read_input(request, schema, endpoint, max_rows):
+    """Décode le corps selon son Content-Type : (objet validé, None) en JSON, (None, matrice) sinon.
+
+    JSON : parsing et validation Pydantic en un seul appel (`model_validate_json`).
+    Buffer NumPy ou flux Arrow : décodage direct dans l'ordre des colonnes du
+    modèle, puis contrainte ge=0 vérifiée sur toute la matrice en une passe.
+    Les erreurs gardent le format 422 de FastAPI.
+    """
+    content_type = request.headers.get("content-type")
+    body = await request.body()
+    if request_format(content_type) == "json":
+        try:
+            data = schema.model_validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+        observe_validation(request)
+        return data, None
+
+    if model is None or feature_layout is None:
+        ERROR_COUNT.labels(endpoint=endpoint, error_type="model_not_loaded").inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Modèle non chargé. Veuillez attendre le démarrage complet de l'API."
+        )
+    layout = feature_layout
+    try:
+        X = decode_matrix(body, content_type, layout)
+    except DecodeError as e:
+        ERROR_COUNT.labels(endpoint=endpoint, error_type="decode_error").inc()
+        raise HTTPException(status_code=422, detail=str(e))
+    if not 1 <= len(X) <= max_rows:
+        ERROR_COUNT.labels(endpoint=endpoint, error_type="invalid_row_count").inc()
+        raise HTTPException(status_code=422, detail=f"{len(X)} lignes reçues, entre 1 et {max_rows} attendues")
+    errors = non_negative_errors(X, layout.columns, None if max_rows == 1 else ("body", "records"))
+    if errors:
+        raise RequestValidationError(errors)
+    observe_validation(request)
+    return None, X
+
+
+PREDICT_BODY = request_body_schema(DiabetesInput)
+PREDICT_BATCH_BODY = request_body_schema(DiabetesBatchInput)
+
+
+@app.post("/predict", openapi_extra=PREDICT_BODY)
+async def predict(request: Request, include_input: Optional[bool] = None):
+    """Endpoint de prédiction avec monitoring.
+
+    Corps JSON, buffer `application/x-numpy` (une ligne float32/float64) ou flux
+    Arrow ; réponse JSON, ou binaire si l'en-tête Accept le demande.
+    """
+    data, row = await read_input(request, DiabetesInput, "/predict", max_rows=1)
     if model is None:
         ERROR_COUNT.labels(endpoint="/predict", error_type="model_not_loaded").inc()
         raise HTTPException(
@@ -157,42 +999,242 @@ def predict(data: DiabetesInput):
     try:
         inference_start = time.time()
         
-        df = pd.DataFrame([data.dict()])
+        layout = feature_layout
+        if row is None:
+            feature_start = time.perf_counter()
+            row = layout.row(data)
+            STAGE_FEATURE_BUILD.observe(time.perf_counter() - feature_start)
+        if drift_monitor is not None:
+            drift_monitor.observe(row)
         
-        column_order = [
-            'Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
-            'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'
-        ]
-        df = df[column_order]
+        cache_key = None
+        cached = None
+        if prediction_cache is not None:
+            cache_key = prediction_cache.make_key(row, model_version)
+            cached = prediction_cache.get(cache_key)
         
-        prediction = model.predict(df)
+        served_version = model_version
+        if cached is not None:
+            prediction, probabilities = cached
+        else:
+            canary = shadow_scorer.route() if shadow_scorer is not None else None
+            # Les hits du cache ne consomment pas de place d'inférence
+            async with (admission.admit() if admission is not None else nullcontext()):
+                score_start = time.perf_counter()
+                if canary is not None:
+                    predictions, all_probabilities = await run_in_threadpool(
+                        score_candidate, canary.layout.reorder(row, layout.columns), canary.estimator,
+                        canary.layout, canary.preprocessor
+                    )
+                    prediction = predictions[0]
+                    probabilities = None if all_probabilities is None else all_probabilities[0]
+                elif batcher is not None and batcher.running:
+                    prediction, probabilities = await batcher.submit(row)
+                else:
+                    predictions, all_probabilities = await run_in_threadpool(score_matrix, row)
+                    prediction = predictions[0]
+                    probabilities = None if all_probabilities is None else all_probabilities[0]
+                score_duration = time.perf_counter() - score_start
+            if canary is not None:
+                served_version = canary.version
+                CANARY_REQUESTS.labels(version=canary.version).inc()
+            elif shadow_scorer is not None:
+                # Après le scoring principal : la comparaison ne retarde pas cette réponse
+                shadow_scorer.submit(layout.columns, row, prediction, probabilities, score_duration)
+        
+        if cache_key is not None and cached is None and served_version == model_version:
+            prediction_cache.put(cache_key, (prediction, probabilities))
         
         inference_duration = time.time() - inference_start
         INFERENCE_TIME.observe(inference_duration)
         
-        outcome = int(prediction[0])
+        outcome = int(prediction)
         PREDICTION_COUNT.labels(outcome=outcome).inc()
+        if prediction_logger is not None:
+            prediction_logger.log(layout.columns, row, outcome, probabilities, served_version, inference_duration)
         
-        try:
-            probabilities = model.predict_proba(df)
-            return {
-                "prediction": outcome,
-                "cluster": outcome,
-                "probabilities": probabilities[0].tolist(),
-                "inference_time_seconds": round(inference_duration, 4),
-                "input_data": data.dict()
-            }
-        except AttributeError:
-            return {
-                "prediction": outcome,
-                "cluster": outcome,
-                "inference_time_seconds": round(inference_duration, 4),
-                "input_data": data.dict()
-            }
-            
+        fmt = response_format(request.headers.get("accept"))
+        if fmt != "json":
+            return binary_response(
+                fmt, [outcome], None if probabilities is None else [probabilities], served_version, inference_duration
+            )
+
+        response = {
+            "prediction": outcome,
+            "cluster": outcome,
+            "model_version": served_version,
+            "inference_time_seconds": round(inference_duration, 4)
+        }
+        echo_input = RESPONSE_ECHO_INPUT if include_input is None else include_input
+        if echo_input:
+            response["input_data"] = data.model_dump() if data is not None else dict(zip(layout.columns, row[0].tolist()))
+        if probabilities is not None:
+            response["probabilities"] = probabilities.tolist()
+        return json_response(response)
+    
+    except AdmissionRejected as e:
+        ERROR_COUNT.labels(endpoint="/predict", error_type="overloaded").inc()
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": ADMISSION_RETRY_AFTER_SECONDS}
+        )
     except Exception as e:
         ERROR_COUNT.labels(endpoint="/predict", error_type=type(e).__name__).inc()
         raise HTTPException(
             status_code=500,
             detail=f"Erreur lors de la prédiction: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@app.post("/predict/batch", openapi_extra=PREDICT_BATCH_BODY)
+async def predict_batch(request: Request):
+    """Endpoint de prédiction par lot : un seul appel vectorisé au modèle.
+
+    Mêmes formats d'entrée et de sortie que /predict (jusqu'à MAX_BATCH_SIZE lignes).
+    """
+    data, X = await read_input(request, DiabetesBatchInput, "/predict/batch", max_rows=MAX_BATCH_SIZE)
+    if model is None:
+        ERROR_COUNT.labels(endpoint="/predict/batch", error_type="model_not_loaded").inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Modèle non chargé. Veuillez attendre le démarrage complet de l'API."
+        )
+
+    return await run_in_threadpool(score_batch, data, X, response_format(request.headers.get("accept")))
+
+
+def score_batch(data, X, fmt):
+    """Scoring de /predict/batch, hors de la boucle d'événements"""
+    try:
+        inference_start = time.time()
+
+        layout = feature_layout
+        if X is None:
+            feature_start = time.perf_counter()
+            X = layout.matrix(data.records)
+            STAGE_FEATURE_BUILD.observe(time.perf_counter() - feature_start)
+        batch_size = len(X)
+        if drift_monitor is not None:
+            drift_monitor.observe(X)
+        if ENABLE_RANGE_VALIDATION:
+            # Tout le lot en une passe : toutes les lignes fautives sont renvoyées
+            report = range_validator_for(layout).validate_matrix(X)
+            if not report.valid:
+                ERROR_COUNT.labels(endpoint="/predict/batch", error_type="out_of_range").inc()
+                raise HTTPException(status_code=422, detail=report.to_dict())
+        served_version = model_version
+        canary = shadow_scorer.route() if shadow_scorer is not None else None
+        score_start = time.perf_counter()
+        if canary is not None:
+            predictions, probabilities = score_candidate(
+                canary.layout.reorder(X, layout.columns), canary.estimator, canary.layout, canary.preprocessor
+            )
+            served_version = canary.version
+            CANARY_REQUESTS.labels(version=canary.version).inc()
+        else:
+            predictions, probabilities = score_matrix(X)
+            if shadow_scorer is not None:
+                shadow_scorer.submit(layout.columns, X, predictions, probabilities, time.perf_counter() - score_start)
+
+        inference_duration = time.time() - inference_start
+        record_batch_metrics(predictions, inference_duration)
+        if prediction_logger is not None:
+            prediction_logger.log(layout.columns, X, predictions, probabilities, served_version, inference_duration)
+
+        if fmt != "json":
+            return binary_response(fmt, predictions, probabilities, served_version, inference_duration)
+
+        probability_rows = None if probabilities is None else probabilities.tolist()
+        results = []
+        for i, outcome in enumerate(predictions.tolist()):
+            result = {"prediction": outcome, "cluster": outcome}
+            if probability_rows is not None:
+                result["probabilities"] = probability_rows[i]
+            results.append(result)
+
+        return json_response({
+            "results": results,
+            "batch_size": batch_size,
+            "model_version": served_version,
+            "inference_time_seconds": round(inference_duration, 4)
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        ERROR_COUNT.labels(endpoint="/predict/batch", error_type=type(e).__name__).inc()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la prédiction: {str(e)}"
+        )
+
+
+def score_stream_chunk(X):
+    """Score un bloc de /predict/stream et enregistre les métriques de lot"""
+    inference_start = time.time()
+    predictions, probabilities = score_matrix(X)
+    record_batch_metrics(predictions, time.time() - inference_start)
+    return predictions, probabilities
+
+
+@app.post("/predict/stream")
+async def predict_stream(request: Request):
+    """Scoring en flux : NDJSON ou CSV en entrée, résultats NDJSON renvoyés au fil du calcul"""
+    if model is None:
+        ERROR_COUNT.labels(endpoint="/predict/stream", error_type="model_not_loaded").inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Modèle non chargé. Veuillez attendre le démarrage complet de l'API."
+        )
+
+    fmt = detect_format(request.headers.get("content-type"))
+    layout = feature_layout
+
+    async def results():
+        header = None
+        start_row = 0
+        lines = []
+        try:
+            async for line in iter_body_lines(request.stream()):
+                if fmt == "csv" and header is None:
+                    header = parse_header(line)
+                    continue
+                lines.append(line)
+                if len(lines) >= BULK_CHUNK_ROWS:
+                    yield await run_in_threadpool(
+                        score_lines, lines, fmt, header, start_row, DiabetesInput, layout, score_stream_chunk
+                    )
+                    start_row += len(lines)
+                    lines = []
+            if lines:
+                yield await run_in_threadpool(
+                    score_lines, lines, fmt, header, start_row, DiabetesInput, layout, score_stream_chunk
+                )
+        except Exception as e:
+            # Les en-têtes sont déjà envoyés : l'erreur est signalée dans le flux
+            ERROR_COUNT.labels(endpoint="/predict/stream", error_type=type(e).__name__).inc()
+            yield json.dumps({"error": f"Erreur lors de la prédiction: {str(e)}"}) + "\n"
+
+    return DuplexStreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@app.post("/debug/profiler/start")
+def start_profiler(interval_ms: float = Query(5.0, gt=0)):
+    """Démarre le profileur par échantillonnage (ENABLE_PROFILER_ENDPOINTS)"""
+    if not ENABLE_PROFILER_ENDPOINTS:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiler.start(interval=interval_ms / 1000):
+        raise HTTPException(status_code=409, detail="Profileur déjà démarré")
+    return {"status": "started", "interval_ms": interval_ms}
+
+
+@app.post("/debug/profiler/stop")
+def stop_profiler(top: int = 20):
+    """Arrête le profileur et renvoie les fonctions les plus échantillonnées"""
+    if not ENABLE_PROFILER_ENDPOINTS:
+        raise HTTPException(status_code=404, detail="Not Found")
+    summary = profiler.stop(top=top)
+    if summary is None:
+        raise HTTPException(status_code=409, detail="Profileur non démarré")
+    return summary
@@ -0,0 +1,255 @@
+import hashlib
+import importlib
+import json
+import os
+import time
+
+import numpy as np
+
+SELECTION_CACHE_VERSION = 2
+
+# Familles comparées dans notebooks/5_classification-supervisee-evaluation-modeles.ipynb
+CANDIDATES = {
+    "LogisticRegression": ("sklearn.linear_model.LogisticRegression", {
+        "C": 10, "penalty": "l1", "solver": "liblinear", "max_iter": 1000
+    }),
+    "SVC": ("sklearn.svm.SVC", {
+        "C": 10, "gamma": "scale", "kernel": "linear", "probability": True, "random_state": 42
+    }),
+    "DecisionTreeClassifier": ("sklearn.tree.DecisionTreeClassifier", {
+        "max_depth": 10, "min_samples_leaf": 4, "min_samples_split": 2, "random_state": 42
+    }),
+    "RandomForestClassifier": ("sklearn.ensemble.RandomForestClassifier", {
+        "n_estimators": 200, "max_depth": None, "min_samples_split": 2, "random_state": 42
+    }),
+    "GradientBoostingClassifier": ("sklearn.ensemble.GradientBoostingClassifier", {
+        "learning_rate": 0.1, "max_depth": 3, "n_estimators": 300, "random_state": 42
+    }),
+}
+
+# Cible binaire : précision/rappel/F1 de la classe positive, comme l'ancien contrôle ; moyenne pondérée au-delà
+FOLD_METRICS = ["accuracy", "precision", "recall", "f1", "roc_auc"]
+
+
+def _digest(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def dataset_fingerprint(X, y, columns=None):
+    """Hachage du contenu (valeurs, colonnes, cible) : insensible aux dates de fichier"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(list(columns) if columns is not None else None).encode())
+    digest.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    digest.update(str(np.asarray(y).dtype).encode())
+    return digest.hexdigest()
+
+
+def candidate_key(fingerprint, name, spec, n_splits, seed, oversample):
+    """Clé d'un candidat : données, hyperparamètres, protocole de CV et version de sklearn"""
+    import sklearn
+
+    path, params = spec
+    return _digest({
+        "version": SELECTION_CACHE_VERSION, "data": fingerprint, "name": name, "estimator": path,
+        "params": params, "n_splits": n_splits, "seed": seed, "oversample": oversample,
+        "sklearn": sklearn.__version__,
+    })
+
+
+class ResultCache:
+    """Cache disque clé → objet (joblib) ; sans répertoire, rien n'est conservé"""
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.joblib")
+
+    def get(self, key):
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        import joblib
+        try:
+            return joblib.load(self._path(key))
+        except Exception:
+            # Entrée illisible (écriture interrompue, version de sklearn) : recalculée
+            return None
+
+    def put(self, key, value):
+        if not self.directory:
+            return value
+        import joblib
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        joblib.dump(value, tmp_path)
+        os.replace(tmp_path, self._path(key))
+        return value
+
+
+def build_estimator(spec):
+    """Pipeline StandardScaler + estimateur (le scaler est ajusté sur le pli d'entraînement)"""
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    path, params = spec
+    module, name = path.rsplit(".", 1)
+    estimator = getattr(importlib.import_module(module), name)(**params)
+    return make_pipeline(StandardScaler(), estimator)
+
+
+def oversample(X, y, seed):
+    """Sur-échantillonnage aléatoire des classes minoritaires (équivalent de RandomOverSampler)"""
+    rng = np.random.default_rng(seed)
+    classes, counts = np.unique(y, return_counts=True)
+    indexes = [np.arange(len(y))]
+    for cls, count in zip(classes, counts):
+        if count < counts.max():
+            indexes.append(rng.choice(np.flatnonzero(y == cls), counts.max() - count, replace=True))
+    index = np.concatenate(indexes)
+    return X[index], y[index]
+
+
+def cv_splits(y, n_splits, seed, fingerprint, cache):
+    """Plis stratifiés, mis en cache avec les données"""
+    key = _digest({"version": SELECTION_CACHE_VERSION, "data": fingerprint, "splits": n_splits, "seed": seed})
+    splits = cache.get(key)
+    if splits is None:
+        from sklearn.model_selection import StratifiedKFold
+
+        folds = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+        splits = cache.put(key, list(folds.split(np.zeros(len(y)), y)))
+    return splits
+
+
+def fold_metrics(y_true, y_pred, probabilities, labels):
+    from sklearn.metrics import accuracy_score, precision_recall_fscore_support, roc_auc_score
+
+    average = {"average": "binary", "pos_label": labels[-1]} if len(labels) == 2 else {"average": "weighted"}
+    precision, recall, f1, _ = precision_recall_fscore_support(y_true, y_pred, zero_division=0, **average)
+    metrics = {
+        "accuracy": accuracy_score(y_true, y_pred),
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+    }
+    if probabilities is not None and len(np.unique(y_true)) > 1:
+        if probabilities.shape[1] == 2:
+            metrics["roc_auc"] = roc_auc_score(y_true, probabilities[:, 1])
+        else:
+            metrics["roc_auc"] = roc_auc_score(y_true, probabilities, multi_class="ovr", average="weighted")
+    return {name: float(value) for name, value in metrics.items()}
+
+
+def evaluate_fold(spec, X, y, train_index, test_index, use_oversampling, seed):
+    """Ajuste et évalue un candidat sur un pli (exécuté dans un worker du pool) ; renvoie (métriques, modèle)"""
+    start = time.perf_counter()
+    X_train, y_train = X[train_index], y[train_index]
+    if use_oversampling:
+        X_train, y_train = oversample(X_train, y_train, seed)
+
+    model = build_estimator(spec)
+    fit_start = time.perf_counter()
+    model.fit(X_train, y_train)
+    training_time = time.perf_counter() - fit_start
+
+    predict_start = time.perf_counter()
+    y_pred = model.predict(X[test_index])
+    inference_time = time.perf_counter() - predict_start
+    probabilities = model.predict_proba(X[test_index]) if hasattr(model, "predict_proba") else None
+
+    metrics = fold_metrics(y[test_index], y_pred, probabilities, np.unique(y))
+    metrics["training_time_sec"] = training_time
+    metrics["inference_time_sec"] = inference_time
+    metrics["wall_time_sec"] = time.perf_counter() - start
+    return metrics, model
+
+
+def select_models(X, y, columns=None, candidates=None, n_splits=5, seed=42, n_jobs=-1, cache_dir=None,
+                  use_oversampling=True, metric="accuracy", force=False):
+    """Compare les candidats en validation croisée, en parallèle et avec cache.
+
+    Chaque couple (candidat, pli) est une tâche indépendante, mise en cache
+    sous une clé dérivée du contenu des données et des hyperparamètres
+    (métriques, et modèle ajusté sous `<clé>-model`, relu par `fold_models`) :
+    seules les tâches absentes du cache sont envoyées au pool joblib. Si toutes les
+    clés sont inchangées, le résumé précédent est renvoyé tel quel
+    (`skipped=True`) sans rien recalculer.
+    """
+    from joblib import Parallel, delayed
+
+    candidates = CANDIDATES if candidates is None else candidates
+    cache = ResultCache(cache_dir)
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.asarray(y)
+    fingerprint = dataset_fingerprint(X, y, columns)
+    keys = {
+        name: candidate_key(fingerprint, name, spec, n_splits, seed, use_oversampling)
+        for name, spec in candidates.items()
+    }
+    summary_key = _digest({"summary": keys, "metric": metric})
+    if not force:
+        summary = cache.get(summary_key)
+        if summary is not None:
+            return dict(summary, skipped=True, wall_time_sec=0.0)
+
+    start = time.perf_counter()
+    splits = cv_splits(y, n_splits, seed, fingerprint, cache)
+    results = {}
+    pending = []
+    for name, spec in candidates.items():
+        for fold, (train_index, test_index) in enumerate(splits):
+            fold_key = f"{keys[name]}-fold{fold}"
+            cached = None if force else cache.get(fold_key)
+            if cached is not None:
+                results[(name, fold)] = dict(cached, cached=True)
+            else:
+                pending.append((name, fold, fold_key, spec, train_index, test_index))
+
+    computed = Parallel(n_jobs=n_jobs)(
+        delayed(evaluate_fold)(spec, X, y, train_index, test_index, use_oversampling, seed + fold)
+        for name, fold, _, spec, train_index, test_index in pending
+    )
+    for (name, fold, fold_key, *_), (metrics, model) in zip(pending, computed):
+        # Modèle écrit avant les métriques : une entrée de métriques implique son modèle
+        cache.put(f"{fold_key}-model", model)
+        results[(name, fold)] = dict(cache.put(fold_key, metrics), cached=False)
+
+    summary = {"fingerprint": fingerprint, "metric": metric, "n_splits": n_splits, "candidates": {}}
+    for name, spec in candidates.items():
+        folds = [results[(name, fold)] for fold in range(len(splits))]
+        means = {
+            key: float(np.mean([fold[key] for fold in folds]))
+            for key in FOLD_METRICS + ["training_time_sec", "inference_time_sec"] if key in folds[0]
+        }
+        summary["candidates"][name] = {
+            "key": keys[name],
+            "estimator": spec[0],
+            "params": spec[1],
+            "metrics": means,
+            "wall_time_sec": float(sum(fold["wall_time_sec"] for fold in folds if not fold["cached"])),
+            "cached_folds": sum(fold["cached"] for fold in folds),
+        }
+    summary["best"] = max(summary["candidates"], key=lambda name: summary["candidates"][name]["metrics"][metric])
+    cache.put(summary_key, summary)
+    return dict(summary, skipped=False, wall_time_sec=time.perf_counter() - start)
+
+
+def fold_models(key, n_splits, cache_dir):
+    """Modèles ajustés sur chaque pli d'un candidat (None pour un pli absent du cache)"""
+    cache = ResultCache(cache_dir)
+    return [cache.get(f"{key}-fold{fold}-model") for fold in range(n_splits)]
+
+
+def fit_final(X, y, spec, key, cache_dir=None, use_oversampling=True, seed=42):
+    """Ajuste le candidat retenu sur toutes les données (mis en cache sous sa clé)"""
+    cache = ResultCache(cache_dir)
+    model = cache.get(f"{key}-final")
+    if model is None:
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        y = np.asarray(y)
+        if use_oversampling:
+            X, y = oversample(X, y, seed)
+        model = cache.put(f"{key}-final", build_estimator(spec).fit(X, y))
+    return model
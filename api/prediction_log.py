@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from itertools import groupby
+
+import numpy as np
+
+
+class PredictionLogger:
+    """Journal des prédictions écrit en arrière-plan, par lots, en fichiers tournants.
+
+    Le chemin de requête ne fait qu'ajouter un tuple (matrices déjà construites,
+    sans sérialisation) à une file bornée à `max_queue` lignes (une entrée de lot
+    en compte jusqu'à 1000). Un thread de fond la vide toutes les `flush_interval`
+    secondes, ou dès `batch_size` lignes, et écrit en NDJSON ou en Parquet (un row
+    group par lot) dans des fichiers `.part` renommés à la rotation (taille
+    `max_file_bytes` ou âge `max_file_age_seconds`). File pleine :
+    `drop_policy="drop_newest"` ignore l'entrée, `"drop_oldest"` évince les plus
+    anciennes jusqu'à faire de la place ; dans les deux cas le compteur `dropped`
+    est incrémenté du nombre de lignes perdues.
+    """
+
+    def __init__(self, directory, fmt="ndjson", max_queue=100_000, batch_size=1000, flush_interval=1.0,
+                 max_file_bytes=64 * 1024 * 1024, max_file_age_seconds=3600.0, drop_policy="drop_newest",
+                 written=None, dropped=None, queue_depth=None):
+        if fmt not in ("ndjson", "parquet"):
+            raise ValueError(f"Format de journal non supporté : {fmt}")
+        if drop_policy not in ("drop_newest", "drop_oldest"):
+            raise ValueError(f"Politique de rejet inconnue : {drop_policy}")
+        self.directory = directory
+        self.fmt = fmt
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_file_age = max_file_age_seconds
+        self.drop_policy = drop_policy
+        self.written = written
+        self.dropped = dropped
+        self.queue_depth = queue_depth
+        self.dropped_rows = 0
+        self._queue = deque()
+        self._queued_rows = 0
+        # Borne et éviction d'un côté, vidage de l'autre : mêmes opérations sous un seul verrou
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._writer = None
+        self._path = None
+        self._opened_at = None
+        self._sequence = 0
+
+    def log(self, columns, X, predictions, probabilities, model_version, latency):
+        """Chemin chaud : met en file une entrée (une ligne pour /predict, n pour un lot)"""
+        entry = (time.time(), columns, X, predictions, probabilities, model_version, latency)
+        n = len(X)
+        lost = 0
+        with self._lock:
+            accepted = self._queued_rows + n <= self.max_queue
+            if not accepted and self.drop_policy == "drop_oldest" and n <= self.max_queue:
+                while self._queued_rows + n > self.max_queue:
+                    evicted = len(self._queue.popleft()[2])
+                    self._queued_rows -= evicted
+                    lost += evicted
+                accepted = True
+            if accepted:
+                self._queue.append(entry)
+                self._queued_rows += n
+            else:
+                lost = n
+            self.dropped_rows += lost
+            queued = self._queued_rows
+        if self.queue_depth is not None:
+            self.queue_depth.set(queued)
+        if lost:
+            if self.dropped is not None:
+                self.dropped.inc(lost)
+        if queued >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="prediction-logger", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Écrit les entrées restantes et ferme le fichier courant"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self._close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️  Prediction log flush failed: {e}")
+
+    def flush(self):
+        """Vide la file dans le fichier courant ; renvoie le nombre de lignes écrites"""
+        with self._lock:
+            entries, self._queue = self._queue, deque()
+            self._queued_rows = 0
+        if self.queue_depth is not None:
+            self.queue_depth.set(0)
+        if not entries:
+            if self._file is not None and time.time() - self._opened_at >= self.max_file_age:
+                self._close()
+            return 0
+
+        self._rotate_if_needed()
+        rows = self._write_ndjson(entries) if self.fmt == "ndjson" else self._write_parquet(entries)
+        if self.written is not None:
+            self.written.inc(rows)
+        return rows
+
+    def _rotate_if_needed(self):
+        if self._file is not None:
+            too_big = os.path.getsize(self._path) >= self.max_file_bytes
+            too_old = time.time() - self._opened_at >= self.max_file_age
+            if too_big or too_old:
+                self._close()
+        if self._file is None:
+            self._open()
+
+    def _open(self):
+        self._sequence += 1
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        name = f"predictions-{stamp}-{os.getpid()}-{self._sequence:04d}.{self.fmt}"
+        self._path = os.path.join(self.directory, name + ".part")
+        if self.fmt == "parquet":
+            self._file = open(self._path, "ab")
+        else:
+            self._file = open(self._path, "a", encoding="utf-8")
+        self._opened_at = time.time()
+
+    def _close(self):
+        if self._file is None:
+            return
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._file.close()
+        # Fichier terminé : retrait du suffixe .part pour les consommateurs
+        os.replace(self._path, self._path[:-len(".part")])
+        self._file = None
+
+    @staticmethod
+    def _normalize(entry):
+        """Met en forme une entrée hors du chemin chaud : prédictions (n,), probabilités (n, k)"""
+        timestamp, columns, X, predictions, probabilities, model_version, latency = entry
+        predictions = np.asarray(predictions).reshape(-1)
+        if probabilities is not None:
+            probabilities = np.asarray(probabilities).reshape(len(predictions), -1)
+        return timestamp, columns, X, predictions, probabilities, model_version, latency
+
+    def _records(self, entries):
+        for entry in entries:
+            timestamp, columns, X, predictions, probabilities, model_version, latency = self._normalize(entry)
+            values = X.tolist()
+            predicted = predictions.tolist()
+            probas = None if probabilities is None else probabilities.tolist()
+            for i, row in enumerate(values):
+                record = {"timestamp": timestamp, "model_version": model_version, "latency_seconds": latency}
+                # Features au premier niveau : le journal est rejouable par scripts/benchmark_api.py
+                record.update(zip(columns, row))
+                record["prediction"] = predicted[i]
+                record["probabilities"] = None if probas is None else probas[i]
+                yield record
+
+    def _write_ndjson(self, entries):
+        lines = [json.dumps(record) for record in self._records(entries)]
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        return len(lines)
+
+    def _write_parquet(self, entries):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        rows = 0
+        # Entrées consécutives de même disposition : une table colonne par colonne, sans passer par des dicts
+        for columns, group in groupby(map(self._normalize, entries), key=lambda entry: entry[1]):
+            group = list(group)
+            sizes = [len(entry[2]) for entry in group]
+            X = np.vstack([entry[2] for entry in group]).astype(np.float64, copy=False)
+            data = {
+                "timestamp": np.repeat([entry[0] for entry in group], sizes),
+                "model_version": pa.array(np.repeat([str(entry[5]) for entry in group], sizes), pa.string()),
+                "latency_seconds": np.repeat([entry[6] for entry in group], sizes),
+            }
+            for j, col in enumerate(columns):
+                data[col] = X[:, j]
+            data["prediction"] = np.concatenate([entry[3] for entry in group]).astype(np.int64)
+            data["probabilities"] = pa.array([
+                row for entry in group
+                for row in (entry[4].tolist() if entry[4] is not None else [None] * len(entry[2]))
+            ], pa.list_(pa.float64()))
+            table = pa.table(data)
+
+            if self._writer is not None and not table.schema.equals(self._writer.schema):
+                # Nouvelle disposition (ex. modèle rechargé) : nouveau fichier au schéma cohérent
+                self._close()
+                self._open()
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self._file, table.schema)
+            self._writer.write_table(table)
+            rows += table.num_rows
+        self._file.flush()
+        return rows
@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+
+PREPROCESSOR_FORMAT_VERSION = 1
+
+# Zéros physiologiquement impossibles, imputés par KNN (notebooks/2_preprocessing.ipynb)
+ZERO_AS_MISSING_COLUMNS = ["Insulin", "BMI", "Glucose", "BloodPressure", "SkinThickness"]
+LOG_COLUMNS = ["DiabetesPedigreeFunction", "Insulin", "BloodPressure"]
+
+
+class ServingPreprocessor:
+    """Prétraitement du notebook appliqué au service en une transformation vectorisée.
+
+    Enchaîne sur un buffer (n, n_features) déjà construit par `FeatureLayout` :
+    imputation KNN des zéros physiologiques, `log1p` des colonnes asymétriques,
+    puis une seule transformation affine `(x - offset) * factor` qui compose
+    tous les `StandardScaler` du pipeline d'entraînement.
+
+    Les voisins sont cherchés dans des KD-trees construits au `fit` sur les
+    lignes de référence complètes, un par motif de zéros possible : la
+    distance ne porte que sur les colonnes renseignées (comme la distance
+    nan_euclidean de `KNNImputer`, dont le facteur d'échelle ne change pas
+    l'ordre des voisins au sein d'un motif). Seules les lignes contenant un
+    zéro sont interrogées, par blocs de `chunk_rows`.
+    """
+
+    def __init__(self, columns, reference, trees, fill_values, offset, factor,
+                 impute_columns=ZERO_AS_MISSING_COLUMNS, log_columns=LOG_COLUMNS, n_neighbors=5,
+                 chunk_rows=65536):
+        self.columns = tuple(columns)
+        self.impute_columns = list(impute_columns)
+        self.log_columns = list(log_columns)
+        self.n_neighbors = n_neighbors
+        self.chunk_rows = chunk_rows
+        self.reference = np.ascontiguousarray(reference, dtype=np.float64)
+        self.trees = trees
+        self.fill_values = np.asarray(fill_values, dtype=np.float64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.factor = np.asarray(factor, dtype=np.float64)
+        self._impute_index = np.array([self.columns.index(col) for col in self.impute_columns])
+        self._log_index = [self.columns.index(col) for col in self.log_columns]
+        self._pattern_bits = 1 << np.arange(len(self.impute_columns))
+
+    def then(self, mean, scale):
+        """Compose une mise à l'échelle supplémentaire (ex. StandardScaler d'entraînement du modèle)"""
+        mean = np.asarray(mean, dtype=np.float64)
+        scale = np.asarray(scale, dtype=np.float64)
+        # ((x - o) * f - m) / s = (x - (o + m / f)) * (f / s)
+        self.offset = self.offset + mean / self.factor
+        self.factor = self.factor / scale
+        return self
+
+    def for_columns(self, columns):
+        """Copie dont les paramètres suivent l'ordre de colonnes du modèle servi"""
+        columns = tuple(columns)
+        if columns == self.columns:
+            return self
+        order = [self.columns.index(col) for col in columns]
+        return ServingPreprocessor(
+            columns, self.reference, self.trees, self.fill_values, self.offset[order], self.factor[order],
+            self.impute_columns, self.log_columns, self.n_neighbors, self.chunk_rows
+        )
+
+    def impute(self, X):
+        """Remplace en place les zéros des colonnes physiologiques par la moyenne des k voisins"""
+        block = X[:, self._impute_index]
+        missing = block == 0
+        rows = np.flatnonzero(missing.any(axis=1))
+        if not len(rows):
+            return X
+        patterns = missing[rows] @ self._pattern_bits
+        for pattern in np.unique(patterns):
+            selected = rows[patterns == pattern]
+            absent = missing[selected[0]]
+            present = ~absent
+            target = self._impute_index[absent]
+            tree = self.trees.get(int(pattern))
+            if tree is None:
+                # Aucune colonne renseignée : repli sur la moyenne de référence (comme KNNImputer)
+                X[np.ix_(selected, target)] = self.fill_values[absent]
+                continue
+            for start in range(0, len(selected), self.chunk_rows):
+                chunk = selected[start:start + self.chunk_rows]
+                _, neighbors = tree.query(block[chunk][:, present], k=self.n_neighbors)
+                X[np.ix_(chunk, target)] = self.reference[:, absent][neighbors].mean(axis=1)
+        return X
+
+    def transform(self, X, copy=True):
+        """Imputation, log1p puis affine en place sur le buffer (copié si `copy`)"""
+        X = np.array(X, dtype=np.float64, copy=True if copy else None, order="C")
+        self.impute(X)
+        for j in self._log_index:
+            np.log1p(X[:, j], out=X[:, j])
+        X -= self.offset
+        X *= self.factor
+        return X
+
+
+def build_trees(reference, leaf_size=30):
+    """Un KD-tree par motif de colonnes manquantes (ni vide ni complet)"""
+    from sklearn.neighbors import KDTree
+
+    n_columns = reference.shape[1]
+    trees = {}
+    for pattern in range(1, (1 << n_columns) - 1):
+        present = [(pattern >> j) & 1 == 0 for j in range(n_columns)]
+        trees[pattern] = KDTree(np.ascontiguousarray(reference[:, present]), leaf_size=leaf_size)
+    return trees
+
+
+def fit_preprocessor(frame, columns, n_neighbors=5, impute_columns=ZERO_AS_MISSING_COLUMNS,
+                     log_columns=LOG_COLUMNS):
+    """Ajuste le prétraitement sur les données nettoyées (ex. data/validation/Cleaned_Data.csv).
+
+    L'imputation d'entraînement reprend `KNNImputer` pour reproduire
+    data/processed/Ready_For_Model.csv ; au service, les voisins sont
+    cherchés parmi les lignes de référence sans zéro.
+    """
+    from sklearn.impute import KNNImputer
+    from sklearn.preprocessing import StandardScaler
+
+    columns = list(columns)
+    data = frame[columns].to_numpy(dtype=np.float64, copy=True)
+    impute_index = [columns.index(col) for col in impute_columns]
+    block = data[:, impute_index]
+    block[block == 0] = np.nan
+
+    reference = block[~np.isnan(block).any(axis=1)]
+    fill_values = np.nanmean(block, axis=0)
+    data[:, impute_index] = KNNImputer(n_neighbors=n_neighbors).fit_transform(block)
+    for col in log_columns:
+        j = columns.index(col)
+        data[:, j] = np.log1p(data[:, j])
+    scaler = StandardScaler().fit(data)
+
+    return ServingPreprocessor(
+        columns, reference, build_trees(reference), fill_values, scaler.mean_, 1 / scaler.scale_,
+        impute_columns, log_columns, n_neighbors
+    )
+
+
+def save_preprocessor(preprocessor, path):
+    """Écrit l'artefact de prétraitement (joblib, écriture atomique)"""
+    import joblib
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    joblib.dump({"format_version": PREPROCESSOR_FORMAT_VERSION, "preprocessor": preprocessor}, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_preprocessor(path):
+    import joblib
+
+    artifact = joblib.load(path)
+    if artifact.get("format_version") != PREPROCESSOR_FORMAT_VERSION:
+        raise ValueError(f"Format de prétraitement non supporté : {artifact.get('format_version')}")
+    return artifact["preprocessor"]
@@ -0,0 +1,192 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from api.sketches import DistinctCounter, QuantileSketch
+from api.validation import iter_file_chunks
+
+PROFILE_FORMAT_VERSION = 1
+PROFILE_QUANTILES = {"p01": 0.01, "p05": 0.05, "q1": 0.25, "median": 0.5, "q3": 0.75, "p95": 0.95, "p99": 0.99}
+
+# Même règle que l'ancien validate_data_quality : valeurs hors [Q1 - 3·IQR, Q3 + 3·IQR]
+OUTLIER_IQR_FACTOR = 3.0
+
+
+class DataProfile:
+    """Profil qualité construit en une seule passe par bloc, fusionnable.
+
+    Par colonne : valeurs manquantes, somme (moyenne) et sketch de quantiles ;
+    pour le fichier : hachage de chaque ligne pour compter les doublons. Les
+    valeurs aberrantes sont déduites du sketch, sans deuxième passe sur les
+    données. La mémoire ne dépend que de `sketch_k` et `max_exact_hashes`.
+    """
+
+    def __init__(self, sketch_k=200, max_exact_hashes=2_000_000, seed=42):
+        self.sketch_k = sketch_k
+        self.seed = seed
+        self.rows = 0
+        self.columns = []
+        self.numeric_columns = []
+        self.missing = {}
+        self.sums = {}
+        self.sketches = {}
+        self.distinct = DistinctCounter(max_exact=max_exact_hashes)
+
+    def _add_columns(self, chunk):
+        import pandas as pd
+
+        for col in chunk.columns:
+            if col not in self.missing:
+                self.columns.append(col)
+                self.missing[col] = 0
+                if pd.api.types.is_numeric_dtype(chunk[col]):
+                    self.numeric_columns.append(col)
+                    self.sums[col] = 0.0
+                    self.sketches[col] = QuantileSketch(self.sketch_k, seed=self.seed)
+
+    def update(self, chunk):
+        """Ajoute un bloc pandas au profil"""
+        import pandas as pd
+
+        self._add_columns(chunk)
+        self.rows += len(chunk)
+        for col, count in chunk.isna().sum().items():
+            self.missing[col] += int(count)
+        self.distinct.update(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+
+        values = chunk.reindex(columns=self.numeric_columns)
+        values = values.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        sums = np.nansum(values, axis=0)
+        for j, col in enumerate(self.numeric_columns):
+            self.sums[col] += float(sums[j])
+            self.sketches[col].update(values[:, j])
+        return self
+
+    def merge(self, other):
+        """Fusionne le profil d'un autre bloc ou processus"""
+        for col in other.columns:
+            if col not in self.missing:
+                self.columns.append(col)
+                self.missing[col] = 0
+            self.missing[col] += other.missing[col]
+        for col in other.numeric_columns:
+            if col not in self.sketches:
+                self.numeric_columns.append(col)
+                self.sums[col] = 0.0
+                self.sketches[col] = QuantileSketch(self.sketch_k, seed=self.seed)
+            self.sums[col] += other.sums[col]
+            self.sketches[col].merge(other.sketches[col])
+        self.rows += other.rows
+        self.distinct.merge(other.distinct)
+        return self
+
+    def to_dict(self):
+        distinct = self.distinct.count()
+        columns = {}
+        for col in self.columns:
+            entry = {"missing": self.missing[col]}
+            sketch = self.sketches.get(col)
+            if sketch is not None and sketch.n:
+                quantiles = dict(zip(PROFILE_QUANTILES, sketch.quantiles(list(PROFILE_QUANTILES.values()))))
+                iqr = quantiles["q3"] - quantiles["q1"]
+                low = quantiles["q1"] - OUTLIER_IQR_FACTOR * iqr
+                high = quantiles["q3"] + OUTLIER_IQR_FACTOR * iqr
+                entry.update({
+                    "count": sketch.n,
+                    "mean": self.sums[col] / sketch.n,
+                    "min": sketch.min,
+                    "max": sketch.max,
+                    "quantiles": quantiles,
+                    "iqr": iqr,
+                    "outliers": sketch.count_outside(low, high),
+                })
+            columns[col] = entry
+        return {
+            "format_version": PROFILE_FORMAT_VERSION,
+            "rows": self.rows,
+            "duplicates": {"count": self.rows - distinct, "exact": self.distinct.exact},
+            "columns": columns,
+            "sketch": {"type": "kll", "k": self.sketch_k},
+        }
+
+
+def _profile_chunk(args):
+    chunk, sketch_k, max_exact_hashes = args
+    return DataProfile(sketch_k, max_exact_hashes).update(chunk)
+
+
+def profile_file(path, chunk_rows=100_000, workers=1, sketch_k=200, max_exact_hashes=2_000_000):
+    """Profile un CSV ou Parquet en flux ; `workers` > 1 profile les blocs dans un pool de processus"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    profile = DataProfile(sketch_k, max_exact_hashes)
+    chunks = ((chunk, sketch_k, max_exact_hashes) for chunk, _ in iter_file_chunks(path, chunk_rows))
+
+    if workers <= 1:
+        for chunk, _, _ in chunks:
+            profile.update(chunk)
+        return profile
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for args in chunks:
+            pending.append(pool.submit(_profile_chunk, args))
+            if len(pending) >= 2 * workers:
+                profile.merge(pending.pop(0).result())
+        for future in pending:
+            profile.merge(future.result())
+    return profile
+
+
+def write_profile(profile, path, source=None):
+    """Écrit le profil JSON (écriture atomique) ; `source` identifie le fichier profilé"""
+    document = profile.to_dict() if isinstance(profile, DataProfile) else dict(profile)
+    document["source"] = source
+    document["created_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(document, handle, indent=2)
+    os.replace(tmp_path, path)
+    return document
+
+
+def diff_profiles(baseline, current, rate_tolerance=0.01, shift_tolerance=0.25):
+    """Compare deux profils JSON et liste les écarts significatifs.
+
+    Taux de manquants et de doublons : écart absolu > `rate_tolerance`.
+    Médiane et quartiles : déplacement > `shift_tolerance` × IQR de référence.
+    """
+    changes = []
+    rows_before, rows_after = max(baseline["rows"], 1), max(current["rows"], 1)
+
+    for col in baseline["columns"]:
+        if col not in current["columns"]:
+            changes.append(f"column {col} removed")
+    for col in current["columns"]:
+        if col not in baseline["columns"]:
+            changes.append(f"column {col} added")
+
+    duplicate_delta = current["duplicates"]["count"] / rows_after - baseline["duplicates"]["count"] / rows_before
+    if abs(duplicate_delta) > rate_tolerance:
+        changes.append(f"duplicate rate changed by {duplicate_delta:+.2%}")
+
+    for col, before in baseline["columns"].items():
+        after = current["columns"].get(col)
+        if after is None:
+            continue
+        missing_delta = after["missing"] / rows_after - before["missing"] / rows_before
+        if abs(missing_delta) > rate_tolerance:
+            changes.append(f"{col}: missing rate changed by {missing_delta:+.2%}")
+        if "quantiles" not in before or "quantiles" not in after:
+            continue
+        scale = before["iqr"] or abs(before["quantiles"]["median"]) or 1.0
+        for name in ("q1", "median", "q3"):
+            shift = (after["quantiles"][name] - before["quantiles"][name]) / scale
+            if abs(shift) > shift_tolerance:
+                changes.append(f"{col}: {name} moved by {shift:+.2f} IQR "
+                               f"({before['quantiles'][name]:.4g} -> {after['quantiles'][name]:.4g})")
+    return changes
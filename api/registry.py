@@ -0,0 +1,144 @@
+import asyncio
+import os
+import threading
+import time
+
+import numpy as np
+
+from starlette.concurrency import run_in_threadpool
+
+
+def resolve_model_version(model_name, stage):
+    """Renvoie le numéro de version servi pour `stage`, ou à défaut la dernière version"""
+    from mlflow.tracking import MlflowClient
+
+    client = MlflowClient()
+    try:
+        versions = client.get_latest_versions(model_name, stages=[stage])
+    except Exception:
+        versions = []
+    if not versions:
+        versions = client.search_model_versions(f"name='{model_name}'")
+    if not versions:
+        return None
+    return max(int(v.version) for v in versions)
+
+
+def build_warmup_rows(columns, data_path, n_rows=64, seed=42):
+    """Génère des lignes synthétiques suivant la distribution des données d'entraînement.
+
+    Chaque feature est tirée d'une loi normale de même moyenne et écart-type
+    que le fichier de référence, tronquée à 0 comme les contraintes de
+    `DiabetesInput`. Sans fichier, on répète une ligne plausible fixe.
+    """
+    if data_path and os.path.exists(data_path):
+        import pandas as pd
+
+        reference = pd.read_csv(data_path)[list(columns)].to_numpy(dtype=np.float64)
+        rng = np.random.default_rng(seed)
+        rows = rng.normal(reference.mean(axis=0), reference.std(axis=0), size=(n_rows, len(columns)))
+        return np.clip(rows, 0.0, None)
+
+    example = np.array([6, 148, 72, 35, 0, 33.6, 0.627, 50], dtype=np.float64)
+    return np.tile(example[:len(columns)], (n_rows, 1))
+
+
+class ModelRegistryPoller:
+    """Surveille le registre MLflow et déclenche le chargement des nouvelles versions.
+
+    Le chargement, le warm-up et l'activation sont délégués à `load_fn(version)`
+    exécuté dans le threadpool : les requêtes ne sont jamais bloquées et
+    continuent d'être servies par l'ancien modèle jusqu'à la bascule.
+    `start_thread` fait le même polling dans un thread, pour le processus
+    maître gunicorn qui n'a pas de boucle asyncio.
+
+    Une version dont le chargement échoue est mémorisée et n'est retentée
+    qu'après un délai doublé à chaque échec (`interval_seconds` x 2^échecs,
+    au plus `max_backoff_seconds`) : un artefact cassé ne relance pas un
+    chargement complet et un warm-up à chaque intervalle.
+    """
+
+    def __init__(self, model_name, stage, load_fn, interval_seconds, current_version=None,
+                 max_backoff_seconds=3600.0, failures=None, clock=time.monotonic):
+        self.model_name = model_name
+        self.stage = stage
+        self.load_fn = load_fn
+        self.interval_seconds = interval_seconds
+        self.current_version = current_version
+        self.max_backoff_seconds = max_backoff_seconds
+        self.failures = failures
+        self.clock = clock
+        # version -> (échecs consécutifs, instant du prochain essai)
+        self.failed = {}
+        self._task = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def check(self):
+        """Vérifie le registre une fois (bloquant) ; renvoie True si une nouvelle version a été activée"""
+        version = resolve_model_version(self.model_name, self.stage)
+        if version is None or version == self.current_version:
+            return False
+        attempts, retry_at = self.failed.get(version, (0, 0.0))
+        if attempts and self.clock() < retry_at:
+            return False
+        try:
+            self.load_fn(version)
+        except Exception:
+            attempts += 1
+            backoff = min(self.max_backoff_seconds, self.interval_seconds * 2 ** attempts)
+            self.failed[version] = (attempts, self.clock() + backoff)
+            if self.failures is not None:
+                self.failures.inc()
+            print(f"⚠️  Loading version {version} failed ({attempts} attempt(s)), next retry in {backoff:.0f}s")
+            raise
+        self.failed.pop(version, None)
+        self.current_version = version
+        return True
+
+    async def poll_once(self):
+        """Vérifie le registre une fois dans le threadpool ; renvoie True si une nouvelle version a été activée"""
+        return await run_in_threadpool(self.check)
+
+    def start_thread(self, on_swap=None):
+        """Polling dans un thread démon ; `on_swap(version)` est appelé après chaque bascule"""
+        def run():
+            while not self._stop_event.wait(self.interval_seconds):
+                try:
+                    if self.check():
+                        print(f"🔄 Model {self.model_name} hot-swapped to version {self.current_version}")
+                        if on_swap is not None:
+                            on_swap(self.current_version)
+                except Exception as e:
+                    print(f"⚠️  Registry polling failed: {e}")
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=run, name="registry-poller", daemon=True)
+        self._thread.start()
+
+    def stop_thread(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                if await self.poll_once():
+                    print(f"🔄 Model {self.model_name} hot-swapped to version {self.current_version}")
+            except Exception as e:
+                print(f"⚠️  Registry polling failed: {e}")
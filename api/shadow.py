@@ -0,0 +1,134 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class Candidate:
+    """Version candidate servie à côté du modèle principal"""
+
+    def __init__(self, version, estimator, layout, preprocessor=None, canary_fraction=0.0):
+        self.version = str(version)
+        self.estimator = estimator
+        self.layout = layout
+        self.preprocessor = preprocessor
+        self.canary_fraction = canary_fraction
+
+    @property
+    def mode(self):
+        return "canary" if self.canary_fraction > 0 else "shadow"
+
+
+def probability_divergence(primary, candidate):
+    """Distance en variation totale par ligne : 0 (identiques) à 1 (disjointes)"""
+    return 0.5 * np.abs(np.asarray(primary) - np.asarray(candidate)).sum(axis=1)
+
+
+class ShadowScorer:
+    """Scoring shadow/canary des versions candidates hors du chemin critique.
+
+    Après la réponse du modèle principal, `submit` confie la matrice de
+    features déjà construite à un pool de threads dédié, qui score chaque
+    candidate et compare : accord des classes, écart de latence et divergence
+    des probabilités. Le chemin de requête ne fait qu'un test de capacité :
+    au-delà de `max_pending` lots en attente, ou si `overloaded()` signale une
+    saturation (ex. file d'admission non vide), le travail shadow est
+    abandonné et compté plutôt que de concurrencer les requêtes principales.
+
+    Une candidate en mode canary reçoit en plus `canary_fraction` du trafic
+    (`route`) : sa réponse est alors servie à la place de celle du principal.
+    """
+
+    def __init__(self, score_fn, candidates, max_workers=1, max_pending=32, overloaded=None,
+                 agreement=None, latency_delta=None, divergence=None, dropped=None, rng=None):
+        self.score_fn = score_fn
+        self.candidates = list(candidates)
+        self.max_pending = max_pending
+        self.overloaded = overloaded
+        self.agreement = agreement
+        self.latency_delta = latency_delta
+        self.divergence = divergence
+        self.dropped = dropped
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._random = (rng or random.Random()).random
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shadow")
+        self._canaries = [candidate for candidate in self.candidates if candidate.canary_fraction > 0]
+
+    def route(self):
+        """Chemin chaud : renvoie la canary qui doit servir cette requête, sinon None"""
+        if not self._canaries:
+            return None
+        draw = self._random()
+        for candidate in self._canaries:
+            if draw < candidate.canary_fraction:
+                return candidate
+            draw -= candidate.canary_fraction
+        return None
+
+    def _drop(self, reason):
+        if self.dropped is not None:
+            for candidate in self.candidates:
+                self.dropped.labels(version=candidate.version, reason=reason).inc()
+
+    def submit(self, columns, X, predictions, probabilities, primary_latency):
+        """Chemin chaud : planifie la comparaison des candidates sur `X`, ou l'abandonne sous charge"""
+        if self.overloaded is not None and self.overloaded():
+            self._drop("overloaded")
+            return False
+        with self._lock:
+            if self.pending >= self.max_pending:
+                full = True
+            else:
+                full = False
+                self.pending += 1
+        if full:
+            self._drop("queue_full")
+            return False
+        self._executor.submit(self._compare, columns, X, predictions, probabilities, primary_latency)
+        return True
+
+    def _compare(self, columns, X, predictions, probabilities, primary_latency):
+        try:
+            predictions = np.asarray(predictions).reshape(-1)
+            if probabilities is not None:
+                probabilities = np.asarray(probabilities).reshape(len(predictions), -1)
+            for candidate in self.candidates:
+                try:
+                    self._compare_candidate(candidate, columns, X, predictions, probabilities, primary_latency)
+                except Exception as e:
+                    self._drop_candidate(candidate, "error")
+                    print(f"⚠️  Shadow scoring failed for version {candidate.version}: {e}")
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def _drop_candidate(self, candidate, reason):
+        if self.dropped is not None:
+            self.dropped.labels(version=candidate.version, reason=reason).inc()
+
+    def _compare_candidate(self, candidate, columns, X, predictions, probabilities, primary_latency):
+        X = candidate.layout.reorder(X, columns)
+        start = time.perf_counter()
+        candidate_predictions, candidate_probabilities = self.score_fn(
+            X, candidate.estimator, candidate.layout, candidate.preprocessor
+        )
+        latency = time.perf_counter() - start
+
+        labels = {"version": candidate.version, "mode": candidate.mode}
+        if self.agreement is not None:
+            agree = int(np.count_nonzero(candidate_predictions == predictions))
+            self.agreement.labels(result="agree", **labels).inc(agree)
+            self.agreement.labels(result="disagree", **labels).inc(len(predictions) - agree)
+        if self.latency_delta is not None:
+            self.latency_delta.labels(**labels).observe(latency - primary_latency)
+        if self.divergence is not None and probabilities is not None and candidate_probabilities is not None:
+            if candidate_probabilities.shape == probabilities.shape:
+                child = self.divergence.labels(**labels)
+                for value in probability_divergence(probabilities, candidate_probabilities):
+                    child.observe(value)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,207 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """Sketch de quantiles KLL : mémoire bornée, fusionnable entre blocs et processus.
+
+    Les valeurs sont ajoutées au niveau 0 ; quand un niveau dépasse sa capacité
+    il est trié puis compacté (une valeur sur deux, décalage aléatoire) vers le
+    niveau suivant où chaque valeur pèse deux fois plus. La capacité décroît
+    géométriquement vers les niveaux bas : environ 3·k valeurs sont conservées
+    quel que soit le nombre de lignes, pour une erreur de rang de l'ordre de 1/k.
+
+    Les `tail_size` plus petites et plus grandes valeurs sont en plus conservées
+    exactement : les valeurs aberrantes, rares par nature, sont comptées sans
+    approximation tant qu'elles tiennent dans ces queues.
+    """
+
+    def __init__(self, k=200, tail_size=1024, seed=None):
+        self.k = k
+        self.tail_size = tail_size
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self.low_tail = np.empty(0)
+        self.high_tail = np.empty(0)
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # Nombre impair : la dernière valeur reste à ce niveau
+            keep = items[len(items) - len(items) % 2:]
+            promoted = items[self._rng.integers(2):len(items) - len(items) % 2:2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Ajouter un niveau réduit la capacité des niveaux inférieurs : on repart du bas
+            level = 0
+
+    def _update_tails(self, low_values, high_values):
+        size = self.tail_size
+        low = np.concatenate([self.low_tail, low_values])
+        high = np.concatenate([self.high_tail, high_values])
+        if len(low) > size:
+            low = np.partition(low, size - 1)[:size]
+        if len(high) > size:
+            high = np.partition(high, len(high) - size)[-size:]
+        self.low_tail = np.sort(low)
+        self.high_tail = np.sort(high)
+
+    def update(self, values):
+        """Ajoute un tableau de valeurs (les NaN sont ignorés)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        self._update_tails(values, values)
+
+    def merge(self, other):
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._update_tails(other.low_tail, other.high_tail)
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        return values[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs):
+        """Quantiles approchés (bornés par les min/max exacts)"""
+        if self.n == 0:
+            return [None] * len(qs)
+        values, cumulative = self._weighted()
+        positions = np.searchsorted(cumulative, np.asarray(qs) * cumulative[-1], side="left")
+        result = values[np.minimum(positions, len(values) - 1)]
+        result = np.where(np.asarray(qs) <= 0, self.min, result)
+        result = np.where(np.asarray(qs) >= 1, self.max, result)
+        return [float(value) for value in result]
+
+    def rank(self, x):
+        """Fraction approchée des valeurs strictement inférieures à `x`"""
+        if self.n == 0:
+            return 0.0
+        values, cumulative = self._weighted()
+        position = np.searchsorted(values, x, side="left")
+        return float(cumulative[position - 1] / cumulative[-1]) if position else 0.0
+
+    def count_outside(self, low, high):
+        """Nombre de valeurs hors de [low, high] : exact si la borne tombe dans une queue conservée"""
+        if self.n == 0:
+            return 0
+        # Toute valeur absente de la queue basse est ≥ son maximum (resp. ≤ minimum de la queue haute)
+        if low <= self.low_tail[-1]:
+            below = int(np.searchsorted(self.low_tail, low, side="left"))
+        else:
+            below = int(round(self.rank(low) * self.n))
+        if high >= self.high_tail[0]:
+            above = len(self.high_tail) - int(np.searchsorted(self.high_tail, high, side="right"))
+        else:
+            values, cumulative = self._weighted()
+            at_most = np.searchsorted(values, high, side="right")
+            fraction_at_most = cumulative[at_most - 1] / cumulative[-1] if at_most else 0.0
+            above = int(round((1 - fraction_at_most) * self.n))
+        return below + above
+
+
+class DistinctCounter:
+    """Compte les lignes distinctes à partir de leurs hachages 64 bits.
+
+    Exact tant que le nombre de hachages distincts tient dans `max_exact`
+    (8 octets chacun) ; au-delà, bascule sur l'estimation HyperLogLog tenue en
+    parallèle (2^p registres d'un octet, erreur ≈ 1.04/√2^p).
+    """
+
+    def __init__(self, max_exact=2_000_000, p=14):
+        self.max_exact = max_exact
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+        self._unique = np.empty(0, dtype=np.uint64)
+        self._pending = []
+        self._pending_size = 0
+        self._exact = True
+
+    @property
+    def exact(self):
+        """Vrai tant que le nombre de hachages distincts tient dans le budget"""
+        if self._exact:
+            self._compact()
+        return self._exact
+
+    def _compact(self):
+        if self._pending:
+            self._unique = np.unique(np.concatenate([self._unique, *self._pending]))
+            self._pending, self._pending_size = [], 0
+        if len(self._unique) > self.max_exact:
+            self._exact = False
+            self._unique = np.empty(0, dtype=np.uint64)
+
+    def _update_registers(self, hashes):
+        bits = 64 - self.p
+        index = (hashes >> np.uint64(bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # Position du bit de poids fort calculée sur des moitiés ≤ 25 bits : log2 exact en float64
+        half = bits // 2
+        high = (rest >> np.uint64(half)).astype(np.float64)
+        low = (rest & np.uint64((1 << half) - 1)).astype(np.float64)
+        with np.errstate(divide="ignore"):
+            msb = np.where(high > 0, half + np.floor(np.log2(high)), np.floor(np.log2(low)))
+        rho = np.where(rest > 0, bits - msb, bits + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rho)
+
+    def update(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        self._update_registers(hashes)
+        if not self._exact:
+            return
+        self._pending.append(np.unique(hashes))
+        self._pending_size += len(self._pending[-1])
+        # Fusion amortie : seulement quand l'attente dépasse l'ensemble déjà consolidé
+        if self._pending_size > max(len(self._unique), 65536):
+            self._compact()
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        if self._exact and other.exact:
+            self._pending.append(other._unique)
+            self._compact()
+        else:
+            self._exact = False
+            self._unique, self._pending = np.empty(0, dtype=np.uint64), []
+        return self
+
+    def _estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+    def count(self):
+        return len(self._unique) if self.exact else self._estimate()
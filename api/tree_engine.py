@@ -0,0 +1,180 @@
+import warnings
+
+import numpy as np
+
+from sklearn.dummy import DummyClassifier
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, ExtraTreesClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+# Taille des blocs de lignes traversés d'un coup (borne la mémoire des index de nœuds)
+CHUNK_ROWS = 8192
+
+# Au-delà, la boucle C de sklearn amortit son overhead et redevient plus rapide
+DEFAULT_MAX_ROWS = 256
+
+
+def _pack_trees(trees):
+    """Concatène les arbres sklearn en tableaux plats (feature, seuil, enfants).
+
+    Les feuilles bouclent sur elles-mêmes avec un seuil +inf : la traversée
+    vectorisée peut ainsi itérer `max_depth` fois sur tous les arbres sans
+    cas particulier.
+    """
+    features, thresholds, lefts, rights, roots, values = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        n_nodes = tree.node_count
+        node_ids = np.arange(n_nodes, dtype=np.int64)
+        is_leaf = tree.children_left == -1
+
+        features.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+        thresholds.append(np.where(is_leaf, np.inf, tree.threshold).astype(np.float64))
+        lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+        rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+        values.append(tree.value[:, 0, :])
+        roots.append(offset)
+
+        max_depth = max(max_depth, tree.max_depth)
+        offset += n_nodes
+
+    return (
+        np.concatenate(features),
+        np.concatenate(thresholds),
+        np.concatenate(lefts).astype(np.intp),
+        np.concatenate(rights).astype(np.intp),
+        np.asarray(roots, dtype=np.intp),
+        np.concatenate(values).astype(np.float64),
+        max_depth,
+    )
+
+
+class CompiledTreeEnsemble:
+    """Moteur d'inférence vectorisé pour les modèles à arbres du registre.
+
+    Compile au chargement un DecisionTreeClassifier, RandomForestClassifier
+    (ou ExtraTrees) ou GradientBoostingClassifier ajusté en tableaux NumPy
+    plats, puis évalue tous les arbres à la fois par une traversée vectorisée.
+    Expose `predict`, `predict_proba` et `classes_` comme l'estimateur d'origine.
+    Les lots de plus de `max_rows` lignes sont délégués à sklearn (`None` pour
+    toujours utiliser la traversée compilée).
+    """
+
+    def __init__(self, estimator, max_rows=DEFAULT_MAX_ROWS):
+        self.kind = None
+        self.max_rows = max_rows
+        self.classes_ = np.asarray(estimator.classes_)
+        self.n_features_in_ = estimator.n_features_in_
+        self._estimator = estimator
+
+        if isinstance(estimator, DecisionTreeClassifier):
+            self.kind = "forest"
+            trees = [estimator.tree_]
+        elif isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier)):
+            self.kind = "forest"
+            trees = [e.tree_ for e in estimator.estimators_]
+        elif isinstance(estimator, GradientBoostingClassifier):
+            self.kind = "boosting"
+            init = estimator.init_
+            if not (init == "zero" or (isinstance(init, DummyClassifier) and init.strategy == "prior")):
+                raise ValueError("Estimateur init non constant : compilation impossible")
+            trees = [e.tree_ for e in estimator.estimators_.ravel()]
+            self.n_trees_per_iteration = estimator.estimators_.shape[1]
+            self.learning_rate = estimator.learning_rate
+            self.raw_init = estimator._raw_predict_init(
+                np.zeros((1, estimator.n_features_in_), dtype=np.float32)
+            )[0].astype(np.float64)
+            self._loss = getattr(estimator, "_loss", None)
+        else:
+            raise ValueError(f"Modèle non supporté par le moteur compilé : {type(estimator).__name__}")
+
+        if getattr(estimator, "n_outputs_", 1) != 1:
+            raise ValueError("Seuls les modèles mono-sortie sont supportés")
+
+        (self.feature, self.threshold, self.left, self.right,
+         self.roots, values, self.max_depth) = _pack_trees(trees)
+        self.n_trees = len(self.roots)
+
+        if self.kind == "forest":
+            # predict_proba d'un arbre = valeurs de la feuille normalisées
+            totals = values.sum(axis=1, keepdims=True)
+            totals[totals == 0.0] = 1.0
+            self.leaf_value = values / totals
+        else:
+            self.leaf_value = values[:, 0]
+
+    def _leaves(self, X):
+        """Renvoie l'index (plat) de la feuille atteinte pour chaque (ligne, arbre)"""
+        n = X.shape[0]
+        flat = X.ravel()
+        row_offsets = (np.arange(n, dtype=np.intp) * X.shape[1])[:, None]
+        node = np.broadcast_to(self.roots, (n, self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            go_left = flat[row_offsets + self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def _proba_chunk(self, X):
+        leaves = self._leaves(X)
+        if self.kind == "forest":
+            return self.leaf_value[leaves].sum(axis=1) / self.n_trees
+
+        k = self.n_trees_per_iteration
+        contributions = self.leaf_value[leaves].reshape(X.shape[0], -1, k)
+        raw = self.raw_init + self.learning_rate * contributions.sum(axis=1)
+        if self._loss is not None:
+            return self._loss.predict_proba(raw)
+        if k == 1:
+            positive = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        exp = np.exp(raw - raw.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, X):
+        if self.max_rows is not None and X.shape[0] > self.max_rows:
+            return self._estimator.predict_proba(X)
+        # Même conversion que sklearn : les seuils sont comparés à des float32
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.shape[0] <= CHUNK_ROWS:
+            return self._proba_chunk(X)
+        return np.concatenate([
+            self._proba_chunk(X[start:start + CHUNK_ROWS])
+            for start in range(0, X.shape[0], CHUNK_ROWS)
+        ])
+
+    def predict(self, X):
+        return self.classes_.take(self.predict_proba(X).argmax(axis=1))
+
+
+def _probe_rows(engine, n_rows, seed):
+    """Lignes de sonde couvrant, pour chaque feature, l'intervalle de ses seuils de coupure"""
+    rng = np.random.default_rng(seed)
+    split = np.isfinite(engine.threshold)
+    X = np.zeros((n_rows, engine.n_features_in_))
+    for j in range(engine.n_features_in_):
+        thresholds = engine.threshold[split & (engine.feature == j)]
+        if thresholds.size:
+            X[:, j] = rng.uniform(thresholds.min() - 1.0, thresholds.max() + 1.0, n_rows)
+    return X
+
+
+def compile_estimator(estimator, max_rows=DEFAULT_MAX_ROWS, probe_rows=256, seed=0):
+    """Compile l'estimateur si possible, sinon le renvoie inchangé.
+
+    Le boosting s'appuie sur des attributs privés de sklearn (`_raw_predict_init`,
+    `_loss`) : toute erreur de compilation, ou un écart avec `predict_proba` de
+    sklearn sur des lignes de sonde, fait retomber sur sklearn avec la raison.
+    """
+    try:
+        engine = CompiledTreeEnsemble(estimator, max_rows=max_rows)
+        X = _probe_rows(engine, probe_rows, seed)
+        with warnings.catch_warnings():
+            # Estimateur ajusté sur un DataFrame : avertissement sur les noms de colonnes sans objet ici
+            warnings.simplefilter("ignore", UserWarning)
+            expected = estimator.predict_proba(X)
+        if not np.allclose(engine.predict_proba(X), expected, rtol=0, atol=1e-9):
+            raise ValueError("probabilités différentes de sklearn sur les lignes de sonde")
+    except Exception as e:
+        print(f"⚠️  Compiled engine unavailable, using sklearn: {e}")
+        return estimator
+    return engine
@@ -0,0 +1,195 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Bornes de plausibilité des features (source unique, reprise par tests/data_validation/data_validator.py)
+FEATURE_RANGES = {
+    'Pregnancies': (0, 20),
+    'Glucose': (0, 300),
+    'BloodPressure': (0, 200),
+    'SkinThickness': (0, 100),
+    'Insulin': (0, 1000),
+    'BMI': (10, 70),
+    'DiabetesPedigreeFunction': (0, 3),
+    'Age': (0, 120)
+}
+
+CHECKS = ("null", "type", "range")
+
+
+class ValidationReport:
+    """Rapport structuré de toutes les violations, par contrôle et par colonne.
+
+    Chaque violation garde son nombre total et les indices de lignes (0 = première
+    ligne de données) concernés, limités à `max_row_indexes` par colonne pour que
+    la mémoire reste bornée sur des fichiers de plusieurs millions de lignes.
+    """
+
+    def __init__(self, max_row_indexes=100):
+        self.max_row_indexes = max_row_indexes
+        self.rows = 0
+        self.chunks = 0
+        self.missing_columns = []
+        self.violations = {check: {} for check in CHECKS}
+
+    @property
+    def valid(self):
+        return not self.missing_columns and not any(self.violations.values())
+
+    def add(self, check, column, row_indexes):
+        """Enregistre les lignes (tableau d'indices) violant `check` sur `column`"""
+        entry = self.violations[check].setdefault(column, {"count": 0, "rows": []})
+        entry["count"] += len(row_indexes)
+        room = self._room(entry)
+        if room:
+            entry["rows"].extend(int(i) for i in row_indexes[:room])
+
+    def _room(self, entry):
+        if self.max_row_indexes is None:
+            return None
+        return max(self.max_row_indexes - len(entry["rows"]), 0)
+
+    def merge(self, other):
+        """Ajoute le rapport d'un bloc suivant (les indices sont déjà absolus)"""
+        self.rows += other.rows
+        self.chunks += other.chunks
+        for column in other.missing_columns:
+            if column not in self.missing_columns:
+                self.missing_columns.append(column)
+        for check, columns in other.violations.items():
+            for column, other_entry in columns.items():
+                entry = self.violations[check].setdefault(column, {"count": 0, "rows": []})
+                entry["count"] += other_entry["count"]
+                room = self._room(entry)
+                entry["rows"].extend(other_entry["rows"][:room])
+        return self
+
+    def to_dict(self):
+        return {
+            "valid": self.valid,
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "missing_columns": list(self.missing_columns),
+            "violations": {check: dict(columns) for check, columns in self.violations.items() if columns},
+        }
+
+
+class ChunkValidator:
+    """Valide nulls, types et bornes de toutes les colonnes en une passe NumPy par bloc.
+
+    `validate_matrix` est le mode « lot » réutilisé par l'API : la matrice de
+    features déjà construite est contrôlée en un seul appel vectorisé.
+    """
+
+    def __init__(self, ranges=None, max_row_indexes=100):
+        self.ranges = dict(FEATURE_RANGES if ranges is None else ranges)
+        self.columns = list(self.ranges)
+        bounds = np.array([self.ranges[col] for col in self.columns], dtype=np.float64)
+        self.low = bounds[:, 0]
+        self.high = bounds[:, 1]
+        self.max_row_indexes = max_row_indexes
+
+    def _collect(self, report, check, mask, start_row):
+        """Une seule recherche des lignes fautives, limitée aux colonnes en violation"""
+        counts = mask.sum(axis=0)
+        for j in np.flatnonzero(counts):
+            report.add(check, self.columns[j], np.flatnonzero(mask[:, j]) + start_row)
+
+    def validate_matrix(self, X, start_row=0, type_errors=None):
+        """Contrôle une matrice (n, len(columns)) ; NaN = valeur manquante"""
+        X = np.asarray(X, dtype=np.float64)
+        report = ValidationReport(self.max_row_indexes)
+        report.rows = X.shape[0]
+        report.chunks = 1
+
+        missing = np.isnan(X)
+        if type_errors is not None:
+            # Une valeur non numérique est signalée comme erreur de type, pas comme null
+            missing &= ~type_errors
+            self._collect(report, "type", type_errors, start_row)
+        self._collect(report, "null", missing, start_row)
+
+        # Les comparaisons avec NaN sont fausses : les nulls ne sont pas hors bornes
+        with np.errstate(invalid="ignore"):
+            out_of_range = (X < self.low) | (X > self.high)
+        self._collect(report, "range", out_of_range, start_row)
+        return report
+
+    def validate_frame(self, df, start_row=0):
+        """Contrôle un bloc pandas ; les colonnes absentes sont signalées sans lever"""
+        import pandas as pd
+
+        missing_columns = [col for col in self.columns if col not in df.columns]
+        if missing_columns:
+            # Les colonnes présentes sont tout de même contrôlées
+            present = {col: bounds for col, bounds in self.ranges.items() if col in df.columns}
+            if present:
+                report = ChunkValidator(present, self.max_row_indexes).validate_frame(df, start_row)
+            else:
+                report = ValidationReport(self.max_row_indexes)
+                report.rows, report.chunks = len(df), 1
+            report.missing_columns = missing_columns
+            return report
+
+        block = df[self.columns]
+        type_errors = None
+        non_numeric = [j for j, col in enumerate(self.columns) if not pd.api.types.is_numeric_dtype(block[col])]
+        if non_numeric:
+            # Seules les colonnes de type objet sont converties ; les autres passent telles quelles
+            block = block.copy()
+            type_errors = np.zeros(block.shape, dtype=bool)
+            for j in non_numeric:
+                col = self.columns[j]
+                coerced = pd.to_numeric(block[col], errors="coerce")
+                type_errors[:, j] = (coerced.isna() & block[col].notna()).to_numpy()
+                block[col] = coerced
+        return self.validate_matrix(block.to_numpy(dtype=np.float64, na_value=np.nan), start_row, type_errors)
+
+
+def iter_file_chunks(path, chunk_rows=100_000):
+    """Lit un CSV ou un Parquet par blocs de `chunk_rows` lignes : (bloc, première ligne)"""
+    start_row = 0
+    if path.lower().endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            chunk = batch.to_pandas()
+            yield chunk, start_row
+            start_row += len(chunk)
+    else:
+        import pandas as pd
+
+        for chunk in pd.read_csv(path, chunksize=chunk_rows):
+            yield chunk, start_row
+            start_row += len(chunk)
+
+
+def _validate_chunk(args):
+    validator, chunk, start_row = args
+    return validator.validate_frame(chunk, start_row)
+
+
+def validate_file(path, validator=None, chunk_rows=100_000, workers=1):
+    """Valide un fichier complet en flux ; `workers` > 1 répartit les blocs sur un pool de processus"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    validator = validator or ChunkValidator()
+    report = ValidationReport(validator.max_row_indexes)
+    chunks = ((validator, chunk, start_row) for chunk, start_row in iter_file_chunks(path, chunk_rows))
+
+    if workers <= 1:
+        for args in chunks:
+            report.merge(_validate_chunk(args))
+        return report
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Au plus 2 blocs en vol par worker : mémoire bornée, rapports fusionnés dans l'ordre
+        pending = []
+        for args in chunks:
+            pending.append(pool.submit(_validate_chunk, args))
+            if len(pending) >= 2 * workers:
+                report.merge(pending.pop(0).result())
+        for future in pending:
+            report.merge(future.result())
+    return report
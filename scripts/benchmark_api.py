@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import os
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+FEATURE_COLUMNS = [
+    'Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
+    'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'
+]
+RAW_DATA_PATH = 'data/raw/dataset-diabete-68e2810ab0d7e949117525.csv'
+
+
+def load_payload_records(path=None):
+    """Charge des enregistrements patients : NDJSON rejoué (ex. requests.jsonl) ou CSV de data/raw"""
+    path = path or os.path.join(ROOT, RAW_DATA_PATH)
+    records = []
+    if path.endswith(".csv"):
+        import csv
+        with open(path, encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                records.append({col: float(row[col]) for col in FEATURE_COLUMNS})
+    else:
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                # Les lignes sans les 8 features (ex. autres journaux) sont ignorées
+                if all(col in record for col in FEATURE_COLUMNS):
+                    records.append({col: record[col] for col in FEATURE_COLUMNS})
+    if not records:
+        raise ValueError(f"Aucun enregistrement exploitable dans {path}")
+    return records
+
+
+def build_bodies(records, endpoint, batch_size, seed=42):
+    """Pré-encode les corps de requêtes pour ne pas mesurer la sérialisation côté client"""
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(records))
+    if endpoint == "/predict":
+        return [json.dumps(records[i]).encode() for i in order]
+    bodies = []
+    for start in range(0, len(order), batch_size):
+        ids = order[start:start + batch_size]
+        if len(ids) == batch_size:
+            bodies.append(json.dumps({"records": [records[i] for i in ids]}).encode())
+    return bodies or [json.dumps({"records": [records[i] for i in order[:batch_size]]}).encode()]
+
+
+def export_stub_bundle(output_dir):
+    """Bundle d'un DummyClassifier : isole le coût de l'API de celui du modèle"""
+    import pandas as pd
+    from sklearn.dummy import DummyClassifier
+
+    from api.artifacts import export_bundle
+
+    df = pd.read_csv(os.path.join(ROOT, RAW_DATA_PATH))
+    y = np.arange(len(df)) % 2
+    stub = DummyClassifier(strategy="prior").fit(df[FEATURE_COLUMNS], y)
+    return export_bundle(stub, FEATURE_COLUMNS, output_dir, "DiabetesClusterClassifier", 0)
+
+
+async def drive(client, endpoint, bodies, n_requests, concurrency, rate=None, warmup=0, headers=None):
+    """Envoie `n_requests` requêtes avec `concurrency` clients ; `rate` (req/s) en boucle ouverte"""
+    headers = headers or {"Content-Type": "application/json"}
+    for i in range(warmup):
+        await client.post(endpoint, content=bodies[i % len(bodies)], headers=headers)
+
+    latencies = []
+    statuses = {}
+    next_index = 0
+    start = time.perf_counter()
+
+    async def worker():
+        nonlocal next_index
+        while next_index < n_requests:
+            i = next_index
+            next_index += 1
+            if rate:
+                delay = start + i / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            t0 = time.perf_counter()
+            try:
+                response = await client.post(endpoint, content=bodies[i % len(bodies)], headers=headers)
+                status = response.status_code
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - t0)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def summarize(latencies, statuses, duration, rows_per_request=1):
+    lat_ms = np.asarray(latencies) * 1000
+    n = len(latencies)
+    errors = sum(count for status, count in statuses.items() if status != "200")
+    return {
+        "requests": n,
+        "errors": errors,
+        "statuses": statuses,
+        "duration_seconds": round(duration, 4),
+        "throughput_rps": round(n / duration, 2) if duration > 0 else 0.0,
+        "rows_per_second": round(n * rows_per_request / duration, 2) if duration > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(float(np.percentile(lat_ms, 50)), 3),
+            "p95": round(float(np.percentile(lat_ms, 95)), 3),
+            "p99": round(float(np.percentile(lat_ms, 99)), 3),
+            "max": round(float(lat_ms.max()), 3),
+        },
+    }
+
+
+async def run_inprocess(bundle_path, endpoint, bodies, n_requests, concurrency, rate, warmup):
+    import httpx
+    import api.main as serving
+
+    serving.load_model_bundle(bundle_path)
+    transport = httpx.ASGITransport(app=serving.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        return await drive(client, endpoint, bodies, n_requests, concurrency, rate, warmup)
+
+
+async def run_http(base_url, endpoint, bodies, n_requests, concurrency, rate, warmup):
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        return await drive(client, endpoint, bodies, n_requests, concurrency, rate, warmup)
+
+
+def start_uvicorn(bundle_path, port, extra_env=None, timeout=60):
+    """Lance l'API dans un sous-processus uvicorn et attend /ready"""
+    import urllib.request
+
+    env = {**os.environ, "MODEL_BUNDLE_PATH": bundle_path, **(extra_env or {})}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=1)
+            return process
+        except Exception:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("L'API n'est pas devenue prête à temps")
+
+
+def check_budget(summary, max_p99_ms=None, min_rps=None, max_error_rate=None):
+    failures = []
+    if max_p99_ms is not None and summary["latency_ms"]["p99"] > max_p99_ms:
+        failures.append(f"p99 {summary['latency_ms']['p99']} ms > {max_p99_ms} ms")
+    if min_rps is not None and summary["throughput_rps"] < min_rps:
+        failures.append(f"throughput {summary['throughput_rps']} req/s < {min_rps} req/s")
+    if max_error_rate is not None and summary["errors"] > max_error_rate * summary["requests"]:
+        failures.append(f"{summary['errors']} errors > {max_error_rate:.1%} of requests")
+    return failures
+
+
+def benchmark_api(args):
+    print("🏎️  API LOAD BENCHMARK")
+    print("="*60)
+
+    endpoint = "/predict/batch" if args.endpoint == "batch" else "/predict"
+    records = load_payload_records(args.payloads)
+    bodies = build_bodies(records, endpoint, args.batch_size)
+    rows_per_request = args.batch_size if endpoint == "/predict/batch" else 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_path = args.bundle or export_stub_bundle(tmp)
+        load_args = (endpoint, bodies, args.requests, args.concurrency, args.rate, args.warmup)
+
+        if args.url:
+            latencies, statuses, duration = asyncio.run(run_http(args.url, *load_args))
+        elif args.mode == "subprocess":
+            process = start_uvicorn(bundle_path, args.port)
+            try:
+                latencies, statuses, duration = asyncio.run(run_http(f"http://127.0.0.1:{args.port}", *load_args))
+            finally:
+                process.terminate()
+                process.wait()
+        else:
+            latencies, statuses, duration = asyncio.run(run_inprocess(bundle_path, *load_args))
+
+    summary = summarize(latencies, statuses, duration, rows_per_request)
+    summary["config"] = {
+        "mode": "url" if args.url else args.mode,
+        "endpoint": endpoint,
+        "batch_size": rows_per_request,
+        "concurrency": args.concurrency,
+        "rate": args.rate,
+        "model": "bundle" if args.bundle else "stub",
+    }
+    failures = check_budget(summary, args.max_p99_ms, args.min_rps, args.max_error_rate)
+    summary["budget_failures"] = failures
+
+    print(f"  Endpoint:     {endpoint} (concurrency {args.concurrency}, rate {args.rate or 'max'})")
+    print(f"  Requests:     {summary['requests']} ({summary['errors']} errors)")
+    print(f"  Throughput:   {summary['throughput_rps']:,.1f} req/s ({summary['rows_per_second']:,.0f} rows/s)")
+    lat = summary["latency_ms"]
+    print(f"  Latency (ms): p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}  max {lat['max']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2)
+        print(f"  Results written to {args.output}")
+
+    print("="*60)
+    if failures:
+        print("❌ PERFORMANCE BUDGET FAILED")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("✅ PERFORMANCE BUDGET PASSED" if args.max_p99_ms or args.min_rps else "✅ BENCHMARK COMPLETED")
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the prediction API and report latency percentiles")
+    parser.add_argument("--mode", choices=["inprocess", "subprocess"], default="inprocess")
+    parser.add_argument("--url", default=None, help="Benchmark an already running API instead")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--bundle", default=None, help="Real local model bundle (default: stub model)")
+    parser.add_argument("--endpoint", choices=["predict", "batch"], default="predict")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--payloads", default=None, help="NDJSON (e.g. requests.jsonl) or CSV payload file")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=None, help="Target request rate (req/s), open loop")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--output", default=None, help="Machine-readable JSON results file")
+    parser.add_argument("--max-p99-ms", type=float, default=None)
+    parser.add_argument("--min-rps", type=float, default=None)
+    parser.add_argument("--max-error-rate", type=float, default=0.0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    benchmark_api(parse_args())
@@ -0,0 +1,41 @@
+import sys
+import os
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from api.features import FeatureLayout
+from api.main import DiabetesInput, FEATURE_COLUMNS
+
+
+def dataframe_path(records):
+    """Ancien chemin : data.model_dump() -> DataFrame -> réindexation des colonnes"""
+    df = pd.DataFrame([record.model_dump() for record in records])
+    return df[FEATURE_COLUMNS]
+
+
+def benchmark_feature_layout(batch_sizes=(1, 32, 1024), repeat=5):
+    print("⏱️  FEATURE MATRIX MICRO-BENCHMARK")
+    print("="*60)
+
+    raw = pd.read_csv('data/raw/dataset-diabete-68e2810ab0d7e949117525.csv', index_col=0)
+    records = [DiabetesInput(**row) for row in raw[FEATURE_COLUMNS].to_dict(orient='records')]
+    layout = FeatureLayout(FEATURE_COLUMNS)
+
+    for size in batch_sizes:
+        batch = (records * (size // len(records) + 1))[:size]
+        number = max(1, 20000 // size)
+        t_df = min(timeit.repeat(lambda: dataframe_path(batch), number=number, repeat=repeat)) / number
+        t_np = min(timeit.repeat(lambda: layout.matrix(batch), number=number, repeat=repeat)) / number
+        assert np.array_equal(dataframe_path(batch).to_numpy(), layout.matrix(batch))
+        print(f"  batch={size:>5}  DataFrame: {t_df * 1e6:10.1f} µs  "
+              f"FeatureLayout: {t_np * 1e6:10.1f} µs  speedup: x{t_df / t_np:.1f}")
+
+    print("="*60)
+
+
+if __name__ == "__main__":
+    benchmark_feature_layout()
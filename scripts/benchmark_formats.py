@@ -0,0 +1,133 @@
+import argparse
+import asyncio
+import json
+import sys
+import os
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from api.codecs import ARROW_MEDIA_TYPE, NUMPY_MEDIA_TYPE
+from scripts.benchmark_api import FEATURE_COLUMNS, drive, export_stub_bundle, load_payload_records, summarize
+
+
+def encode_json(rows):
+    return json.dumps(rows[0] if len(rows) == 1 else {"records": rows}).encode()
+
+
+def encode_numpy(dtype):
+    def encode(rows):
+        return np.asarray([[row[col] for col in FEATURE_COLUMNS] for row in rows], dtype=dtype).tobytes()
+    return encode
+
+
+def encode_arrow(rows):
+    import pyarrow as pa
+
+    batch = pa.record_batch(
+        [pa.array([row[col] for row in rows], type=pa.float64()) for col in FEATURE_COLUMNS], names=FEATURE_COLUMNS
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+# nom -> (encodeur du corps, Content-Type, Accept, paramètres de requête)
+FORMATS = {
+    "json": (encode_json, "application/json", "application/json", ""),
+    "json-no-echo": (encode_json, "application/json", "application/json", "?include_input=false"),
+    "numpy-f32": (encode_numpy("<f4"), f"{NUMPY_MEDIA_TYPE}; dtype=float32", NUMPY_MEDIA_TYPE, ""),
+    "numpy-f64": (encode_numpy("<f8"), f"{NUMPY_MEDIA_TYPE}; dtype=float64", NUMPY_MEDIA_TYPE, ""),
+    "arrow": (encode_arrow, ARROW_MEDIA_TYPE, ARROW_MEDIA_TYPE, ""),
+}
+
+
+def build_format_bodies(records, encode, batch_size, seed=42):
+    """Corps pré-encodés dans un format donné (mêmes lignes, même ordre pour tous les formats)"""
+    order = np.random.default_rng(seed).permutation(len(records))
+    size = min(batch_size, len(order))
+    return [
+        encode([records[i] for i in order[start:start + size]])
+        for start in range(0, len(order) - size + 1, size)
+    ]
+
+
+async def compare_formats(bundle_path, records, formats, endpoint, batch_size, n_requests, concurrency, warmup):
+    """Octets échangés et débit de chaque format, sur une même instance de l'API en mémoire"""
+    import httpx
+    import api.main as serving
+
+    serving.load_model_bundle(bundle_path)
+    transport = httpx.ASGITransport(app=serving.app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name in formats:
+            encode, content_type, accept, query = FORMATS[name]
+            bodies = build_format_bodies(records, encode, batch_size)
+            headers = {"Content-Type": content_type, "Accept": accept}
+            probe = await client.post(endpoint + query, content=bodies[0], headers=headers)
+            if probe.status_code != 200:
+                raise RuntimeError(f"{name}: HTTP {probe.status_code} {probe.text[:200]}")
+            latencies, statuses, duration = await drive(
+                client, endpoint + query, bodies, n_requests, concurrency, warmup=warmup, headers=headers
+            )
+            summary = summarize(latencies, statuses, duration, batch_size)
+            summary["request_bytes"] = round(sum(map(len, bodies)) / len(bodies), 1)
+            summary["response_bytes"] = len(probe.content)
+            results[name] = summary
+    return results
+
+
+def benchmark_formats(args):
+    print("📦 WIRE FORMAT BENCHMARK")
+    print("="*60)
+
+    endpoint = "/predict/batch" if args.endpoint == "batch" else "/predict"
+    batch_size = args.batch_size if endpoint == "/predict/batch" else 1
+    records = load_payload_records(args.payloads)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_path = args.bundle or export_stub_bundle(tmp)
+        results = asyncio.run(compare_formats(
+            bundle_path, records, args.formats, endpoint, batch_size, args.requests, args.concurrency, args.warmup
+        ))
+
+    baseline = results.get("json")
+    print(f"  Endpoint: {endpoint} ({batch_size} rows/request, concurrency {args.concurrency})")
+    print(f"  {'format':<14}{'req bytes':>11}{'resp bytes':>12}{'req/s':>10}{'rows/s':>12}{'p99 ms':>9}{'vs json':>9}")
+    for name, summary in results.items():
+        speedup = f"{summary['throughput_rps'] / baseline['throughput_rps']:.2f}x" if baseline else "-"
+        print(f"  {name:<14}{summary['request_bytes']:>11,.0f}{summary['response_bytes']:>12,}"
+              f"{summary['throughput_rps']:>10,.0f}{summary['rows_per_second']:>12,.0f}"
+              f"{summary['latency_ms']['p99']:>9.2f}{speedup:>9}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump({"endpoint": endpoint, "batch_size": batch_size, "formats": results}, handle, indent=2)
+        print(f"  Results written to {args.output}")
+
+    print("="*60)
+    print("✅ BENCHMARK COMPLETED")
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare JSON and binary wire formats on the prediction routes")
+    parser.add_argument("--endpoint", choices=["predict", "batch"], default="predict")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument("--bundle", default=None, help="Real local model bundle (default: stub model)")
+    parser.add_argument("--payloads", default=None, help="NDJSON (e.g. requests.jsonl) or CSV payload file")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--output", default=None, help="Machine-readable JSON results file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    benchmark_formats(parse_args())
@@ -0,0 +1,81 @@
+import argparse
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+
+from api.preprocessing import LOG_COLUMNS, ZERO_AS_MISSING_COLUMNS, fit_preprocessor
+
+FEATURE_COLUMNS = [
+    'Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
+    'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'
+]
+
+
+class NotebookPipeline:
+    """Ancien chemin : KNNImputer (recherche exhaustive) puis log1p et StandardScaler, copie à chaque étape"""
+
+    def __init__(self, df):
+        from sklearn.impute import KNNImputer
+        from sklearn.preprocessing import StandardScaler
+
+        data = df[FEATURE_COLUMNS].replace({col: {0: np.nan} for col in ZERO_AS_MISSING_COLUMNS})
+        self.imputer = KNNImputer(n_neighbors=5).fit(data[ZERO_AS_MISSING_COLUMNS])
+        data[ZERO_AS_MISSING_COLUMNS] = self.imputer.transform(data[ZERO_AS_MISSING_COLUMNS])
+        data[LOG_COLUMNS] = np.log1p(data[LOG_COLUMNS])
+        self.scaler = StandardScaler().fit(data)
+
+    def transform(self, X):
+        data = pd.DataFrame(X, columns=FEATURE_COLUMNS)
+        data = data.replace({col: {0: np.nan} for col in ZERO_AS_MISSING_COLUMNS})
+        data[ZERO_AS_MISSING_COLUMNS] = self.imputer.transform(data[ZERO_AS_MISSING_COLUMNS])
+        data[LOG_COLUMNS] = np.log1p(data[LOG_COLUMNS])
+        return self.scaler.transform(data)
+
+
+def timed(func, X, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(X)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_preprocessing(source, batch_sizes, baseline_max_rows, repeat=3):
+    print("⏱️  SERVING PREPROCESSING BENCHMARK")
+    print("="*60)
+
+    df = pd.read_csv(source)
+    preprocessor = fit_preprocessor(df, FEATURE_COLUMNS)
+    baseline = NotebookPipeline(df)
+    rows = df[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    zero_rate = (df[ZERO_AS_MISSING_COLUMNS] == 0).any(axis=1).mean()
+    print(f"  Source: {source} ({len(rows)} rows, {zero_rate:.0%} with a zero to impute)")
+
+    for size in batch_sizes:
+        X = np.ascontiguousarray(np.resize(rows, (size, rows.shape[1])))
+        fused = timed(preprocessor.transform, X, repeat)
+        line = f"  batch={size:>8}  fused: {fused * 1e3:10.3f} ms ({size / fused:12,.0f} rows/s)"
+        if size <= baseline_max_rows:
+            brute = timed(baseline.transform, X, repeat)
+            line += f"  KNNImputer+StandardScaler: {brute * 1e3:10.3f} ms  speedup: x{brute / fused:.1f}"
+        print(line)
+
+    print("="*60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of the fused serving preprocessing by batch size")
+    parser.add_argument("--source", default="data/validation/Cleaned_Data.csv")
+    parser.add_argument("--batch-sizes", default="1,10,100,1000,10000,100000,1000000")
+    parser.add_argument("--baseline-max-rows", type=int, default=10000,
+                        help="Largest batch also timed with the brute-force notebook pipeline")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.batch_sizes.split(",")]
+    benchmark_preprocessing(args.source, sizes, args.baseline_max_rows, args.repeat)
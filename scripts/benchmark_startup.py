@@ -0,0 +1,74 @@
+import json
+import subprocess
+import sys
+import os
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# Exécuté dans un interpréteur neuf : mesure l'import de l'API puis le premier score
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+import api.main as m
+t_import = time.perf_counter() - t0
+t1 = time.perf_counter()
+if sys.argv[1] == "bundle":
+    m.load_model_bundle(sys.argv[2])
+else:
+    m.load_model_uri(sys.argv[2], version=1)
+t_load = time.perf_counter() - t1
+t2 = time.perf_counter()
+m.score_matrix(m.feature_layout.row(m.DiabetesInput(
+    Pregnancies=6, Glucose=148, BloodPressure=72, SkinThickness=35,
+    Insulin=0, BMI=33.6, DiabetesPedigreeFunction=0.627, Age=50)))
+t_first = time.perf_counter() - t2
+print(json.dumps({"import": t_import, "load": t_load, "first_prediction": t_first,
+                  "total": time.perf_counter() - t0, "mlflow_imported": "mlflow" in sys.modules}))
+"""
+
+
+def probe(mode, path):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, mode, path],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "MLFLOW_DISABLE_AGENT_HINT": "1"}
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def benchmark_startup(repeat=3):
+    import mlflow.sklearn
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+
+    from api.artifacts import export_bundle
+    from api.main import FEATURE_COLUMNS
+
+    print("🚀 STARTUP TIME BENCHMARK")
+    print("="*60)
+
+    df = pd.read_csv('data/validation/Cleaned_Data.csv')
+    y = pd.read_csv('data/processed/Clustered_Data.csv')['Cluster']
+    estimator = RandomForestClassifier(n_estimators=100, random_state=42).fit(df[FEATURE_COLUMNS], y)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mlflow_path = os.path.join(tmp, "mlflow_model")
+        mlflow.sklearn.save_model(estimator, mlflow_path, serialization_format="cloudpickle")
+        bundle_path = export_bundle(estimator, FEATURE_COLUMNS, tmp, "DiabetesClusterClassifier", 1)
+
+        for mode, path in (("mlflow", mlflow_path), ("bundle", bundle_path)):
+            runs = [probe(mode, path) for _ in range(repeat)]
+            best = {k: min(r[k] for r in runs) for k in ("import", "load", "first_prediction", "total")}
+            print(f"\n📊 {mode} (best of {repeat}, mlflow imported: {runs[0]['mlflow_imported']})")
+            print(f"  import api.main:      {best['import']:.3f}s")
+            print(f"  model load + warm-up: {best['load']:.3f}s")
+            print(f"  first prediction:     {best['first_prediction'] * 1000:.2f} ms")
+            print(f"  time to first pred.:  {best['total']:.3f}s")
+
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    benchmark_startup()
@@ -0,0 +1,60 @@
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from api.tree_engine import CompiledTreeEnsemble
+
+
+def rows_per_second(predict_proba, X, min_duration=0.5):
+    """Répète l'appel jusqu'à `min_duration` secondes et renvoie le débit en lignes/s"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        predict_proba(X)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_duration:
+            return calls * X.shape[0] / elapsed
+
+
+def benchmark_tree_engine(batch_sizes=(1, 32, 1024, 100000)):
+    print("🌲 COMPILED TREE ENGINE BENCHMARK")
+    print("="*60)
+
+    X_df = pd.read_csv('data/processed/Ready_For_Model.csv')
+    y = pd.read_csv('data/processed/Clustered_Data.csv')['Cluster']
+    X_all = X_df.to_numpy()
+
+    estimators = {
+        "DecisionTree": DecisionTreeClassifier(random_state=42),
+        "RandomForest": RandomForestClassifier(n_estimators=100, random_state=42),
+        "GradientBoosting": GradientBoostingClassifier(random_state=42),
+    }
+
+    for name, estimator in estimators.items():
+        estimator.fit(X_all, y)
+        engine = CompiledTreeEnsemble(estimator, max_rows=None)
+        served = CompiledTreeEnsemble(estimator)
+        assert np.allclose(engine.predict_proba(X_all), estimator.predict_proba(X_all), rtol=0, atol=1e-12)
+
+        print(f"\n📊 {name} ({engine.n_trees} trees, max depth {engine.max_depth})")
+        for size in batch_sizes:
+            X = X_all[np.arange(size) % len(X_all)]
+            sk = rows_per_second(estimator.predict_proba, X)
+            compiled = rows_per_second(engine.predict_proba, X)
+            auto = rows_per_second(served.predict_proba, X)
+            print(f"  batch={size:>6}  sklearn: {sk:>12,.0f}  compiled: {compiled:>12,.0f}  "
+                  f"served (max_rows={served.max_rows}): {auto:>12,.0f} rows/s")
+
+    print("\n" + "="*60)
+
+
+if __name__ == "__main__":
+    benchmark_tree_engine()
@@ -0,0 +1,173 @@
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import os
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from scripts.benchmark_api import build_bodies, load_payload_records, run_http, summarize
+
+
+def export_forest_bundle(output_dir, n_estimators=300):
+    """Bundle d'une forêt de taille réaliste : la mémoire du modèle domine celle du worker"""
+    import pandas as pd
+    from sklearn.ensemble import RandomForestClassifier
+
+    from api.artifacts import export_bundle
+    from api.main import FEATURE_COLUMNS
+
+    df = pd.read_csv(os.path.join(ROOT, 'data/validation/Cleaned_Data.csv'))
+    y = pd.read_csv(os.path.join(ROOT, 'data/processed/Clustered_Data.csv'))['Cluster']
+    estimator = RandomForestClassifier(n_estimators=n_estimators, random_state=42).fit(df[FEATURE_COLUMNS], y)
+    return export_bundle(estimator, FEATURE_COLUMNS, output_dir, "DiabetesClusterClassifier", 1)
+
+
+def memory_kb(pid):
+    """RSS, PSS et mémoire partagée d'un processus (Ko, /proc/<pid>/smaps_rollup)"""
+    usage = {}
+    with open(f"/proc/{pid}/smaps_rollup") as handle:
+        for line in handle:
+            key, _, value = line.partition(":")
+            if key in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty"):
+                usage[key] = int(value.split()[0])
+    return {
+        "rss": usage.get("Rss", 0),
+        "pss": usage.get("Pss", 0),
+        "shared": usage.get("Shared_Clean", 0) + usage.get("Shared_Dirty", 0),
+    }
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as handle:
+        return [int(child) for child in handle.read().split()]
+
+
+def start_gunicorn(bundle_path, port, workers, preload, multiproc_dir, timeout=120):
+    """Lance l'API en mode multi-workers et attend que tous les workers soient prêts"""
+    import urllib.request
+
+    env = {
+        **os.environ,
+        "MODEL_BUNDLE_PATH": bundle_path,
+        "WEB_CONCURRENCY": str(workers),
+        "BIND": f"127.0.0.1:{port}",
+        "PRELOAD_APP": "true" if preload else "false",
+        "PROMETHEUS_MULTIPROC_DIR": multiproc_dir,
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "api/gunicorn_conf.py", "--log-level", "warning", "api.main:app"],
+        cwd=ROOT, env=env
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=1)
+            if len(child_pids(process.pid)) == workers:
+                # Laisse les derniers workers terminer leur démarrage
+                time.sleep(1)
+                return process
+        except Exception:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Les workers ne sont pas devenus prêts à temps")
+
+
+def aggregated_request_count(port):
+    """Somme de api_requests_total sur /predict telle qu'exposée par /metrics"""
+    import urllib.request
+
+    text = urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5).read().decode()
+    total = 0.0
+    for line in text.splitlines():
+        if line.startswith("api_requests_total{") and 'endpoint="/predict"' in line:
+            total += float(line.rsplit(" ", 1)[1])
+    return total
+
+
+def run_configuration(bundle_path, workers, preload, args, bodies):
+    with tempfile.TemporaryDirectory() as multiproc_dir:
+        process = start_gunicorn(bundle_path, args.port, workers, preload, multiproc_dir)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            latencies, statuses, duration = asyncio.run(
+                run_http(base_url, "/predict", bodies, args.requests, args.concurrency, None, args.warmup)
+            )
+            summary = summarize(latencies, statuses, duration)
+            workers_memory = [memory_kb(pid) for pid in child_pids(process.pid)]
+            summary["memory_kb"] = {
+                "master": memory_kb(process.pid),
+                "workers_rss_mean": sum(m["rss"] for m in workers_memory) // len(workers_memory),
+                "workers_pss_mean": sum(m["pss"] for m in workers_memory) // len(workers_memory),
+                "workers_shared_mean": sum(m["shared"] for m in workers_memory) // len(workers_memory),
+            }
+            summary["metrics_requests_total"] = aggregated_request_count(args.port)
+        finally:
+            process.terminate()
+            process.wait()
+    summary["config"] = {"workers": workers, "preload": preload, "concurrency": args.concurrency}
+    return summary
+
+
+def benchmark_workers(args):
+    print("🧮 MULTI-WORKER SIZING BENCHMARK")
+    print("="*60)
+
+    bodies = build_bodies(load_payload_records(args.payloads), "/predict", 1)
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle_path = args.bundle or export_forest_bundle(tmp, args.trees)
+        for workers in args.workers:
+            for preload in ((True, False) if args.compare_preload else (True,)):
+                summary = run_configuration(bundle_path, workers, preload, args, bodies)
+                results.append(summary)
+                memory = summary["memory_kb"]
+                print(f"\n📊 {workers} worker(s), preload={preload}")
+                print(f"  Throughput:      {summary['throughput_rps']:,.1f} req/s "
+                      f"(p99 {summary['latency_ms']['p99']} ms, {summary['errors']} errors)")
+                print(f"  Worker memory:   RSS {memory['workers_rss_mean'] / 1024:.1f} MB, "
+                      f"PSS {memory['workers_pss_mean'] / 1024:.1f} MB, "
+                      f"shared {memory['workers_shared_mean'] / 1024:.1f} MB")
+                # Les requêtes de warm-up du client sont aussi comptées
+                print(f"  /metrics total:  {summary['metrics_requests_total']:.0f} /predict requests "
+                      f"({args.requests + args.warmup} sent)")
+
+    baseline = results[0]["throughput_rps"] or 1.0
+    print("\n📈 Scaling (preload):")
+    for summary in results:
+        if summary["config"]["preload"]:
+            print(f"  {summary['config']['workers']} worker(s): x{summary['throughput_rps'] / baseline:.2f}")
+    print(f"  (CPUs available: {os.cpu_count()})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"  Results written to {args.output}")
+    print("="*60)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Measure throughput and per-worker memory for N API workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--compare-preload", action="store_true",
+                        help="Also run each configuration without loading the model in the master")
+    parser.add_argument("--bundle", default=None, help="Real local model bundle (default: 300-tree forest)")
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--payloads", default=None, help="NDJSON or CSV payload file")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--output", default=None, help="Machine-readable JSON results file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    benchmark_workers(parse_args())
@@ -0,0 +1,45 @@
+import argparse
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from api.drift import build_reference
+
+FEATURE_COLUMNS = [
+    'Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
+    'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'
+]
+
+
+def build_drift_reference(source, output, bins=10):
+    """Précalcule le profil de référence du suivi de dérive (DRIFT_REFERENCE_PATH)"""
+    print("📐 DRIFT REFERENCE PROFILE")
+    print("="*60)
+
+    df = pd.read_csv(source)
+    reference = build_reference(df, FEATURE_COLUMNS, bins)
+    reference["source"] = source
+    reference["rows"] = len(df)
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(reference, handle, indent=2)
+
+    print(f"✅ Reference built from {len(df)} rows of {source} ({bins} bins per feature)")
+    print(f"   Start the API with DRIFT_REFERENCE_PATH={output}")
+    print("="*60)
+    return reference
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the reference profile used by the API drift monitor")
+    parser.add_argument("--source", default="data/raw/dataset-diabete-68e2810ab0d7e949117525.csv",
+                        help="CSV in the same scale as /predict inputs")
+    parser.add_argument("--output", default="models/drift_reference.json")
+    parser.add_argument("--bins", type=int, default=10)
+    args = parser.parse_args()
+    build_drift_reference(args.source, args.output, args.bins)
@@ -0,0 +1,111 @@
+import argparse
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from api.artifacts import export_bundle
+from api.clustering import align_labels, read_matrix, sweep_k, write_clustered
+
+# Clustered_Data.csv suivi par git sert de jeu d'entraînement (validate_model_performance.py) :
+# la sortie par défaut est un répertoire de travail, le fichier suivi ne sert que de référence des labels
+OUTPUT_PATH = '.cache/clustering/Clustered_Data.csv'
+REFERENCE_PATH = 'data/processed/Clustered_Data.csv'
+
+FEATURE_COLUMNS = [
+    'Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
+    'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'
+]
+
+
+def reference_centers(path, label_column="Cluster"):
+    """Centres du clustering précédent (moyennes par cluster), pour garder la numérotation"""
+    if not os.path.exists(path):
+        return None
+    previous = pd.read_csv(path)
+    if label_column not in previous.columns:
+        return None
+    return previous.groupby(label_column)[FEATURE_COLUMNS].mean().sort_index().to_numpy()
+
+
+def cluster_patients(input_path, output, k_values, k=None, mode="full", n_jobs=-1, chunk_rows=100000,
+                     batch_size=4096, epochs=3, silhouette_size=10000, seed=42, bundle_dir=None,
+                     preprocessor_path=None, version="kmeans", reference=None):
+    """Étape K-Means reproductible : balayage de k, sortie Clustered_Data.csv et assigneur servable"""
+    print("🧩 K-MEANS CLUSTERING STAGE")
+    print("="*60)
+
+    # Labels alignés sur la référence, ou sur la sortie précédente (réécrite plus bas, donc lue avant)
+    previous = reference_centers(reference) if reference else None
+    if previous is None:
+        previous = reference_centers(output)
+
+    start = time.time()
+    # Mode full : une seule lecture en flux partagée par les workers (memmap joblib)
+    X = read_matrix(input_path, FEATURE_COLUMNS, chunk_rows) if mode == "full" else None
+    sweep = sweep_k(
+        k_values, path=input_path, X=X, columns=FEATURE_COLUMNS, mode=mode, n_jobs=n_jobs,
+        chunk_rows=chunk_rows, batch_size=batch_size, epochs=epochs, seed=seed, silhouette_size=silhouette_size
+    )
+    print(f"✅ Swept k={list(k_values)} ({mode}) in {time.time() - start:.1f}s")
+    for candidate, result in sweep.items():
+        silhouette = result["silhouette"]
+        silhouette = f"{silhouette:.3f}" if silhouette is not None else "n/a"
+        print(f"  k={candidate:<3} inertia={result['inertia']:14.1f}  silhouette (sampled)={silhouette}")
+
+    if k is None:
+        scored = {candidate: result for candidate, result in sweep.items() if result["silhouette"] is not None}
+        k = max(scored, key=lambda candidate: scored[candidate]["silhouette"])
+        print(f"🏆 Best k by sampled silhouette: {k}")
+    assigner = sweep[k]["assigner"]
+    if previous is not None:
+        assigner = align_labels(assigner, previous)
+
+    rows, counts = write_clustered(input_path, output, assigner, chunk_rows=chunk_rows)
+    print(f"✅ {rows} rows written to {output}")
+    for cluster, count in enumerate(counts):
+        print(f"  Cluster {cluster}: {count} rows")
+
+    if bundle_dir:
+        preprocessor = None
+        if preprocessor_path:
+            from api.preprocessing import load_preprocessor
+            preprocessor = load_preprocessor(preprocessor_path)
+        path = export_bundle(assigner, FEATURE_COLUMNS, bundle_dir, "DiabetesClusterAssigner", version, preprocessor)
+        print(f"✅ Nearest-centroid assigner exported to {path}")
+        print(f"   Start the API with MODEL_BUNDLE_PATH={path}")
+
+    print("="*60)
+    return assigner, sweep
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit K-Means on the model-ready data and label every row")
+    parser.add_argument("input", nargs="?", default="data/processed/Ready_For_Model.csv", help="CSV or Parquet file")
+    parser.add_argument("--output", default=OUTPUT_PATH,
+                        help=f"Labelled rows (pass {REFERENCE_PATH} explicitly to replace the training data)")
+    parser.add_argument("--reference", default=REFERENCE_PATH, help="Previous clustering whose label numbering is kept")
+    parser.add_argument("--k-min", type=int, default=2)
+    parser.add_argument("--k-max", type=int, default=9)
+    parser.add_argument("--k", type=int, default=None, help="Keep this k instead of the best silhouette")
+    parser.add_argument("--mode", choices=["full", "minibatch"], default="full",
+                        help="minibatch streams the file and keeps memory bounded (tens of millions of rows)")
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel k fits (-1 = all CPUs)")
+    parser.add_argument("--chunk-rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=4096, help="MiniBatch K-Means batch size")
+    parser.add_argument("--epochs", type=int, default=3, help="Passes over the file in minibatch mode")
+    parser.add_argument("--silhouette-sample", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--bundle-dir", default=None, help="Export the assigner as an API bundle in this directory")
+    parser.add_argument("--preprocessor", default=None,
+                        help="Preprocessing artifact to embed so the bundle scores raw /predict inputs")
+    args = parser.parse_args()
+    k_values = list(range(args.k_min, args.k_max + 1))
+    if args.k is not None and args.k not in k_values:
+        k_values.append(args.k)
+    cluster_patients(args.input, args.output, k_values, args.k, args.mode, args.jobs, args.chunk_rows,
+                     args.batch_size, args.epochs, args.silhouette_sample, args.seed, args.bundle_dir, args.preprocessor,
+                     reference=args.reference)
@@ -0,0 +1,50 @@
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.artifacts import export_bundle
+from api.preprocessing import load_preprocessor
+from api.features import FeatureLayout
+from api.main import FEATURE_COLUMNS, MODEL_NAME, MODEL_STAGE, unwrap_model
+from api.registry import resolve_model_version
+
+
+def export_model_bundle(version=None, output_dir='models', preprocessor_path=None):
+    """Exporte une version du registre en bundle joblib chargeable sans mlflow"""
+    import mlflow.pyfunc
+
+    print("📦 MODEL BUNDLE EXPORT")
+    print("="*60)
+
+    if version is None:
+        version = resolve_model_version(MODEL_NAME, MODEL_STAGE)
+        if version is None:
+            print(f"❌ No registered version found for {MODEL_NAME}")
+            sys.exit(1)
+
+    pyfunc_model = mlflow.pyfunc.load_model(f"models:/{MODEL_NAME}/{version}")
+    estimator = unwrap_model(pyfunc_model)
+    if estimator is pyfunc_model:
+        print("❌ Model is not a native sklearn estimator, cannot export a bundle")
+        sys.exit(1)
+
+    layout = FeatureLayout.from_model(FEATURE_COLUMNS, estimator=estimator, pyfunc_model=pyfunc_model)
+    preprocessor = load_preprocessor(preprocessor_path) if preprocessor_path else None
+    path = export_bundle(estimator, layout.columns, output_dir, MODEL_NAME, version, preprocessor)
+
+    print(f"✅ {MODEL_NAME} version {version} exported to {path}")
+    print(f"   Start the API with MODEL_BUNDLE_PATH={path}")
+    print("="*60)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a registry model version as a local bundle")
+    parser.add_argument("--version", type=int, default=None, help="Registry version (default: Production)")
+    parser.add_argument("--output-dir", default="models")
+    parser.add_argument("--preprocessor", default=None,
+                        help="Preprocessing artifact to embed (scripts/export_preprocessor.py)")
+    args = parser.parse_args()
+    export_model_bundle(args.version, args.output_dir, args.preprocessor)
@@ -0,0 +1,57 @@
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from api.preprocessing import fit_preprocessor, save_preprocessor
+
+FEATURE_COLUMNS = [
+    'Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
+    'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'
+]
+
+
+def load_scaler(uri):
+    """StandardScaler d'entraînement du modèle : fichier joblib/pickle ou URI MLflow (runs:/<id>/scaler)"""
+    if uri.endswith((".pkl", ".joblib")):
+        import joblib
+        return joblib.load(uri)
+    import mlflow.sklearn
+    return mlflow.sklearn.load_model(uri)
+
+
+def export_preprocessor(source, output, n_neighbors=5, scaler_uri=None):
+    """Ajuste et exporte le prétraitement servi par l'API (PREPROCESSOR_PATH)"""
+    print("🧪 SERVING PREPROCESSOR EXPORT")
+    print("="*60)
+
+    df = pd.read_csv(source)
+    preprocessor = fit_preprocessor(df, FEATURE_COLUMNS, n_neighbors=n_neighbors)
+    print(f"✅ Fitted on {len(df)} rows of {source} ({len(preprocessor.reference)} complete reference rows)")
+
+    if scaler_uri:
+        scaler = load_scaler(scaler_uri)
+        preprocessor.then(scaler.mean_, scaler.scale_)
+        print(f"✅ Training scaler {scaler_uri} folded into the affine step")
+
+    save_preprocessor(preprocessor, output)
+    print(f"✅ Preprocessor written to {output}")
+    print(f"   Start the API with PREPROCESSOR_PATH={output}")
+    print(f"   or embed it: scripts/export_model_bundle.py --preprocessor {output}")
+    print("="*60)
+    return preprocessor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit and export the serving-side preprocessing artifact")
+    parser.add_argument("--source", default="data/validation/Cleaned_Data.csv",
+                        help="Cleaned CSV in the same scale as /predict inputs")
+    parser.add_argument("--output", default="models/preprocessor.joblib")
+    parser.add_argument("--n-neighbors", type=int, default=5)
+    parser.add_argument("--scaler-uri", default=None,
+                        help="Model training StandardScaler to compose (joblib file or MLflow URI)")
+    args = parser.parse_args()
+    export_preprocessor(args.source, args.output, args.n_neighbors, args.scaler_uri)
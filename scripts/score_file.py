@@ -0,0 +1,104 @@
+import argparse
+import resource
+import sys
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import api.main as serving
+from api.bulk import parse_header, score_lines
+
+
+def load_serving_model(bundle_path=None):
+    """Charge le modèle exactement comme l'API (bundle local ou registre MLflow)"""
+    if bundle_path:
+        serving.load_model_bundle(bundle_path)
+    else:
+        serving.loadmodel()
+    if serving.model is None:
+        raise RuntimeError("Aucun modèle n'a pu être chargé")
+
+
+def _score_chunk(args):
+    lines, fmt, header, start_row = args
+    return score_lines(
+        lines, fmt, header, start_row, serving.DiabetesInput, serving.feature_layout, serving.score_matrix
+    ), len(lines)
+
+
+def iter_chunks(handle, fmt, header, chunk_rows):
+    """Lit le fichier par blocs de `chunk_rows` lignes (mémoire bornée)"""
+    start_row = 0
+    while True:
+        lines = [line.rstrip("\r\n") for line in islice(handle, chunk_rows)]
+        if not lines:
+            return
+        yield lines, fmt, header, start_row
+        start_row += len(lines)
+
+
+def peak_rss_mb():
+    """RSS maximal du processus et de ses workers (ru_maxrss est en Ko sous Linux)"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / 1024, children / 1024
+
+
+def score_file(input_path, output_path, chunk_rows=10000, workers=1, bundle_path=None):
+    print("📄 OFFLINE BULK SCORING")
+    print("="*60)
+
+    fmt = "csv" if input_path.lower().endswith(".csv") else "ndjson"
+    if workers <= 1:
+        load_serving_model(bundle_path)
+    start = time.time()
+    n_rows = 0
+
+    with open(input_path, encoding="utf-8") as handle, open(output_path, "w", encoding="utf-8") as out:
+        header = parse_header(handle.readline()) if fmt == "csv" else None
+        chunks = iter_chunks(handle, fmt, header, chunk_rows)
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=load_serving_model,
+                                     initargs=(bundle_path,)) as pool:
+                # Au plus 2 blocs en vol par worker : la mémoire reste bornée, l'ordre est conservé
+                pending = []
+                for chunk in chunks:
+                    pending.append(pool.submit(_score_chunk, chunk))
+                    if len(pending) >= 2 * workers:
+                        text, count = pending.pop(0).result()
+                        out.write(text)
+                        n_rows += count
+                for future in pending:
+                    text, count = future.result()
+                    out.write(text)
+                    n_rows += count
+        else:
+            for chunk in chunks:
+                text, count = _score_chunk(chunk)
+                out.write(text)
+                n_rows += count
+
+    duration = time.time() - start
+    own_rss, workers_rss = peak_rss_mb()
+    startup_note = " including worker start-up" if workers > 1 else ""
+    print(f"✅ {n_rows} rows scored in {duration:.2f}s{startup_note} ({n_rows / max(duration, 1e-9):,.0f} rows/sec)")
+    print(f"   Peak RSS: {own_rss:.1f} MB (main), {workers_rss:.1f} MB (largest worker)")
+    print(f"   Results written to {output_path}")
+    print("="*60)
+    return n_rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a CSV or NDJSON file in fixed-size chunks")
+    parser.add_argument("input", help="Input file (.csv or NDJSON)")
+    parser.add_argument("output", help="Output NDJSON file")
+    parser.add_argument("--chunk-rows", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size (1 = in-process)")
+    parser.add_argument("--bundle", default=os.getenv("MODEL_BUNDLE_PATH", ""),
+                        help="Local model bundle (default: MLflow registry)")
+    args = parser.parse_args()
+    score_file(args.input, args.output, args.chunk_rows, args.workers, args.bundle or None)
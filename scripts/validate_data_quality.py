@@ -1,62 +1,75 @@
-import pandas as pd
-import numpy as np
+import argparse
+import json
 import sys
 import os
 
-def validate_data_quality():    
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.profiling import diff_profiles, profile_file, write_profile
+
+RAW_DATA_PATH = 'data/raw/dataset-diabete-68e2810ab0d7e949117525.csv'
+
+
+def validate_data_quality(raw_data_path=RAW_DATA_PATH, chunk_rows=100000, workers=1,
+                          profile_output=None, baseline_path=None, max_exact_hashes=2000000):
     errors = []
     warnings = []
-    
-    raw_data_path = 'data/raw/dataset-diabete-68e2810ab0d7e949117525.csv'
+
     if not os.path.exists(raw_data_path):
         errors.append(f"❌ Raw data file not found: {raw_data_path}")
     else:
         print(f"✅ Raw data file exists: {raw_data_path}")
-        
+
         try:
-            df = pd.read_csv(raw_data_path)
-            print(f"✅ Data loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-            
+            # Une seule passe en flux : manquants, doublons (hachage des lignes), quantiles et outliers
+            profile = profile_file(raw_data_path, chunk_rows, workers, max_exact_hashes=max_exact_hashes).to_dict()
+            print(f"✅ Data profiled: {profile['rows']} rows, {len(profile['columns'])} columns")
+
             # Check missing values
-            missing = df.isnull().sum()
-            total_missing = missing.sum()
+            total_missing = sum(col["missing"] for col in profile["columns"].values())
             if total_missing > 0:
                 warnings.append(f"⚠️  {total_missing} missing values found")
             else:
                 print("✅ No missing values")
-            
+
             # Check duplicates
-            duplicates = df.duplicated().sum()
+            duplicates = profile["duplicates"]["count"]
+            approximate = "" if profile["duplicates"]["exact"] else " (approximate)"
             if duplicates > 0:
-                warnings.append(f"⚠️  {duplicates} duplicate rows found")
+                warnings.append(f"⚠️  {duplicates} duplicate rows found{approximate}")
             else:
-                print("✅ No duplicates")
-            
+                print(f"✅ No duplicates{approximate}")
+
             # Check minimum rows
-            if df.shape[0] < 100:
-                errors.append(f"❌ Insufficient data: {df.shape[0]} rows (min 100)")
+            if profile["rows"] < 100:
+                errors.append(f"❌ Insufficient data: {profile['rows']} rows (min 100)")
             else:
-                print(f"✅ Sufficient data: {df.shape[0]} rows")
-            
-            # Check outliers
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            for col in numeric_cols:
-                q1 = df[col].quantile(0.25)
-                q3 = df[col].quantile(0.75)
-                iqr = q3 - q1
-                outliers = ((df[col] < (q1 - 3 * iqr)) | (df[col] > (q3 + 3 * iqr))).sum()
-                if outliers > 0:
-                    warnings.append(f"⚠️  {outliers} outliers in {col}")
-            
+                print(f"✅ Sufficient data: {profile['rows']} rows")
+
+            # Check outliers (hors [Q1 - 3·IQR, Q3 + 3·IQR], estimés depuis le sketch)
+            for col, stats in profile["columns"].items():
+                if stats.get("outliers", 0) > 0:
+                    warnings.append(f"⚠️  {stats['outliers']} outliers in {col}")
+
+            if baseline_path:
+                with open(baseline_path, encoding="utf-8") as handle:
+                    baseline = json.load(handle)
+                for change in diff_profiles(baseline, profile):
+                    warnings.append(f"⚠️  Profile change vs {baseline_path}: {change}")
+
+            if profile_output:
+                write_profile(profile, profile_output, source=raw_data_path)
+                print(f"✅ Profile written to {profile_output}")
+
         except Exception as e:
             errors.append(f"❌ Error: {str(e)}")
-    
+
     print("\n" + "="*60)
     if warnings:
         print("⚠️  WARNINGS:")
         for w in warnings:
             print(f"  {w}")
-    
+
     if errors:
         print("❌ DATA QUALITY VALIDATION FAILED")
         for e in errors:
@@ -67,4 +80,14 @@ def validate_data_quality():
     print("="*60)
 
 if __name__ == "__main__":
-    validate_data_quality()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Profile a raw dataset in one streaming pass")
+    parser.add_argument("input", nargs="?", default=RAW_DATA_PATH, help="CSV or Parquet file")
+    parser.add_argument("--chunk-rows", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size (1 = in-process)")
+    parser.add_argument("--profile-output", default=None, help="Write the JSON profile to this file")
+    parser.add_argument("--baseline", default=None, help="Previous JSON profile to diff against")
+    parser.add_argument("--max-exact-hashes", type=int, default=2000000,
+                        help="Row hashes kept for exact duplicate counts before switching to HyperLogLog")
+    args = parser.parse_args()
+    validate_data_quality(args.input, args.chunk_rows, args.workers, args.profile_output,
+                          args.baseline, args.max_exact_hashes)
@@ -0,0 +1,50 @@
+import argparse
+import json
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.validation import ChunkValidator, validate_file
+
+
+def validate_dataset(path, chunk_rows=100000, workers=1, report_path=None, max_row_indexes=100):
+    print("🔎 STREAMING DATASET VALIDATION")
+    print("="*60)
+
+    start = time.time()
+    report = validate_file(path, ChunkValidator(max_row_indexes=max_row_indexes), chunk_rows, workers)
+    duration = time.time() - start
+    print(f"✅ {report.rows} rows checked in {report.chunks} chunks, {duration:.2f}s "
+          f"({report.rows / max(duration, 1e-9):,.0f} rows/sec)")
+
+    summary = report.to_dict()
+    if report.missing_columns:
+        print(f"❌ Missing columns: {report.missing_columns}")
+    for check, columns in summary["violations"].items():
+        for column, entry in columns.items():
+            print(f"❌ {check:<5} {column}: {entry['count']} rows (first: {entry['rows'][:5]})")
+
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as handle:
+            json.dump(summary, handle, indent=2)
+        print(f"   Report written to {report_path}")
+
+    print("="*60)
+    if not report.valid:
+        print("❌ DATASET VALIDATION FAILED")
+        sys.exit(1)
+    print("✅ DATASET VALIDATION PASSED")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate a CSV or Parquet cohort export in streamed chunks")
+    parser.add_argument("input", help="Input file (.csv or .parquet)")
+    parser.add_argument("--chunk-rows", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=1, help="Process pool size (1 = in-process)")
+    parser.add_argument("--report", default=None, help="JSON report output file")
+    parser.add_argument("--max-row-indexes", type=int, default=100, help="Row indexes kept per violation")
+    args = parser.parse_args()
+    validate_dataset(args.input, args.chunk_rows, args.workers, args.report, args.max_row_indexes)
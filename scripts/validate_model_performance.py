@@ -1,150 +1,158 @@
-import pandas as pd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+import argparse
 import sys
 import os
 
-def validate_model_performance():
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from api.model_selection import CANDIDATES, fit_final, select_models
+
+DATA_PATH = 'data/processed/Clustered_Data.csv'
+CACHE_DIR = '.cache/model_selection'
+EXPERIMENT_NAME = 'Diabetes_Cluster_Classification'
+
+
+def log_to_mlflow(summary, dataset_size, experiment=EXPERIMENT_NAME):
+    """Une run MLflow par candidat recalculé, avec le temps mur à côté des temps d'entraînement et d'inférence"""
+    import mlflow
+
+    mlflow.set_experiment(experiment)
+    for name, candidate in summary["candidates"].items():
+        if candidate["cached_folds"] == summary["n_splits"]:
+            continue
+        with mlflow.start_run(run_name=name):
+            mlflow.log_param("model_type", name)
+            mlflow.log_param("dataset_size", dataset_size)
+            mlflow.log_param("cv_folds", summary["n_splits"])
+            mlflow.log_param("data_fingerprint", summary["fingerprint"][:16])
+            mlflow.log_params(candidate["params"])
+            mlflow.log_metrics(candidate["metrics"])
+            mlflow.log_metric("wall_time_sec", candidate["wall_time_sec"])
+            mlflow.log_metric("cached_folds", candidate["cached_folds"])
+
+
+def validate_model_performance(data_path=DATA_PATH, target=None, n_splits=5, n_jobs=-1, cache_dir=CACHE_DIR,
+                               metric='accuracy', use_mlflow=True, output=None, force=False):
     print("🤖 MODEL PERFORMANCE VALIDATION")
     print("="*60)
-    
-    # Thresholds
-    MIN_ACCURACY = 0.70
-    MIN_PRECISION = 0.65
-    MIN_RECALL = 0.65
-    MIN_F1 = 0.65
-    MIN_ROC_AUC = 0.70
-    
+
+    # Thresholds : moyennes sur 5 plis du meilleur candidat, cible binaire Cluster
+    # (précision/rappel/F1 de la classe positive, comme l'ancien contrôle sur un split 80/20).
+    # Recalibrés sur Clustered_Data.csv : meilleur candidat à 0.996 d'accuracy et 1.000 d'AUC,
+    # RandomForest (ancien modèle de contrôle) à 0.944 / 0.990 ; planchers ~5 points sous le meilleur.
+    MIN_ACCURACY = 0.95
+    MIN_PRECISION = 0.95
+    MIN_RECALL = 0.95
+    MIN_F1 = 0.95
+    MIN_ROC_AUC = 0.98
+
     errors = []
-    
-    # Find data
-    data_path = 'data/processed/Ready_For_Model.csv'
-    if not os.path.exists(data_path):
-        data_path = 'data/raw/dataset-diabete-68e2810ab0d7e949117525.csv'
-    
+
     if not os.path.exists(data_path):
-        errors.append("❌ No data file found")
+        errors.append(f"❌ No data file found: {data_path}")
         print("\n".join(errors))
         sys.exit(1)
-    
+
     try:
         df = pd.read_csv(data_path)
         print(f"✅ Data loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-        
+
         # Prepare data
-        if 'Outcome' in df.columns:
-            X = df.drop('Outcome', axis=1)
-            y = df['Outcome']
-        else:
-            X = df.iloc[:, :-1]
-            y = df.iloc[:, -1]
-        
-        # Check class distribution
-        class_counts = y.value_counts()
-        print(f"\n📊 Class distribution:")
-        print(class_counts)
-        
-        # Check if we have enough samples for stratified split
-        min_class_count = class_counts.min()
-        use_stratify = min_class_count >= 2
-        
-        if not use_stratify:
-            print(f"⚠️  Warning: Smallest class has only {min_class_count} samples - skipping stratification")
-        
-        # Split - use stratify only if we have enough samples
-        if use_stratify:
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42, stratify=y
-            )
-        else:
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.2, random_state=42
-            )
-        
-        print(f"✅ Train: {X_train.shape[0]}, Test: {X_test.shape[0]}")
-        
-        # Check if we have samples from both classes in test set
-        test_classes = y_test.nunique()
-        if test_classes < 2:
-            print("⚠️  Warning: Test set doesn't contain both classes - adjusting split...")
-            # Use larger test size to ensure both classes
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, test_size=0.3, random_state=42
-            )
-            test_classes = y_test.nunique()
-            
-            if test_classes < 2:
-                errors.append("❌ Insufficient data: Cannot create valid train/test split with both classes")
-                raise ValueError("Cannot create balanced split")
-        
-        # Train model
-        print("\n🏋️  Training validation model...")
-        model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
-        model.fit(X_train, y_train)
-        
-        # Predictions
-        y_pred = model.predict(X_test)
-        y_pred_proba = model.predict_proba(X_test)
-        
-        # Check if we have probability for positive class
-        if y_pred_proba.shape[1] == 2:
-            y_pred_proba_positive = y_pred_proba[:, 1]
-        else:
-            y_pred_proba_positive = y_pred_proba[:, 0]
-        
-        # Metrics
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred, zero_division=0)
-        recall = recall_score(y_test, y_pred, zero_division=0)
-        f1 = f1_score(y_test, y_pred, zero_division=0)
-        
-        # ROC AUC only if we have both classes
-        if y_test.nunique() == 2:
-            roc_auc = roc_auc_score(y_test, y_pred_proba_positive)
+        if target is None:
+            target = next((col for col in ('Cluster', 'Outcome') if col in df.columns), df.columns[-1])
+        X = df.drop(target, axis=1)
+        y = df[target]
+
+        print(f"\n📊 Class distribution ({target}):")
+        print(y.value_counts())
+
+        if y.value_counts().min() < n_splits:
+            errors.append(f"❌ Insufficient data: smallest class has fewer than {n_splits} samples")
+            raise ValueError("Cannot create stratified folds")
+
+        # Candidats x plis en parallèle, résultats en cache sous le hachage des données et des hyperparamètres
+        print(f"\n🏋️  Cross-validating {len(CANDIDATES)} candidates ({n_splits} folds, cache: {cache_dir or 'off'})...")
+        summary = select_models(
+            X.to_numpy(), y.to_numpy(), columns=list(X.columns), n_splits=n_splits, n_jobs=n_jobs,
+            cache_dir=cache_dir, metric=metric, force=force
+        )
+        if summary["skipped"]:
+            print(f"✅ Data and candidates unchanged ({summary['fingerprint'][:12]}), reusing cached results")
         else:
-            roc_auc = 0.0
-            print("⚠️  Warning: Cannot calculate ROC AUC (need both classes in test set)")
-        
-        print("\n📊 Performance Metrics:")
+            print(f"✅ Selection done in {summary['wall_time_sec']:.2f}s")
+
+        print(f"\n📊 Candidates (mean over {n_splits} folds):")
+        for name, candidate in summary["candidates"].items():
+            metrics = candidate["metrics"]
+            print(f"  {name:<28} accuracy={metrics['accuracy']:.4f}  f1={metrics['f1']:.4f}  "
+                  f"roc_auc={metrics.get('roc_auc', float('nan')):.4f}  wall={candidate['wall_time_sec']:.2f}s  "
+                  f"cached folds={candidate['cached_folds']}/{n_splits}")
+
+        best = summary["best"]
+        metrics = summary["candidates"][best]["metrics"]
+        accuracy = metrics["accuracy"]
+        precision = metrics["precision"]
+        recall = metrics["recall"]
+        f1 = metrics["f1"]
+        roc_auc = metrics.get("roc_auc")
+
+        print(f"\n🏆 Best candidate by {metric}: {best}")
         print(f"  Accuracy:  {accuracy:.4f} (min: {MIN_ACCURACY})")
         print(f"  Precision: {precision:.4f} (min: {MIN_PRECISION})")
         print(f"  Recall:    {recall:.4f} (min: {MIN_RECALL})")
         print(f"  F1 Score:  {f1:.4f} (min: {MIN_F1})")
-        print(f"  ROC AUC:   {roc_auc:.4f} (min: {MIN_ROC_AUC})")
-        
+        if roc_auc is not None:
+            print(f"  ROC AUC:   {roc_auc:.4f} (min: {MIN_ROC_AUC})")
+        else:
+            print("⚠️  Warning: Cannot calculate ROC AUC (no probabilities or single class)")
+
         # Validate thresholds
         if accuracy < MIN_ACCURACY:
             errors.append(f"❌ Accuracy {accuracy:.4f} < {MIN_ACCURACY}")
         else:
             print(f"✅ Accuracy meets threshold")
-            
+
         if precision < MIN_PRECISION:
             errors.append(f"❌ Precision {precision:.4f} < {MIN_PRECISION}")
         else:
             print(f"✅ Precision meets threshold")
-            
+
         if recall < MIN_RECALL:
             errors.append(f"❌ Recall {recall:.4f} < {MIN_RECALL}")
         else:
             print(f"✅ Recall meets threshold")
-            
+
         if f1 < MIN_F1:
             errors.append(f"❌ F1 {f1:.4f} < {MIN_F1}")
         else:
             print(f"✅ F1 meets threshold")
-            
-        if y_test.nunique() == 2 and roc_auc < MIN_ROC_AUC:
+
+        if roc_auc is not None and roc_auc < MIN_ROC_AUC:
             errors.append(f"❌ ROC AUC {roc_auc:.4f} < {MIN_ROC_AUC}")
-        elif y_test.nunique() == 2:
+        elif roc_auc is not None:
             print(f"✅ ROC AUC meets threshold")
-        
+
+        if use_mlflow and not summary["skipped"]:
+            try:
+                log_to_mlflow(summary, len(df))
+                print(f"✅ Candidate runs logged to MLflow ({EXPERIMENT_NAME})")
+            except Exception as e:
+                print(f"⚠️  Warning: MLflow logging failed: {e}")
+
+        if output:
+            import joblib
+            model = fit_final(X.to_numpy(), y.to_numpy(), CANDIDATES[best], summary["candidates"][best]["key"],
+                              cache_dir)
+            os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+            joblib.dump(model, output)
+            print(f"✅ {best} refitted on all rows and written to {output}")
+
     except Exception as e:
         errors.append(f"❌ Error: {str(e)}")
         import traceback
         traceback.print_exc()
-    
+
     print("\n" + "="*60)
     if errors:
         print("❌ MODEL PERFORMANCE VALIDATION FAILED")
@@ -156,4 +164,16 @@ def validate_model_performance():
     print("="*60)
 
 if __name__ == "__main__":
-    validate_model_performance()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Cross-validate the candidate models and check thresholds")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--target", default=None, help="Label column (default: Cluster, Outcome or last column)")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1, help="Parallel (candidate, fold) tasks (-1 = all CPUs)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Result cache directory ('' disables caching)")
+    parser.add_argument("--metric", default="accuracy", help="Selection metric (accuracy, f1, roc_auc...)")
+    parser.add_argument("--no-mlflow", action="store_true", help="Do not log candidate runs to MLflow")
+    parser.add_argument("--output", default=None, help="Write the best candidate refitted on all rows (joblib)")
+    parser.add_argument("--force", action="store_true", help="Ignore cached results")
+    args = parser.parse_args()
+    validate_model_performance(args.data, args.target, args.folds, args.jobs, args.cache_dir, args.metric,
+                               not args.no_mlflow, args.output, args.force)
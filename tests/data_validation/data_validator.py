@@ -1,21 +1,20 @@
+import os
+import sys
+
 import pandas as pd
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from api.validation import FEATURE_RANGES, ChunkValidator, validate_file
+
+
 class DataValidator:
     def __init__(self):
         self.required_columns = [
             'Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
             'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age'
         ]
-        self.feature_ranges = {
-            'Pregnancies': (0, 20),
-            'Glucose': (0, 300),
-            'BloodPressure': (0, 200),
-            'SkinThickness': (0, 100),
-            'Insulin': (0, 1000),
-            'BMI': (10, 70),
-            'DiabetesPedigreeFunction': (0, 3),
-            'Age': (0, 120)
-        }
+        self.feature_ranges = dict(FEATURE_RANGES)
 
     def validate_columns(self, df):
         """Check all required columns exist"""
@@ -51,4 +50,12 @@ class DataValidator:
         self.validate_numeric_types(df)
         df = self.validate_missing_values(df, fill_missing)
         self.validate_ranges(df)
-        return df
\ No newline at end of file
+        return df
+
+    def validation_report(self, df, max_row_indexes=100):
+        """Check columns, types, nulls and ranges in one vectorized pass, collecting every violation"""
+        return ChunkValidator(self.feature_ranges, max_row_indexes).validate_frame(df)
+
+    def validate_file(self, path, chunk_rows=100000, workers=1, max_row_indexes=100):
+        """Stream a CSV or Parquet file in chunks and return the merged validation report"""
+        return validate_file(path, ChunkValidator(self.feature_ranges, max_row_indexes), chunk_rows, workers)
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from api.admission import AdaptiveConcurrencyLimiter, AdmissionRejected
+
+
+def test_limiter_queues_then_sheds_when_queue_full():
+    """Test requests beyond the limit wait in the queue and are rejected once it is full"""
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_queue=1, queue_timeout_ms=1000)
+        await limiter.acquire()
+        await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        assert rejected.value.reason == "queue_full"
+
+        limiter.release(0.001)
+        await waiting
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.in_flight == 2
+
+def test_limiter_sheds_after_queue_timeout():
+    """Test a queued request is rejected when no slot frees up in time"""
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_queue=4, queue_timeout_ms=10)
+        await limiter.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await limiter.acquire()
+        return limiter, rejected.value.reason
+
+    limiter, reason = asyncio.run(run())
+    assert reason == "queue_timeout"
+    assert limiter.in_flight == 1
+    assert not limiter._waiters
+
+def test_limiter_reclaims_slot_handed_to_cancelled_waiter():
+    """Test a waiter cancelled right after release() handed it the slot gives the slot back"""
+    from unittest.mock import patch
+
+    async def wait_for(future, timeout):
+        # Comme asyncio.wait_for en Python >= 3.12 : l'annulation est propagée même si la future est résolue
+        return await future
+
+    async def run():
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_queue=4, queue_timeout_ms=1000)
+        await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+
+        limiter.release(0.001)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert limiter.in_flight == 0
+        await asyncio.wait_for(limiter.acquire(), 0.1)
+
+    with patch("api.admission.asyncio.wait_for", wait_for):
+        asyncio.run(run())
+
+def test_limiter_aimd_adapts_to_latency():
+    """Test the limit grows additively under target latency and backs off multiplicatively above it"""
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, target_latency_ms=50, backoff=0.5)
+
+    for _ in range(10):
+        limiter.in_flight += 1
+        limiter.release(0.01)
+    grown = limiter._limit
+    assert grown > 10
+
+    for _ in range(5):
+        limiter.in_flight += 1
+        limiter.release(0.2)
+    # Une seule décroissance pour une rafale de réponses lentes
+    assert limiter.limit == int(grown * 0.5)
@@ -2,7 +2,7 @@ import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 import numpy as np
-from api.main import app
+from api.main import app, MAX_BATCH_SIZE
 
 client = TestClient(app)
 
@@ -44,4 +44,324 @@ def test_predict_invalid_input():
         "DiabetesPedigreeFunction": 0.5, "Age": 25
     })
     
-    assert response.status_code == 422
\ No newline at end of file
+    assert response.status_code == 422
+
+def test_predict_batch_success():
+    """Test batch prediction scores all records in one call"""
+    mock_model = MagicMock()
+    mock_model.predict.return_value = np.array([1, 0])
+    mock_model.predict_proba.return_value = np.array([[0.3, 0.7], [0.8, 0.2]])
+
+    record = {
+        "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+        "SkinThickness": 35, "Insulin": 0, "BMI": 33.6,
+        "DiabetesPedigreeFunction": 0.627, "Age": 50
+    }
+    with patch('api.main.model', mock_model):
+        response = client.post("/predict/batch", json={"records": [record, record]})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["batch_size"] == 2
+        assert [r["prediction"] for r in body["results"]] == [1, 0]
+        assert body["results"][1]["probabilities"] == [0.8, 0.2]
+        assert mock_model.predict_proba.call_count == 1
+        assert mock_model.predict.call_count == 0
+
+def test_predict_batch_too_large():
+    """Test batch larger than MAX_BATCH_SIZE is rejected"""
+    record = {
+        "Pregnancies": 1, "Glucose": 120, "BloodPressure": 70,
+        "SkinThickness": 20, "Insulin": 80, "BMI": 25.5,
+        "DiabetesPedigreeFunction": 0.5, "Age": 25
+    }
+    with patch('api.main.model', MagicMock()):
+        response = client.post("/predict/batch", json={"records": [record] * (MAX_BATCH_SIZE + 1)})
+
+        assert response.status_code == 422
+
+
+def test_score_matrix_single_pass_matches_predict():
+    """Test fused scoring derives classes from probabilities without calling predict twice"""
+    from sklearn.ensemble import RandomForestClassifier
+    from api.main import score_matrix, FEATURE_COLUMNS
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(60, 8)), columns=FEATURE_COLUMNS)
+    y = (X['Glucose'] > 0).astype(int)
+    rf = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+
+    with patch('api.main.model', rf):
+        predictions, probabilities = score_matrix(X.values)
+
+    assert (predictions == rf.predict(X)).all()
+    assert np.allclose(probabilities, rf.predict_proba(X))
+
+def test_score_matrix_without_probabilities():
+    """Test estimators without predict_proba fall back to predict"""
+    from sklearn.svm import SVC
+    from api.main import score_matrix, FEATURE_COLUMNS
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(40, 8)), columns=FEATURE_COLUMNS)
+    y = (X['BMI'] > 0).astype(int)
+    svc = SVC().fit(X, y)
+
+    with patch('api.main.model', svc):
+        predictions, probabilities = score_matrix(X.values)
+
+    assert probabilities is None
+    assert (predictions == svc.predict(X)).all()
+
+def test_predict_uses_prediction_cache():
+    """Test identical records are served from the cache after the first call"""
+    from api.cache import PredictionCache
+
+    mock_model = MagicMock()
+    mock_model.predict_proba.return_value = np.array([[0.3, 0.7]])
+    payload = {
+        "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+        "SkinThickness": 35, "Insulin": 0, "BMI": 33.6,
+        "DiabetesPedigreeFunction": 0.627, "Age": 50
+    }
+
+    with patch('api.main.model', mock_model), \
+            patch('api.main.prediction_cache', PredictionCache(max_entries=10, ttl_seconds=60)):
+        first = client.post("/predict", json=payload)
+        second = client.post("/predict", json=payload)
+
+    assert first.json()["probabilities"] == second.json()["probabilities"] == [0.3, 0.7]
+    assert mock_model.predict_proba.call_count == 1
+
+def test_health_and_ready_endpoints():
+    """Test liveness always answers and readiness depends on the model"""
+    assert client.get("/health").status_code == 200
+    with patch('api.main.model', None):
+        assert client.get("/ready").status_code == 503
+    with patch('api.main.model', MagicMock()), patch('api.main.model_version', "4"):
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["model_version"] == "4"
+
+def test_registry_poller_hot_swaps_model():
+    """Test a new registry version is loaded, warmed up and swapped in"""
+    import asyncio
+    from sklearn.tree import DecisionTreeClassifier
+    from api.main import load_model_version, FEATURE_COLUMNS
+    from api.registry import ModelRegistryPoller
+    import pandas as pd
+    import sys
+    import mlflow.pyfunc  # noqa: F401 - module réel, pas l'objet paresseux exposé par `mlflow`
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 100, size=(50, 8)), columns=FEATURE_COLUMNS)
+    new_estimator = DecisionTreeClassifier(random_state=0).fit(X, (X['Glucose'] > 50).astype(int))
+    pyfunc_model = MagicMock()
+    pyfunc_model.get_raw_model.return_value = new_estimator
+
+    with patch('api.main.model', MagicMock()), patch('api.main.model_version', "1"), \
+            patch('api.main.feature_layout'), \
+            patch.object(sys.modules['mlflow.pyfunc'], 'load_model', return_value=pyfunc_model) as load_model, \
+            patch('api.registry.resolve_model_version', return_value=2):
+        poller = ModelRegistryPoller("DiabetesClusterClassifier", "Production",
+                                     load_model_version, 60, current_version=1)
+        swapped = asyncio.run(poller.poll_once())
+
+        import api.main
+        assert swapped
+        assert load_model.call_args[0][0] == "models:/DiabetesClusterClassifier/2"
+        assert api.main.model is new_estimator
+        assert api.main.model_version == "2"
+        assert asyncio.run(poller.poll_once()) is False
+
+def test_preloaded_model_is_not_reloaded_in_workers():
+    """Test forked workers reuse the model loaded by the gunicorn master"""
+    mock_model = MagicMock()
+    with patch('api.main.model', mock_model), patch('api.main.model_preloaded', True), \
+            patch('api.main.load_model_uri') as load_uri, patch('api.main.load_model_bundle') as load_bundle:
+        import api.main as serving
+        serving.loadmodel()
+
+        load_uri.assert_not_called()
+        load_bundle.assert_not_called()
+        assert serving.model is mock_model
+
+def test_predict_sheds_load_when_saturated():
+    """Test /predict fast-fails with 503 and Retry-After once admission control is saturated"""
+    from api.admission import AdaptiveConcurrencyLimiter
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_queue=0)
+    limiter.in_flight = 1
+
+    with patch('api.main.model', MagicMock()), patch('api.main.admission', limiter), \
+            patch('api.main.prediction_cache', None):
+        response = client.post("/predict", json={
+            "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+            "SkinThickness": 35, "Insulin": 0, "BMI": 33.6,
+            "DiabetesPedigreeFunction": 0.627, "Age": 50
+        })
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_predict_batch_range_validation_reports_all_rows():
+    """Test /predict/batch rejects implausible rows with a report listing every offending row"""
+    record = {
+        "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+        "SkinThickness": 35, "Insulin": 0, "BMI": 33.6,
+        "DiabetesPedigreeFunction": 0.627, "Age": 50
+    }
+    records = [record, {**record, "Age": 200}, record, {**record, "BMI": 5, "Age": 130}]
+
+    with patch('api.main.model', MagicMock()), patch('api.main.ENABLE_RANGE_VALIDATION', True):
+        response = client.post("/predict/batch", json={"records": records})
+
+    assert response.status_code == 422
+    violations = response.json()["detail"]["violations"]["range"]
+    assert violations["Age"] == {"count": 2, "rows": [1, 3]}
+    assert violations["BMI"] == {"count": 1, "rows": [3]}
+
+def test_predict_canary_and_shadow_versions():
+    """Test canary traffic is answered by the canary version and primary traffic is shadow-compared"""
+    from api.features import FeatureLayout
+    from api.main import FEATURE_COLUMNS, score_candidate
+    from api.shadow import Candidate, ShadowScorer
+    from prometheus_client import REGISTRY
+
+    primary = MagicMock()
+    primary.predict_proba.return_value = np.array([[0.3, 0.7]])
+    candidate_model = MagicMock()
+    candidate_model.predict_proba.return_value = np.array([[0.9, 0.1]])
+    candidate = Candidate("2", candidate_model, FeatureLayout(FEATURE_COLUMNS), canary_fraction=0.5)
+    scorer = ShadowScorer(score_candidate, [candidate])
+    record = {
+        "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+        "SkinThickness": 35, "Insulin": 0, "BMI": 33.6,
+        "DiabetesPedigreeFunction": 0.627, "Age": 50
+    }
+
+    with patch('api.main.model', primary), patch('api.main.model_version', "1"), \
+            patch('api.main.shadow_scorer', scorer), patch('api.main.prediction_cache', None):
+        predict_count = REGISTRY.get_sample_value('inference_stage_duration_seconds_count', {"stage": "predict"})
+        with patch.object(scorer, 'route', return_value=candidate):
+            canary_response = client.post("/predict", json=record).json()
+        # La canary n'alimente pas les histogrammes d'étapes du modèle principal
+        assert REGISTRY.get_sample_value(
+            'inference_stage_duration_seconds_count', {"stage": "predict"}) == predict_count
+        with patch.object(scorer, 'route', return_value=None):
+            primary_response = client.post("/predict", json=record).json()
+        scorer.shutdown()
+
+    assert canary_response["model_version"] == "2" and canary_response["prediction"] == 0
+    assert primary_response["model_version"] == "1" and primary_response["prediction"] == 1
+    # Scorée une fois en canary, une fois en shadow derrière la réponse principale
+    assert candidate_model.predict_proba.call_count == 2
+
+def test_predict_binary_formats_and_echo_option():
+    """Test packed NumPy requests/responses, vectorized ge=0 validation and dropping the echoed input"""
+    from api.features import FeatureLayout
+    from api.main import FEATURE_COLUMNS
+
+    mock_model = MagicMock()
+    mock_model.predict_proba.side_effect = lambda X: np.tile([0.3, 0.7], (len(X), 1))
+    X = np.array([[6, 148, 72, 35, 0, 33.6, 0.627, 50]] * 3, dtype="<f4")
+    headers = {"Content-Type": "application/x-numpy; dtype=float32", "Accept": "application/x-numpy"}
+
+    with patch('api.main.model', mock_model), patch('api.main.feature_layout', FeatureLayout(FEATURE_COLUMNS)):
+        batch = client.post("/predict/batch", content=X.tobytes(), headers=headers)
+        single = client.post("/predict?include_input=false", content=X[0].tobytes(),
+                             headers={"Content-Type": headers["Content-Type"]})
+        invalid = X.copy()
+        invalid[1, 1] = -5
+        rejected = client.post("/predict/batch", content=invalid.tobytes(), headers=headers)
+        too_many = client.post("/predict", content=X.tobytes(), headers=headers)
+
+    assert batch.status_code == 200
+    assert batch.headers["X-Columns"] == "prediction,proba_0,proba_1"
+    assert np.frombuffer(batch.content, dtype="<f8").reshape(3, 3)[:, 0].tolist() == [1, 1, 1]
+    assert np.allclose(mock_model.predict_proba.call_args_list[0][0][0], X)
+    assert single.json()["prediction"] == 1 and "input_data" not in single.json()
+    assert rejected.status_code == 422
+    assert rejected.json()["detail"][0]["loc"] == ["body", "records", 1, "Glucose"]
+    assert too_many.status_code == 422
+
+def test_stage_timers_book_predict_proba_under_proba():
+    """Test predict_proba time lands in the proba stage and the profiler rejects non-positive intervals"""
+    import time
+    from prometheus_client import REGISTRY
+    from api.main import score_matrix
+
+    def stage_sum(stage):
+        return REGISTRY.get_sample_value('inference_stage_duration_seconds_sum', {"stage": stage}) or 0.0
+
+    slow_model = MagicMock()
+    slow_model.predict_proba.side_effect = lambda X: time.sleep(0.05) or np.array([[0.3, 0.7]])
+    proba_before, predict_before = stage_sum("proba"), stage_sum("predict")
+
+    score_matrix(np.zeros((1, 8)), slow_model, observe=True)
+
+    assert stage_sum("proba") - proba_before >= 0.05
+    assert stage_sum("predict") - predict_before < 0.05
+    with patch('api.main.ENABLE_PROFILER_ENDPOINTS', True):
+        assert client.post("/debug/profiler/start?interval_ms=0").status_code == 422
+
+def test_preloaded_workers_leave_registry_polling_to_master():
+    """Test gunicorn workers with a preloaded model do not start their own registry poller"""
+    import asyncio
+    import api.main
+
+    with patch('api.main.MODEL_POLL_INTERVAL_SECONDS', 60), patch('api.main.MODEL_BUNDLE_PATH', ""), \
+            patch('api.main.model_preloaded', True), patch('api.main.registry_poller', None):
+        asyncio.run(api.main.start_registry_poller())
+        assert api.main.registry_poller is None
+
+def test_master_roll_replaces_workers_one_by_one():
+    """Test the master restarts each worker and waits for its replacement before the next"""
+    import importlib
+    from unittest.mock import patch as mock_patch
+
+    with mock_patch.dict('os.environ', {"PROMETHEUS_MULTIPROC_DIR": "/tmp/test_prometheus_multiproc"}):
+        gunicorn_conf = importlib.import_module("api.gunicorn_conf")
+
+    server = MagicMock(num_workers=2, WORKERS={101: None, 102: None})
+    killed = []
+
+    def kill(pid, sig):
+        killed.append(pid)
+        server.WORKERS.pop(pid)
+        server.WORKERS[pid + 100] = None
+
+    with patch.object(gunicorn_conf.os, 'kill', side_effect=kill), patch('gc.freeze'):
+        gunicorn_conf.roll_workers(server)
+
+    assert killed == [101, 102]
+    assert sorted(server.WORKERS) == [201, 202]
+
+def test_registry_poller_backs_off_failed_version():
+    """Test a version that fails to load is not retried on every poll and failures are counted"""
+    from prometheus_client import CollectorRegistry, Counter
+    from api.registry import ModelRegistryPoller
+
+    clock = [0.0]
+    registry = CollectorRegistry()
+    failures = Counter('reload_failures', 'Failures', registry=registry)
+    load_fn = MagicMock(side_effect=RuntimeError("broken artifact"))
+    poller = ModelRegistryPoller("DiabetesClusterClassifier", "Production", load_fn, 60, current_version=1,
+                                 failures=failures, clock=lambda: clock[0])
+
+    with patch('api.registry.resolve_model_version', return_value=2):
+        with pytest.raises(RuntimeError):
+            poller.check()
+        clock[0] = 60
+        assert poller.check() is False
+        clock[0] = 121
+        with pytest.raises(RuntimeError):
+            poller.check()
+        clock[0] = 300
+        assert poller.check() is False
+
+    assert load_fn.call_count == 2
+    assert poller.failed[2][0] == 2
+    assert registry.get_sample_value('reload_failures_total') == 2
+    assert poller.current_version == 1
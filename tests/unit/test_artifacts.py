@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from sklearn.tree import DecisionTreeClassifier
+from api.artifacts import export_bundle, load_bundle
+from api.main import FEATURE_COLUMNS
+
+
+def test_bundle_roundtrip_and_api_activation(tmp_path):
+    """Test an exported bundle is reloaded and served with its pinned version"""
+    import api.main
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.uniform(0, 100, size=(50, 8)), columns=FEATURE_COLUMNS)
+    estimator = DecisionTreeClassifier(random_state=0).fit(X, (X['Age'] > 50).astype(int))
+
+    path = export_bundle(estimator, FEATURE_COLUMNS, str(tmp_path), "DiabetesClusterClassifier", 3)
+    bundle = load_bundle(path)
+    assert bundle["model_version"] == 3
+    assert bundle["columns"] == FEATURE_COLUMNS
+
+    with patch('api.main.model', None), patch('api.main.model_version', None), \
+            patch('api.main.feature_layout'):
+        api.main.load_model_bundle(path)
+
+        assert api.main.model_version == "3"
+        predictions, _ = api.main.score_matrix(X.to_numpy())
+        assert (predictions == estimator.predict(X)).all()
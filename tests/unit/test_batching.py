@@ -0,0 +1,69 @@
+import asyncio
+import numpy as np
+from api.batching import MicroBatcher
+
+
+def test_microbatcher_coalesces_concurrent_requests():
+    """Test concurrent submissions are scored as one batch and each caller gets its row"""
+    batches = []
+
+    def score_fn(X):
+        batches.append(X.shape[0])
+        return X[:, 0].astype(int), np.column_stack([X[:, 0], X[:, 0]])
+
+    async def run():
+        batcher = MicroBatcher(score_fn, max_batch_size=8, max_wait_ms=50)
+        batcher.start()
+        rows = [np.full((1, 8), i, dtype=np.float64) for i in range(5)]
+        results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    assert batches == [5]
+    assert [int(prediction) for prediction, _ in results] == [0, 1, 2, 3, 4]
+    assert results[3][1].tolist() == [3.0, 3.0]
+
+def test_microbatcher_respects_max_batch_size():
+    """Test batches are flushed once max_batch_size is reached"""
+    batches = []
+
+    def score_fn(X):
+        batches.append(X.shape[0])
+        return np.zeros(X.shape[0], dtype=int), None
+
+    async def run():
+        batcher = MicroBatcher(score_fn, max_batch_size=4, max_wait_ms=50)
+        batcher.start()
+        await asyncio.gather(*(batcher.submit(np.zeros((1, 8))) for _ in range(10)))
+        await batcher.stop()
+
+    asyncio.run(run())
+
+    assert sum(batches) == 10
+    assert max(batches) <= 4
+
+def test_microbatcher_stop_fails_in_flight_batch():
+    """Test stopping while a batch is being scored resolves its callers instead of leaving them hanging"""
+    import threading
+
+    release = threading.Event()
+
+    def score_fn(X):
+        release.wait(5)
+        return np.zeros(X.shape[0], dtype=int), None
+
+    async def run():
+        batcher = MicroBatcher(score_fn, max_batch_size=4, max_wait_ms=1)
+        batcher.start()
+        calls = [asyncio.ensure_future(batcher.submit(np.zeros((1, 8)))) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        await batcher.stop()
+        release.set()
+        return await asyncio.wait_for(asyncio.gather(*calls, return_exceptions=True), 1)
+
+    results = asyncio.run(run())
+
+    assert len(results) == 2
+    assert all(isinstance(result, RuntimeError) for result in results)
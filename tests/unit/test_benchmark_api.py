@@ -0,0 +1,31 @@
+import asyncio
+from unittest.mock import patch
+from scripts.benchmark_api import (
+    build_bodies, check_budget, export_stub_bundle, load_payload_records, run_inprocess, summarize
+)
+
+
+def test_inprocess_benchmark_smoke(tmp_path):
+    """Test the harness drives /predict in-process and reports percentiles"""
+    records = load_payload_records()
+    bodies = build_bodies(records, "/predict", batch_size=1)
+    bundle_path = export_stub_bundle(str(tmp_path))
+
+    # run_inprocess active le bundle dans api.main : état global restauré en sortie
+    with patch('api.main.model', None), patch('api.main.model_version', None), \
+            patch('api.main.feature_layout'), patch('api.main.scaler', None):
+        latencies, statuses, duration = asyncio.run(
+            run_inprocess(bundle_path, "/predict", bodies, n_requests=40, concurrency=4, rate=None, warmup=2)
+        )
+    summary = summarize(latencies, statuses, duration)
+
+    assert summary["requests"] == 40
+    assert summary["statuses"] == {"200": 40}
+    assert summary["latency_ms"]["p50"] <= summary["latency_ms"]["p99"] <= summary["latency_ms"]["max"]
+
+def test_budget_check_flags_regressions():
+    """Test p99 and throughput budgets produce failures"""
+    summary = summarize([0.01] * 99 + [0.5], {"200": 100}, duration=2.0)
+
+    assert check_budget(summary, max_p99_ms=1000, min_rps=10) == []
+    assert len(check_budget(summary, max_p99_ms=10, min_rps=100)) == 2
@@ -0,0 +1,48 @@
+import json
+import numpy as np
+from fastapi.testclient import TestClient
+from unittest.mock import patch, MagicMock
+from api.main import app
+
+client = TestClient(app)
+
+RECORD = {
+    "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72,
+    "SkinThickness": 35, "Insulin": 0, "BMI": 33.6,
+    "DiabetesPedigreeFunction": 0.627, "Age": 50
+}
+
+
+def make_model():
+    mock_model = MagicMock()
+    mock_model.predict_proba.side_effect = lambda X: np.tile([0.3, 0.7], (len(X), 1))
+    return mock_model
+
+
+def test_predict_stream_ndjson_reports_invalid_rows():
+    """Test NDJSON streaming scores valid rows and reports rejected ones in order"""
+    invalid = dict(RECORD, Glucose=-1)
+    body = "\n".join(json.dumps(r) for r in [RECORD, invalid, RECORD]) + "\n"
+
+    with patch('api.main.model', make_model()), patch('api.main.BULK_CHUNK_ROWS', 2):
+        response = client.post("/predict/stream", content=body,
+                               headers={"Content-Type": "application/x-ndjson"})
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert response.status_code == 200
+    assert [r["row"] for r in results] == [0, 1, 2]
+    assert results[0]["prediction"] == 1
+    assert "Glucose" in results[1]["error"]
+    assert results[2]["probabilities"] == [0.3, 0.7]
+
+def test_predict_stream_csv():
+    """Test CSV uploads with a header line are scored like /predict"""
+    header = "," + ",".join(RECORD)
+    rows = [f"{i}," + ",".join(str(v) for v in RECORD.values()) for i in range(3)]
+    body = "\n".join([header] + rows)
+
+    with patch('api.main.model', make_model()):
+        response = client.post("/predict/stream", content=body, headers={"Content-Type": "text/csv"})
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["prediction"] for r in results] == [1, 1, 1]
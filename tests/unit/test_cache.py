@@ -0,0 +1,46 @@
+import numpy as np
+from api.cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_lru_eviction():
+    """Test least recently used entries are evicted first"""
+    cache = PredictionCache(max_entries=2, ttl_seconds=60)
+    keys = [cache.make_key(np.full(8, i), "v1") for i in range(3)]
+
+    cache.put(keys[0], (0, None))
+    cache.put(keys[1], (1, None))
+    assert cache.get(keys[0]) == (0, None)
+    cache.put(keys[2], (2, None))
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == (0, None)
+    assert len(cache) == 2
+
+def test_cache_ttl_expiry():
+    """Test entries expire after the TTL"""
+    clock = FakeClock()
+    cache = PredictionCache(max_entries=10, ttl_seconds=5, clock=clock)
+    key = cache.make_key(np.ones(8), "v1")
+    cache.put(key, (1, None))
+
+    clock.now = 4.0
+    assert cache.get(key) == (1, None)
+    clock.now = 6.0
+    assert cache.get(key) is None
+
+def test_cache_key_includes_model_version_and_canonical_row():
+    """Test a model swap changes the key and -0.0 / float32 rows are canonicalized"""
+    row = np.array([[6, 148, 72, 35, -0.0, 33.6, 0.627, 50]])
+
+    assert PredictionCache.make_key(row, "v1") != PredictionCache.make_key(row, "v2")
+    assert PredictionCache.make_key(row, "v1") == PredictionCache.make_key(np.abs(row), "v1")
+    assert PredictionCache.make_key(row.astype(np.float32), "v1") == \
+        PredictionCache.make_key(row.astype(np.float32).astype(np.float64), "v1")
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+from api.clustering import CentroidAssigner, align_labels, stratified_sample, sweep_k, write_clustered
+
+COLUMNS = ["a", "b", "c"]
+
+
+def make_blobs(n=3000, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = np.array([[0, 0, 0], [8, 8, 8], [-8, 8, 0]], dtype=float)
+    labels = rng.integers(0, 3, n)
+    return centers[labels] + rng.normal(size=(n, 3)), labels
+
+
+def test_assigner_matches_kmeans_predict():
+    """Test the matrix-product nearest-centroid assignment equals sklearn KMeans.predict"""
+    from sklearn.cluster import KMeans
+
+    X, _ = make_blobs()
+    kmeans = KMeans(n_clusters=4, random_state=0, n_init=3).fit(X)
+    assigner = CentroidAssigner(kmeans.cluster_centers_, COLUMNS, chunk_rows=500)
+
+    assert np.array_equal(assigner.predict(X), kmeans.predict(X))
+    assert np.isclose(assigner.inertia(X), kmeans.inertia_)
+
+def test_streamed_minibatch_sweep_finds_blobs_and_writes_labels(tmp_path):
+    """Test a minibatch sweep over a chunked file picks k=3 by sampled silhouette and labels every row"""
+    X, truth = make_blobs()
+    path = str(tmp_path / "ready.csv")
+    pd.DataFrame(X, columns=COLUMNS).to_csv(path, index=False)
+
+    sweep = sweep_k([2, 3, 4], path=path, columns=COLUMNS, mode="minibatch", n_jobs=2, chunk_rows=700,
+                    batch_size=256, epochs=2, silhouette_size=500)
+    best = max(sweep, key=lambda k: sweep[k]["silhouette"])
+    assert best == 3
+    assert sweep[2]["inertia"] > sweep[3]["inertia"]
+
+    output = str(tmp_path / "clustered.csv")
+    rows, counts = write_clustered(path, output, sweep[3]["assigner"], chunk_rows=700)
+    labels = pd.read_csv(output)["Cluster"].to_numpy()
+    assert rows == len(X) and counts.sum() == len(X)
+    # Même partition que la vérité terrain, à une permutation près
+    assert len(set(zip(labels, truth))) == 3
+
+def test_stratified_sample_and_label_alignment():
+    """Test the silhouette sample keeps small clusters and relabelling follows previous centers"""
+    labels = np.array([0] * 9990 + [1] * 10)
+    index = stratified_sample(labels, 100, min_per_cluster=5)
+    assert (labels[index] == 1).sum() >= 5 and len(index) <= 110
+
+    centers = np.array([[0.0, 0, 0], [5, 5, 5]])
+    swapped = CentroidAssigner(centers[::-1], COLUMNS)
+    aligned = align_labels(swapped, centers)
+    assert np.array_equal(aligned.cluster_centers_, centers)
@@ -0,0 +1,60 @@
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from api.codecs import (
+    DecodeError, decode_matrix, encode_results, non_negative_errors, request_format, response_format
+)
+from api.features import FeatureLayout
+
+COLUMNS = ['Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
+           'Insulin', 'BMI', 'DiabetesPedigreeFunction', 'Age']
+LAYOUT = FeatureLayout(COLUMNS)
+
+
+def test_decode_numpy_and_arrow_match_layout_order():
+    """Test float32/float64 buffers and Arrow streams decode to the same matrix, reordered to the model columns"""
+    X = np.arange(16, dtype=np.float64).reshape(2, 8)
+    f32 = decode_matrix(X.astype("<f4").tobytes(), "application/x-numpy; dtype=float32", LAYOUT)
+    reversed_columns = ",".join(reversed(COLUMNS))
+    shuffled = decode_matrix(X[:, ::-1].copy().tobytes(), f"application/x-numpy; columns={reversed_columns}", LAYOUT)
+
+    table = pa.table({col: X[:, j].astype(np.int64) if j == 0 else X[:, j] for j, col in enumerate(COLUMNS)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    arrow = decode_matrix(sink.getvalue().to_pybytes(), "application/vnd.apache.arrow.stream", LAYOUT)
+
+    for decoded in (f32, shuffled, arrow):
+        assert decoded.dtype == np.float64 and decoded.flags.c_contiguous
+        assert np.array_equal(decoded, X)
+    with pytest.raises(DecodeError):
+        decode_matrix(b"\x00" * 12, "application/x-numpy; dtype=float32", LAYOUT)
+
+
+def test_non_negative_errors_match_pydantic_rules():
+    """Test negatives and NaN are rejected with FastAPI-style locations while inf is accepted"""
+    X = np.ones((3, 8))
+    X[0, 1] = -1
+    X[2, 5] = np.nan
+    X[1, 7] = np.inf
+
+    errors = non_negative_errors(X, COLUMNS)
+
+    assert [error["loc"] for error in errors] == [["body", "records", 0, "Glucose"], ["body", "records", 2, "BMI"]]
+    assert non_negative_errors(X[:1], COLUMNS, loc_prefix=None)[0]["loc"] == ["body", "Glucose"]
+
+
+def test_negotiation_and_binary_results():
+    """Test Content-Type/Accept negotiation and the packed result layout"""
+    assert request_format("application/json; charset=utf-8") == "json"
+    assert request_format("application/x-numpy; dtype=float32") == "numpy"
+    assert response_format("application/vnd.apache.arrow.stream, application/json") == "arrow"
+    assert response_format("*/*") == "json"
+
+    body, media_type, headers = encode_results("numpy", np.array([1, 0]), np.array([[0.3, 0.7], [0.8, 0.2]]))
+    assert headers["X-Columns"] == "prediction,proba_0,proba_1"
+    assert np.frombuffer(body, dtype="<f8").reshape(2, 3).tolist() == [[1, 0.3, 0.7], [0, 0.8, 0.2]]
+
+    body, media_type, _ = encode_results("arrow", np.array([1, 0]), None)
+    assert pa.ipc.open_stream(body).read_all().column("prediction").to_pylist() == [1, 0]
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from prometheus_client import CollectorRegistry, Gauge
+from api.drift import DriftMonitor, build_reference
+
+COLUMNS = ["Glucose", "BMI"]
+
+
+def make_reference(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({"Glucose": rng.normal(120, 30, n), "BMI": rng.normal(32, 6, n)})
+    return frame, build_reference(frame, COLUMNS, bins=10)
+
+
+def test_drift_monitor_welford_matches_numpy():
+    """Test streamed mean/std over several evaluations match the full-batch statistics"""
+    frame, reference = make_reference()
+    monitor = DriftMonitor(COLUMNS, reference, min_samples=1, decay=1.0)
+    X = frame[COLUMNS].to_numpy()
+
+    for start in range(0, len(X), 700):
+        for row in X[start:start + 700]:
+            monitor.observe(row[None, :])
+        monitor.evaluate()
+
+    assert monitor.count == len(X)
+    assert np.allclose(monitor.mean, X.mean(axis=0))
+    assert np.allclose(np.sqrt(monitor.m2 / monitor.count), X.std(axis=0))
+
+def test_drift_monitor_scores_and_gauges():
+    """Test PSI/KS stay near zero on reference-like traffic and rise on shifted traffic"""
+    _, reference = make_reference()
+    registry = CollectorRegistry()
+    psi = Gauge('psi', 'PSI', ['feature'], registry=registry)
+    ks = Gauge('ks', 'KS', ['feature'], registry=registry)
+    monitor = DriftMonitor(COLUMNS, reference, min_samples=100, psi=psi, ks=ks)
+
+    live, _ = make_reference(2000, seed=1)
+    live["Glucose"] += 40
+    monitor.observe(live[COLUMNS].to_numpy())
+    scores = monitor.evaluate()
+
+    assert scores["BMI"]["psi"] < 0.05
+    assert scores["Glucose"]["psi"] > 0.5
+    assert scores["Glucose"]["ks"] > 0.3
+    assert registry.get_sample_value('psi', {"feature": "Glucose"}) == scores["Glucose"]["psi"]
+
+def test_drift_monitor_waits_for_min_samples():
+    """Test no score is published before enough rows were observed"""
+    _, reference = make_reference()
+    monitor = DriftMonitor(COLUMNS, reference, min_samples=100)
+
+    monitor.observe(np.array([[120.0, 32.0]]))
+
+    assert monitor.evaluate() == {}
+
+def test_drift_monitor_buffer_is_bounded_by_rows():
+    """Test whole batches beyond the row budget are dropped and counted instead of buffered"""
+    from prometheus_client import Counter
+
+    _, reference = make_reference()
+    registry = CollectorRegistry()
+    dropped = Counter('dropped', 'Dropped rows', registry=registry)
+    monitor = DriftMonitor(COLUMNS, reference, min_samples=1, buffer_rows=1500, dropped=dropped)
+
+    accepted = [monitor.observe(np.ones((1000, 2))) for _ in range(3)]
+    monitor.observe(np.ones((500, 2)))
+    monitor.evaluate()
+
+    assert accepted == [True, False, False]
+    assert monitor.observed == 1500
+    assert registry.get_sample_value('dropped_total') == 2000
+    assert monitor.observe(np.ones((1000, 2)))
+
+def test_drift_monitor_decays_moments_like_histograms():
+    """Test mean/std follow recent traffic with the same decay as the PSI histograms"""
+    _, reference = make_reference()
+    monitor = DriftMonitor(COLUMNS, reference, min_samples=1, decay=0.5)
+
+    monitor.observe(np.full((1000, 2), 100.0))
+    monitor.evaluate()
+    monitor.observe(np.full((1000, 2), 200.0))
+    monitor.evaluate()
+
+    # Premier lot pondéré à 0.5, second à 1 : même poids que dans les histogrammes
+    assert np.allclose(monitor.mean, (0.5 * 100 + 200) / 1.5)
+    assert monitor.count == 1.5 * 1000 * 0.5
+    assert monitor.histograms[0].sum() == monitor.count
+    assert monitor.observed == 2000
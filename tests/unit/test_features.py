@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+from api.features import FeatureLayout
+from api.main import DiabetesInput, FEATURE_COLUMNS
+
+RECORDS = [
+    DiabetesInput(Pregnancies=6, Glucose=148, BloodPressure=72, SkinThickness=35,
+                  Insulin=0, BMI=33.6, DiabetesPedigreeFunction=0.627, Age=50),
+    DiabetesInput(Pregnancies=1, Glucose=85, BloodPressure=66, SkinThickness=29,
+                  Insulin=0, BMI=26.6, DiabetesPedigreeFunction=0.351, Age=31),
+]
+
+
+def test_layout_matches_dataframe_path():
+    """Test the ndarray fast path produces the same matrix as the DataFrame path"""
+    layout = FeatureLayout(FEATURE_COLUMNS)
+    expected = pd.DataFrame([r.model_dump() for r in RECORDS])[FEATURE_COLUMNS].to_numpy()
+
+    X = layout.matrix(RECORDS)
+
+    assert X.flags['C_CONTIGUOUS']
+    assert np.array_equal(X, expected)
+    assert np.array_equal(layout.row(RECORDS[1]), expected[1:])
+
+def test_layout_follows_estimator_feature_order():
+    """Test column order is taken from the fitted estimator and dtype is honoured"""
+    class Estimator:
+        feature_names_in_ = np.array(FEATURE_COLUMNS[::-1], dtype=object)
+
+    layout = FeatureLayout.from_model(FEATURE_COLUMNS, estimator=Estimator(), dtype=np.float32)
+    X = layout.matrix(RECORDS)
+
+    assert layout.columns == tuple(FEATURE_COLUMNS[::-1])
+    assert X.dtype == np.float32
+    assert X[0, 0] == np.float32(50)
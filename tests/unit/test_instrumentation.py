@@ -0,0 +1,80 @@
+import time
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from api.instrumentation import MetricsMiddleware, SamplingProfiler
+
+
+def build_app():
+    registry = CollectorRegistry()
+    metrics = {
+        "request_count": Counter('requests_total', 'Requests', ['method', 'endpoint', 'status'], registry=registry),
+        "request_latency": Histogram('request_seconds', 'Latency', ['method', 'endpoint'], registry=registry),
+        "active_requests": Gauge('active_requests', 'Active', registry=registry),
+    }
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, **metrics)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404, detail="missing")
+        return {"item_id": item_id}
+
+    @app.get("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    return app, registry
+
+
+def test_middleware_labels_use_route_template():
+    """Test request metrics are labelled with the route template, not the raw URL"""
+    app, registry = build_app()
+    client = TestClient(app)
+
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/items/0")
+    client.get("/does-not-exist")
+
+    def count(endpoint, status):
+        return registry.get_sample_value(
+            'requests_total', {"method": "GET", "endpoint": endpoint, "status": status}
+        )
+
+    assert count("/items/{item_id}", "200") == 2
+    assert count("/items/{item_id}", "404") == 1
+    assert count("unmatched", "404") == 1
+    assert count("/items/1", "200") is None
+
+def test_active_requests_decremented_on_exception():
+    """Test the active request gauge is restored when the handler raises"""
+    app, registry = build_app()
+    client = TestClient(app, raise_server_exceptions=False)
+
+    response = client.get("/boom")
+
+    assert response.status_code == 500
+    assert registry.get_sample_value('active_requests') == 0
+    assert registry.get_sample_value(
+        'requests_total', {"method": "GET", "endpoint": "/boom", "status": "500"}
+    ) == 1
+
+def test_sampling_profiler_writes_folded_stacks(tmp_path):
+    """Test the profiler samples busy threads and writes a folded stack file"""
+    profiler = SamplingProfiler(output_dir=str(tmp_path))
+    assert profiler.start(interval=0.001)
+    assert not profiler.start()
+
+    deadline = time.time() + 0.2
+    while time.time() < deadline:
+        sum(i * i for i in range(1000))
+
+    summary = profiler.stop()
+    assert not profiler.running
+    assert summary["sampling_rounds"] > 0
+    assert summary["top_functions"]
+    with open(summary["file"], encoding="utf-8") as handle:
+        assert handle.read().strip()
+    assert profiler.stop() is None
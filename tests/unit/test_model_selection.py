@@ -0,0 +1,52 @@
+import numpy as np
+from api.model_selection import dataset_fingerprint, fold_models, oversample, select_models
+
+CANDIDATES = {
+    "LogisticRegression": ("sklearn.linear_model.LogisticRegression", {"C": 1.0, "max_iter": 200}),
+    "DecisionTreeClassifier": ("sklearn.tree.DecisionTreeClassifier", {"max_depth": 3, "random_state": 0}),
+}
+
+
+def make_data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0.3).astype(int)
+    return X, y
+
+
+def test_selection_is_cached_per_candidate_and_skipped_when_unchanged(tmp_path):
+    """Test unchanged inputs skip all work and a changed candidate only recomputes its own folds"""
+    X, y = make_data()
+    cache_dir = str(tmp_path / "cache")
+
+    first = select_models(X, y, candidates=CANDIDATES, n_splits=3, n_jobs=1, cache_dir=cache_dir)
+    assert not first["skipped"]
+    assert all(candidate["cached_folds"] == 0 for candidate in first["candidates"].values())
+    assert first["best"] == "LogisticRegression"
+
+    again = select_models(X, y, candidates=CANDIDATES, n_splits=3, n_jobs=1, cache_dir=cache_dir)
+    assert again["skipped"] and again["candidates"] == first["candidates"]
+    models = fold_models(first["candidates"]["LogisticRegression"]["key"], 3, cache_dir)
+    assert all(model is not None and model.predict(X[:5]).shape == (5,) for model in models)
+
+    tuned = dict(CANDIDATES, DecisionTreeClassifier=("sklearn.tree.DecisionTreeClassifier",
+                                                     {"max_depth": 5, "random_state": 0}))
+    partial = select_models(X, y, candidates=tuned, n_splits=3, n_jobs=1, cache_dir=cache_dir)
+    assert partial["candidates"]["LogisticRegression"]["cached_folds"] == 3
+    assert partial["candidates"]["DecisionTreeClassifier"]["cached_folds"] == 0
+
+    X[0, 0] += 1
+    changed = select_models(X, y, candidates=CANDIDATES, n_splits=3, n_jobs=1, cache_dir=cache_dir)
+    assert all(candidate["cached_folds"] == 0 for candidate in changed["candidates"].values())
+
+def test_parallel_selection_matches_serial_and_oversampling_balances():
+    """Test pooled fold evaluation gives the serial metrics and oversampling equalizes classes"""
+    X, y = make_data()
+    serial = select_models(X, y, candidates=CANDIDATES, n_splits=3, n_jobs=1)
+    pooled = select_models(X, y, candidates=CANDIDATES, n_splits=3, n_jobs=2)
+    for name in CANDIDATES:
+        assert serial["candidates"][name]["metrics"]["accuracy"] == pooled["candidates"][name]["metrics"]["accuracy"]
+
+    X_res, y_res = oversample(X, y, seed=0)
+    assert np.bincount(y_res)[0] == np.bincount(y_res)[1] == np.bincount(y).max()
+    assert dataset_fingerprint(X, y) != dataset_fingerprint(X, 1 - y)
@@ -0,0 +1,67 @@
+import json
+import os
+import numpy as np
+import pyarrow.parquet as pq
+from api.prediction_log import PredictionLogger
+
+COLUMNS = ("Glucose", "BMI")
+
+
+def test_prediction_log_ndjson_batches_and_rotation(tmp_path):
+    """Test queued entries are flushed as replayable NDJSON and files rotate by size"""
+    logger = PredictionLogger(str(tmp_path), max_file_bytes=1)
+    logger.log(COLUMNS, np.array([[148.0, 33.6]]), 1, np.array([0.3, 0.7]), "4", 0.002)
+    logger.flush()
+    logger.log(COLUMNS, np.array([[85.0, 26.6], [90.0, 30.1]]), np.array([0, 0]), None, "4", 0.004)
+    logger.flush()
+    logger.stop()
+
+    files = sorted(os.listdir(tmp_path))
+    assert len(files) == 2 and all(name.endswith(".ndjson") for name in files)
+    records = [json.loads(line) for name in files for line in open(tmp_path / name)]
+    assert records[0]["Glucose"] == 148.0
+    assert records[0]["prediction"] == 1
+    assert records[0]["probabilities"] == [0.3, 0.7]
+    assert records[0]["model_version"] == "4"
+    assert [r["BMI"] for r in records[1:]] == [26.6, 30.1]
+    assert records[2]["probabilities"] is None
+
+def test_prediction_log_parquet_background_flush(tmp_path):
+    """Test the background thread writes Parquet row groups that are readable after rotation"""
+    logger = PredictionLogger(str(tmp_path), fmt="parquet", batch_size=2, flush_interval=0.01)
+    logger.start()
+    for i in range(5):
+        logger.log(COLUMNS, np.array([[100.0 + i, 30.0]]), i % 2, np.array([0.5, 0.5]), "4", 0.001)
+    logger.stop()
+
+    (name,) = os.listdir(tmp_path)
+    table = pq.read_table(str(tmp_path / name))
+    assert table.num_rows == 5
+    assert table.column("Glucose").to_pylist() == [100.0, 101.0, 102.0, 103.0, 104.0]
+    assert table.column("prediction").to_pylist() == [0, 1, 0, 1, 0]
+
+def test_prediction_log_drop_policies(tmp_path):
+    """Test a full queue drops the newest or the oldest entries and counts them"""
+    for policy, kept in (("drop_newest", [0, 1]), ("drop_oldest", [2, 3])):
+        logger = PredictionLogger(str(tmp_path / policy), max_queue=2, drop_policy=policy)
+        for i in range(4):
+            logger.log(COLUMNS, np.array([[float(i), 30.0]]), i, None, "4", 0.001)
+        assert logger.dropped_rows == 2
+        assert [int(entry[2][0, 0]) for entry in logger._queue] == kept
+
+def test_prediction_log_bounds_queue_by_rows(tmp_path):
+    """Test batch entries count every row against the bound and in the dropped counter"""
+    batch = np.tile([[1.0, 30.0]], (3, 1))
+    newest = PredictionLogger(str(tmp_path / "newest"), max_queue=4, drop_policy="drop_newest")
+    newest.log(COLUMNS, batch, np.zeros(3), None, "4", 0.001)
+    newest.log(COLUMNS, batch, np.zeros(3), None, "4", 0.001)
+    assert len(newest._queue) == 1
+    assert newest.dropped_rows == 3
+
+    oldest = PredictionLogger(str(tmp_path / "oldest"), max_queue=4, drop_policy="drop_oldest")
+    oldest.log(COLUMNS, np.array([[0.0, 30.0]]), 0, None, "4", 0.001)
+    oldest.log(COLUMNS, np.array([[1.0, 30.0]]), 1, None, "4", 0.001)
+    oldest.log(COLUMNS, batch, np.zeros(3), None, "4", 0.001)
+    assert [len(entry[2]) for entry in oldest._queue] == [1, 3]
+    assert oldest.dropped_rows == 1
+    assert oldest._queued_rows == 4
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from api.preprocessing import fit_preprocessor, load_preprocessor, save_preprocessor
+
+COLUMNS = ["Pregnancies", "Glucose", "BloodPressure", "SkinThickness",
+           "Insulin", "BMI", "DiabetesPedigreeFunction", "Age"]
+
+
+def make_frame(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Pregnancies": rng.integers(0, 10, n), "Glucose": rng.normal(120, 30, n).clip(40),
+        "BloodPressure": rng.normal(70, 12, n).clip(30), "SkinThickness": rng.normal(29, 10, n).clip(5),
+        "Insulin": rng.normal(150, 80, n).clip(15), "BMI": rng.normal(32, 7, n).clip(15),
+        "DiabetesPedigreeFunction": rng.uniform(0.1, 2, n), "Age": rng.integers(21, 80, n),
+    }).astype(float)
+    df.loc[df.index % 4 == 0, "Insulin"] = 0
+    df.loc[df.index % 25 == 0, "SkinThickness"] = 0
+    return df
+
+
+def test_imputation_matches_brute_force_neighbors():
+    """Test KD-tree imputation equals a brute-force k-NN over the reference rows"""
+    df = make_frame()
+    preprocessor = fit_preprocessor(df, COLUMNS)
+    X = df[COLUMNS].to_numpy()
+
+    imputed = preprocessor.impute(X.copy())
+
+    reference = preprocessor.reference
+    for i in np.flatnonzero(X[:, 4] == 0)[:20]:
+        absent = X[i, preprocessor._impute_index] == 0
+        query = X[i, preprocessor._impute_index][~absent]
+        distances = np.linalg.norm(reference[:, ~absent] - query, axis=1)
+        nearest = np.argsort(distances, kind="stable")[:5]
+        expected = reference[nearest][:, absent].mean(axis=0)
+        assert np.allclose(imputed[i, preprocessor._impute_index[absent]], expected)
+    assert not (imputed[:, preprocessor._impute_index] == 0).any()
+
+def test_transform_matches_sklearn_scaling_and_keeps_input():
+    """Test the fused affine step equals StandardScaler on complete rows and leaves the input untouched"""
+    from sklearn.impute import KNNImputer
+    from sklearn.preprocessing import StandardScaler
+
+    df = make_frame()
+    preprocessor = fit_preprocessor(df, COLUMNS)
+    data = df[COLUMNS].copy()
+    cols = preprocessor.impute_columns
+    data[cols] = KNNImputer(n_neighbors=5).fit_transform(data[cols].replace(0, np.nan))
+    data[preprocessor.log_columns] = np.log1p(data[preprocessor.log_columns])
+    expected = StandardScaler().fit_transform(data)
+
+    X = df[COLUMNS].to_numpy()
+    original = X.copy()
+    out = preprocessor.transform(X)
+
+    complete = ~(df[cols] == 0).any(axis=1).to_numpy()
+    assert np.allclose(out[complete], expected[complete])
+    assert np.array_equal(X, original)
+    # Ordre de colonnes différent : mêmes valeurs, permutées
+    reordered = preprocessor.for_columns(COLUMNS[::-1]).transform(X[:, ::-1])
+    assert np.allclose(reordered, out[:, ::-1])
+
+def test_artifact_roundtrip_and_model_scaler_composition(tmp_path):
+    """Test the saved artifact reloads and a training scaler is folded into one affine step"""
+    from sklearn.preprocessing import StandardScaler
+
+    df = make_frame()
+    preprocessor = fit_preprocessor(df, COLUMNS)
+    X = df[COLUMNS].to_numpy()
+    first = preprocessor.transform(X)
+    training_scaler = StandardScaler().fit(first[:200])
+
+    path = save_preprocessor(preprocessor.then(training_scaler.mean_, training_scaler.scale_),
+                             str(tmp_path / "preprocessor.joblib"))
+    reloaded = load_preprocessor(path)
+
+    assert np.allclose(reloaded.transform(X), training_scaler.transform(first))
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from api.profiling import DataProfile, diff_profiles, profile_file
+from api.sketches import DistinctCounter, QuantileSketch
+
+
+def test_quantile_sketch_is_accurate_and_mergeable():
+    """Test KLL quantiles stay close to exact ones with bounded memory, including after merges"""
+    values = np.random.default_rng(0).normal(size=200_000)
+    single = QuantileSketch(k=200, seed=1)
+    parts = [QuantileSketch(k=200, seed=1) for _ in range(4)]
+    for i, part in enumerate(parts):
+        chunk = values[i::4]
+        single.update(chunk)
+        part.update(chunk)
+    merged = parts[0].merge(parts[1]).merge(parts[2]).merge(parts[3])
+
+    exact = np.quantile(values, [0.25, 0.5, 0.75])
+    for sketch in (single, merged):
+        assert sketch.n == len(values)
+        assert np.allclose(sketch.quantiles([0.25, 0.5, 0.75]), exact, atol=0.05)
+        assert sum(len(level) for level in sketch.levels) < 1000
+
+def test_distinct_counter_exact_then_approximate():
+    """Test duplicate counting is exact under the hash budget and estimated above it"""
+    hashes = np.random.default_rng(0).integers(0, 2**64, size=50_000, dtype=np.uint64)
+    hashes = np.concatenate([hashes, hashes[:5_000]])
+
+    exact = DistinctCounter()
+    exact.update(hashes)
+    assert exact.exact and exact.count() == 50_000
+
+    budgeted = DistinctCounter(max_exact=10_000)
+    budgeted.update(hashes)
+    assert not budgeted.exact
+    assert abs(budgeted.count() - 50_000) < 0.05 * 50_000
+
+def test_profile_file_single_pass_matches_pandas(tmp_path):
+    """Test the streamed profile counts missing values, duplicates and outliers like pandas"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"Glucose": rng.normal(120, 30, 2000), "BMI": rng.normal(32, 6, 2000)})
+    df.loc[[3, 50], "BMI"] = np.nan
+    df.loc[10, "Glucose"] = 5000
+    df = pd.concat([df, df.iloc[:25]], ignore_index=True)
+    path = str(tmp_path / "raw.csv")
+    df.to_csv(path, index=False)
+
+    serial = profile_file(path, chunk_rows=300).to_dict()
+    pooled = profile_file(path, chunk_rows=300, workers=2).to_dict()
+
+    for profile in (serial, pooled):
+        assert profile["rows"] == 2025
+        assert profile["duplicates"] == {"count": 25, "exact": True}
+        # La ligne 3 fait partie des 25 lignes dupliquées
+        assert profile["columns"]["BMI"]["missing"] == 3
+        assert profile["columns"]["Glucose"]["outliers"] == 2
+        assert abs(profile["columns"]["Glucose"]["quantiles"]["median"] - df["Glucose"].median()) < 2
+
+def test_profile_file_skips_text_columns(tmp_path):
+    """Test string columns are profiled for missing values only, without crashing the numeric path"""
+    df = pd.DataFrame({"Glucose": np.arange(50.0), "Clinic": ["north", "south"] * 25})
+    df.loc[4, "Clinic"] = None
+    path = str(tmp_path / "raw.csv")
+    df.to_csv(path, index=False)
+
+    profile = profile_file(path, chunk_rows=20).to_dict()
+
+    assert profile["columns"]["Clinic"] == {"missing": 1}
+    assert profile["columns"]["Glucose"]["count"] == 50
+
+def test_diff_profiles_flags_shifts():
+    """Test diffing two profiles reports quantile shifts and missing-rate changes"""
+    base = pd.DataFrame({"Age": np.arange(100.0)})
+    shifted = base.copy()
+    shifted["Age"] += 40
+    shifted.loc[:9, "Age"] = np.nan
+
+    changes = diff_profiles(DataProfile().update(base).to_dict(), DataProfile().update(shifted).to_dict())
+
+    assert any(change.startswith("Age: missing rate") for change in changes)
+    assert any(change.startswith("Age: median moved") for change in changes)
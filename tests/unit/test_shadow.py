@@ -0,0 +1,79 @@
+import random
+import threading
+import numpy as np
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from api.features import FeatureLayout
+from api.shadow import Candidate, ShadowScorer, probability_divergence
+
+COLUMNS = ["a", "b"]
+
+
+def make_metrics():
+    registry = CollectorRegistry()
+    metrics = {
+        "agreement": Counter("agreement", "", ["version", "mode", "result"], registry=registry),
+        "latency_delta": Histogram("latency_delta", "", ["version", "mode"], registry=registry),
+        "divergence": Histogram("divergence", "", ["version", "mode"], registry=registry),
+        "dropped": Counter("dropped", "", ["version", "reason"], registry=registry),
+    }
+    return registry, metrics
+
+
+def score(X, estimator, layout, preprocessor):
+    return estimator(X)
+
+
+def test_shadow_scores_in_background_and_records_agreement():
+    """Test candidates are compared off the request path: agreement, divergence and reordered columns"""
+    registry, metrics = make_metrics()
+    # La candidate attend ses colonnes dans l'ordre inverse : elle prédit 1 quand b > a
+    candidate = Candidate(7, lambda X: (
+        (X[:, 0] > X[:, 1]).astype(int), np.array([[0.2, 0.8]] * len(X))
+    ), FeatureLayout(COLUMNS[::-1]))
+    scorer = ShadowScorer(score, [candidate], **metrics)
+
+    X = np.array([[1.0, 2.0], [3.0, 1.0], [5.0, 4.0]])
+    assert scorer.submit(COLUMNS, X, np.array([1, 0, 1]), np.array([[0.2, 0.8]] * 3), 0.001)
+    scorer.shutdown()
+
+    labels = {"version": "7", "mode": "shadow"}
+    assert registry.get_sample_value("agreement_total", {**labels, "result": "agree"}) == 2
+    assert registry.get_sample_value("agreement_total", {**labels, "result": "disagree"}) == 1
+    assert registry.get_sample_value("divergence_count", labels) == 3
+    assert registry.get_sample_value("divergence_sum", labels) == 0
+    assert registry.get_sample_value("latency_delta_count", labels) == 1
+    assert scorer.pending == 0
+    assert np.allclose(probability_divergence([[1, 0]], [[0, 1]]), [1.0])
+
+def test_shadow_work_is_dropped_under_load():
+    """Test shadow comparisons are skipped when the pool is full or the primary path is overloaded"""
+    registry, metrics = make_metrics()
+    release = threading.Event()
+    candidate = Candidate(3, lambda X: (release.wait(5), (np.zeros(len(X), dtype=int), None))[1],
+                          FeatureLayout(COLUMNS))
+    overloaded = [False]
+    scorer = ShadowScorer(score, [candidate], max_pending=1, overloaded=lambda: overloaded[0], **metrics)
+    X = np.zeros((1, 2))
+
+    assert scorer.submit(COLUMNS, X, np.array([0]), None, 0.001)
+    assert not scorer.submit(COLUMNS, X, np.array([0]), None, 0.001)
+    overloaded[0] = True
+    assert not scorer.submit(COLUMNS, X, np.array([0]), None, 0.001)
+    release.set()
+    scorer.shutdown()
+
+    assert registry.get_sample_value("dropped_total", {"version": "3", "reason": "queue_full"}) == 1
+    assert registry.get_sample_value("dropped_total", {"version": "3", "reason": "overloaded"}) == 1
+    assert registry.get_sample_value("agreement_total", {"version": "3", "mode": "shadow", "result": "agree"}) == 1
+
+def test_canary_routes_configured_fraction():
+    """Test canary routing sends about the configured share of traffic to the canary"""
+    canary = Candidate(9, None, FeatureLayout(COLUMNS), canary_fraction=0.1)
+    shadow = Candidate(8, None, FeatureLayout(COLUMNS))
+    scorer = ShadowScorer(score, [shadow, canary], rng=random.Random(0))
+
+    routed = [scorer.route() for _ in range(20000)]
+    scorer.shutdown()
+
+    assert {candidate.version for candidate in routed if candidate is not None} == {"9"}
+    assert abs(sum(candidate is not None for candidate in routed) / 20000 - 0.1) < 0.01
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from api.tree_engine import CompiledTreeEnsemble, compile_estimator
+
+X = pd.read_csv('data/processed/Ready_For_Model.csv')
+y = pd.read_csv('data/processed/Clustered_Data.csv')['Cluster']
+
+
+@pytest.mark.parametrize("estimator", [
+    DecisionTreeClassifier(random_state=0),
+    RandomForestClassifier(n_estimators=20, random_state=0),
+    GradientBoostingClassifier(n_estimators=30, random_state=0),
+])
+def test_compiled_engine_parity_with_sklearn(estimator):
+    """Test compiled traversal matches sklearn probabilities and classes"""
+    estimator.fit(X, y)
+    engine = CompiledTreeEnsemble(estimator, max_rows=None)
+
+    expected = estimator.predict_proba(X)
+    proba = engine.predict_proba(X.to_numpy())
+
+    assert np.allclose(proba, expected, rtol=0, atol=1e-12)
+    assert (engine.predict(X.to_numpy()) == estimator.predict(X)).all()
+
+def test_compiled_engine_multiclass_boosting():
+    """Test multiclass gradient boosting parity"""
+    y_multi = pd.qcut(X['Glucose'], 3, labels=False)
+    estimator = GradientBoostingClassifier(n_estimators=10, max_depth=2, random_state=0).fit(X, y_multi)
+    engine = CompiledTreeEnsemble(estimator, max_rows=None)
+
+    assert np.allclose(engine.predict_proba(X.to_numpy()), estimator.predict_proba(X), rtol=0, atol=1e-12)
+
+def test_compile_estimator_falls_back_for_unsupported_models():
+    """Test non-tree models are served by sklearn unchanged"""
+    estimator = LogisticRegression().fit(X, y)
+    assert compile_estimator(estimator) is estimator
+
+def test_compile_estimator_falls_back_when_private_sklearn_api_drifts():
+    """Test a changed private boosting API is caught at compile time and served by sklearn"""
+    estimator = GradientBoostingClassifier(n_estimators=10, random_state=0).fit(X, y)
+    assert isinstance(compile_estimator(estimator), CompiledTreeEnsemble)
+
+    class ShiftedLoss:
+        def predict_proba(self, raw):
+            return estimator._loss.predict_proba(raw + 1.0)
+
+    with patch.object(CompiledTreeEnsemble, '__init__', side_effect=TypeError("unexpected argument")):
+        assert compile_estimator(estimator) is estimator
+
+    engine = CompiledTreeEnsemble(estimator)
+    with patch('api.tree_engine.CompiledTreeEnsemble', return_value=engine):
+        engine._loss = ShiftedLoss()
+        assert compile_estimator(estimator) is estimator
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from api.validation import FEATURE_RANGES, ChunkValidator, validate_file
+
+COLUMNS = list(FEATURE_RANGES)
+
+
+def make_frame(n=10):
+    return pd.DataFrame({col: np.full(n, low + 1.0) for col, (low, _) in FEATURE_RANGES.items()})
+
+
+def test_validator_collects_every_violation():
+    """Test nulls, non-numeric values and out-of-range values are all reported with row indexes"""
+    df = make_frame().astype({"Glucose": object})
+    df.loc[2, "Glucose"] = "high"
+    df.loc[5, "Glucose"] = None
+    df.loc[[1, 7], "BMI"] = 0
+    df.loc[3, "Age"] = 500
+
+    report = ChunkValidator().validate_frame(df, start_row=100).to_dict()
+
+    assert not report["valid"]
+    assert report["violations"]["type"] == {"Glucose": {"count": 1, "rows": [102]}}
+    assert report["violations"]["null"] == {"Glucose": {"count": 1, "rows": [105]}}
+    assert report["violations"]["range"] == {
+        "BMI": {"count": 2, "rows": [101, 107]},
+        "Age": {"count": 1, "rows": [103]},
+    }
+
+def test_validator_reports_missing_columns_and_checks_the_rest():
+    """Test missing columns are reported without stopping the other checks"""
+    df = make_frame().drop(columns=["Insulin"])
+    df.loc[4, "BMI"] = 99
+
+    report = ChunkValidator().validate_frame(df)
+
+    assert report.missing_columns == ["Insulin"]
+    assert report.violations["range"]["BMI"]["rows"] == [4]
+
+def test_validate_file_streams_chunks_in_process_pool(tmp_path):
+    """Test chunked CSV and Parquet validation gives the same report in-process and with workers"""
+    df = make_frame(1000)
+    df.loc[[10, 450, 999], "Pregnancies"] = 50
+    csv_path = str(tmp_path / "cohort.csv")
+    parquet_path = str(tmp_path / "cohort.parquet")
+    df.to_csv(csv_path, index=False)
+    df.to_parquet(parquet_path)
+
+    serial = validate_file(csv_path, chunk_rows=128).to_dict()
+    pooled = validate_file(csv_path, chunk_rows=128, workers=2).to_dict()
+    parquet = validate_file(parquet_path, chunk_rows=128).to_dict()
+
+    assert serial == pooled == parquet
+    assert serial["rows"] == 1000
+    assert serial["chunks"] == 8
+    assert serial["violations"]["range"]["Pregnancies"]["rows"] == [10, 450, 999]
+
+def test_validate_file_reports_text_values_read_from_csv(tmp_path):
+    """Test a CSV with a text value (string dtype column) yields a type violation instead of crashing"""
+    df = make_frame(20).astype({"Glucose": object})
+    df.loc[7, "Glucose"] = "high"
+    path = str(tmp_path / "cohort.csv")
+    df.to_csv(path, index=False)
+
+    report = validate_file(path, chunk_rows=8).to_dict()
+
+    assert report["rows"] == 20
+    assert report["violations"]["type"] == {"Glucose": {"count": 1, "rows": [7]}}
+
+def test_validation_report_caps_row_indexes():
+    """Test row indexes are capped per violation while counts stay exact"""
+    X = np.full((50, len(COLUMNS)), -1.0)
+
+    report = ChunkValidator(max_row_indexes=5).validate_matrix(X)
+
+    entry = report.violations["range"]["Glucose"]
+    assert entry["count"] == 50
+    assert entry["rows"] == [0, 1, 2, 3, 4]